@@ -0,0 +1,40 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.db.session import estatisticas_consultas
+from app.services.estatisticas_diarias import cache_estatisticas
+from app.services.filtro_identificadores import filtro_identificadores
+from app.services.relacao_service import cache_relacao
+from app.services.snapshot_relacao import monitor_snapshot_relacao
+from app.services.versao_dataset import monitor_versao_dataset
+
+# Estado interno do worker que atende a chamada. Fica sob /api/v1
+# (autenticado), e não em /health (liberado): expõe o texto dos comandos SQL e
+# o estado dos caches, e permite zerar a contagem.
+router = APIRouter(prefix="/diagnostico", tags=["diagnostico"])
+
+
+@router.get("/cache")
+async def diagnostico_cache() -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "dataset_versao": monitor_versao_dataset.versao,
+        "cache_relacao": cache_relacao.estatisticas(),
+        "filtro_identificadores": filtro_identificadores.estatisticas(),
+        "snapshot_relacao": monitor_snapshot_relacao.estatisticas(),
+        "cache_estatisticas": cache_estatisticas.estatisticas(),
+    }
+
+
+@router.get("/consultas")
+async def diagnostico_consultas() -> dict[str, Any]:
+    return {"status": "ok", "consultas": estatisticas_consultas.estatisticas()}
+
+
+# Devolve a contagem e a reinicia.
+@router.post("/consultas/zerar")
+async def zerar_consultas() -> dict[str, Any]:
+    consultas = estatisticas_consultas.estatisticas()
+    estatisticas_consultas.zerar()
+    return {"status": "ok", "consultas": consultas}
@@ -0,0 +1,156 @@
+from datetime import date
+from typing import Any, List
+
+import orjson
+from fastapi import APIRouter, Path, Query, Response
+from pydantic import BaseModel, Field
+
+from app.api.v1.endpoints.relacao import TipoEvento
+from app.services.estatisticas_diarias import EstatisticasService
+
+router = APIRouter(prefix="/estatisticas", tags=["estatisticas"])
+service = EstatisticasService()
+
+
+class EstatisticasGeralResponse(BaseModel):
+    total_consultas: int = Field(..., examples=[12000])
+    total_positivas: int = Field(..., examples=[340])
+    taxa_positividade_pct: float | None = Field(
+        None,
+        description="Percentual de respostas positivas (nulo sem consultas no período).",
+        examples=[2.83],
+    )
+    primeiro_dia: str | None = Field(None, examples=["2026-03-09"])
+    ultimo_dia: str | None = Field(None, examples=["2026-10-16"])
+    dias_com_atividade: int = Field(..., examples=[200])
+
+
+class EstatisticaMetodoItem(BaseModel):
+    metodo_identificacao: str = Field(..., examples=["notificacao_sinan"])
+    chamadas: int = Field(..., examples=[300])
+    positivas: int = Field(..., examples=[300])
+    pct_do_total: float | None = Field(None, examples=[2.5])
+    pct_das_positivas: float | None = Field(None, examples=[88.24])
+
+
+class EstatisticasMetodoResponse(BaseModel):
+    metodos: List[EstatisticaMetodoItem] = Field(
+        ..., description="Um item por método, do mais consultado ao menos consultado."
+    )
+
+
+class EstatisticaMensalItem(BaseModel):
+    mes: str = Field(..., examples=["2026-03"])
+    total_consultas: int = Field(..., examples=[1500])
+    positivas: int = Field(..., examples=[40])
+    taxa_positividade_pct: float | None = Field(None, examples=[2.67])
+
+
+class EstatisticasMensalResponse(BaseModel):
+    meses: List[EstatisticaMensalItem]
+
+
+_RESPOSTAS: dict[int | str, dict[str, Any]] = {
+    401: {"description": "Não autorizado (API Key/HMAC ausentes ou inválidos)."},
+    422: {"description": "Erro de validação dos parâmetros."},
+    500: {"description": "Erro interno."},
+}
+
+_PATH_TIPO_EVENTO = Path(..., description="Tipo do evento.", examples=["violencia"])
+_QUERY_DESDE = Query(None, description="Primeiro dia do período (AAAA-MM-DD), inclusive.")
+_QUERY_ATE = Query(None, description="Último dia do período (AAAA-MM-DD), inclusive.")
+
+
+def _pct(parte: int, total: int) -> float | None:
+    return round(100.0 * parte / total, 2) if total else None
+
+
+def _resposta_json(conteudo: dict[str, Any]) -> Response:
+    return Response(content=orjson.dumps(conteudo), media_type="application/json")
+
+
+@router.get(
+    "/{tipo_evento}",
+    response_model=EstatisticasGeralResponse,
+    summary="Taxa de positividade geral",
+    description=(
+        "Consultas, respostas positivas e taxa de positividade do `tipo_evento` no período, "
+        "a partir do rollup diário das métricas de uso (atualizado periodicamente)."
+    ),
+    responses=_RESPOSTAS,
+)
+async def estatisticas_geral(
+    tipo_evento: TipoEvento = _PATH_TIPO_EVENTO,
+    desde: date | None = _QUERY_DESDE,
+    ate: date | None = _QUERY_ATE,
+) -> Response:
+    geral = await service.geral(tipo_evento=tipo_evento, desde=desde, ate=ate)
+    return _resposta_json(
+        {
+            "total_consultas": geral.total_consultas,
+            "total_positivas": geral.total_positivas,
+            "taxa_positividade_pct": _pct(geral.total_positivas, geral.total_consultas),
+            "primeiro_dia": str(geral.primeiro_dia) if geral.primeiro_dia else None,
+            "ultimo_dia": str(geral.ultimo_dia) if geral.ultimo_dia else None,
+            "dias_com_atividade": geral.dias_com_atividade,
+        }
+    )
+
+
+@router.get(
+    "/{tipo_evento}/metodos",
+    response_model=EstatisticasMetodoResponse,
+    summary="Distribuição por método",
+    description="Consultas e respostas positivas por `metodo_identificacao` no período.",
+    responses=_RESPOSTAS,
+)
+async def estatisticas_por_metodo(
+    tipo_evento: TipoEvento = _PATH_TIPO_EVENTO,
+    desde: date | None = _QUERY_DESDE,
+    ate: date | None = _QUERY_ATE,
+) -> Response:
+    metodos = await service.por_metodo(tipo_evento=tipo_evento, desde=desde, ate=ate)
+    total = sum(m.chamadas for m in metodos)
+    positivas = sum(m.positivas for m in metodos)
+    return _resposta_json(
+        {
+            "metodos": [
+                {
+                    "metodo_identificacao": m.metodo_identificacao,
+                    "chamadas": m.chamadas,
+                    "positivas": m.positivas,
+                    "pct_do_total": _pct(m.chamadas, total),
+                    "pct_das_positivas": _pct(m.positivas, positivas),
+                }
+                for m in metodos
+            ]
+        }
+    )
+
+
+@router.get(
+    "/{tipo_evento}/mensal",
+    response_model=EstatisticasMensalResponse,
+    summary="Tendência mensal",
+    description="Consultas, respostas positivas e taxa de positividade por mês no período.",
+    responses=_RESPOSTAS,
+)
+async def estatisticas_mensal(
+    tipo_evento: TipoEvento = _PATH_TIPO_EVENTO,
+    desde: date | None = _QUERY_DESDE,
+    ate: date | None = _QUERY_ATE,
+) -> Response:
+    meses = await service.mensal(tipo_evento=tipo_evento, desde=desde, ate=ate)
+    return _resposta_json(
+        {
+            "meses": [
+                {
+                    "mes": m.mes,
+                    "total_consultas": m.total_consultas,
+                    "positivas": m.positivas,
+                    "taxa_positividade_pct": _pct(m.positivas, m.total_consultas),
+                }
+                for m in meses
+            ]
+        }
+    )
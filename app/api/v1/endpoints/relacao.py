@@ -1,10 +1,9 @@
 from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Path, Request, Response
 from pydantic import BaseModel, Field, field_validator, model_validator
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
 from app.services.relacao_service import RelacaoService
 from app.services.exceptions import IdentificadoresConflitantesError
 
@@ -93,6 +92,73 @@ class RelacaoErroConflito(BaseModel):
     )
 
 
+class RelacaoLoteRequest(BaseModel):
+    consultas: List[RelacaoRequest] = Field(
+        ...,
+        description=(
+            "Lista de consultas, uma por indivíduo, cada uma com seus próprios identificadores. "
+            "Mínimo: 1. Máximo: 5000."
+        ),
+    )
+
+    @model_validator(mode="after")
+    def validar_limite_consultas(self):
+        if not self.consultas:
+            raise ValueError("É necessário informar ao menos uma consulta")
+        if len(self.consultas) > 5000:
+            raise ValueError("Máximo de 5000 consultas por requisição")
+        return self
+
+
+class RelacaoLoteItem(RelacaoResponse):
+    status: Literal[200, 409] = Field(
+        ...,
+        description="Status equivalente ao da consulta individual: 200 (resolvida) ou 409 (identificadores conflitantes).",
+        examples=[200, 409],
+    )
+    erro: RelacaoErroConflito | None = Field(
+        None,
+        description="Detalhe do erro quando `status=409`.",
+    )
+
+
+class RelacaoLoteResponse(BaseModel):
+    resultados: List[RelacaoLoteItem] = Field(
+        ...,
+        description="Resultados na mesma ordem das consultas enviadas.",
+    )
+
+
+# As rotas devolvem o JSON já serializado (orjson) em um Response: o FastAPI
+# não revalida nem reserializa pelo `response_model`, que continua declarado
+# só para o OpenAPI. Os dicts seguem a ordem e os campos dos modelos
+# (incluindo os nulos), então o corpo é o mesmo que o modelo produziria.
+_CAMPOS_NEGATIVO = RelacaoResponse(relacionado=False).model_dump(mode="json")
+_CORPO_NEGATIVO = orjson.dumps(_CAMPOS_NEGATIVO)
+_ITEM_LOTE_NEGATIVO = {**_CAMPOS_NEGATIVO, "status": 200, "erro": None}
+
+
+def _resposta_json(corpo: bytes) -> Response:
+    return Response(content=corpo, media_type="application/json")
+
+
+def _campos_evento(evento) -> dict:
+    if evento is None:
+        return _CAMPOS_NEGATIVO
+
+    return {
+        "relacionado": True,
+        "metodo_identificacao": evento.metodo_identificacao,
+        "data_identificacao": str(evento.data_identificacao),
+        "banco_origem_identificacao": (
+            str(evento.banco_origem_identificacao)
+            if evento.banco_origem_identificacao is not None
+            else None
+        ),
+        "id_registro_identificacao": evento.id_registro_identificacao,
+    }
+
+
 @router.post(
     "/relacao/{tipo_evento}",
     response_model=RelacaoResponse,
@@ -119,13 +185,11 @@ async def relacao(
     ),
     payload: RelacaoRequest = ...,
     request: Request = ...,
-    db: AsyncSession = Depends(get_db),
-) -> RelacaoResponse:
+) -> Response:
     pares = [(i.tipo, i.valor) for i in payload.identificadores]
 
     try:
         evento = await service.buscar_evento_relacionado(
-            db,
             endpoint=str(request.url.path),
             tipo_evento=tipo_evento,
             pares_identificadores=pares,
@@ -137,16 +201,58 @@ async def relacao(
         )
 
     if evento is None:
-        return RelacaoResponse(relacionado=False)
+        return _resposta_json(_CORPO_NEGATIVO)
+    return _resposta_json(orjson.dumps(_campos_evento(evento)))
 
-    return RelacaoResponse(
-        relacionado=True,
-        metodo_identificacao=evento.metodo_identificacao,
-        data_identificacao=str(evento.data_identificacao),
-        banco_origem_identificacao=(
-            str(evento.banco_origem_identificacao)
-            if evento.banco_origem_identificacao is not None
-            else None
-        ),
-        id_registro_identificacao=evento.id_registro_identificacao,
+
+@router.post(
+    "/relacao/{tipo_evento}/lote",
+    response_model=RelacaoLoteResponse,
+    summary="Verificar relação em lote",
+    description=(
+        "Executa a verificação de relação para várias consultas (uma por indivíduo) em uma única requisição. "
+        "Cada consulta segue as mesmas regras do endpoint individual e os resultados são devolvidos na ordem de envio. "
+        "Conflitos de identificadores não interrompem o lote: a consulta afetada recebe `status=409` e o detalhe em `erro`."
+    ),
+    responses={
+        401: {"description": "Não autorizado (API Key/HMAC ausentes ou inválidos)."},
+        422: {"description": "Erro de validação do payload."},
+        500: {"description": "Erro interno."},
+    },
+)
+async def relacao_lote(
+    tipo_evento: TipoEvento = Path(
+        ...,
+        description="Tipo do evento que será consultado.",
+        examples=["violencia"],
+    ),
+    payload: RelacaoLoteRequest = ...,
+    request: Request = ...,
+) -> Response:
+    consultas = [
+        [(i.tipo, i.valor) for i in consulta.identificadores]
+        for consulta in payload.consultas
+    ]
+
+    resultados = await service.buscar_eventos_relacionados_lote(
+        endpoint=str(request.url.path),
+        tipo_evento=tipo_evento,
+        consultas=consultas,
     )
+
+    itens: list[dict] = []
+    for resultado in resultados:
+        if resultado is None:
+            itens.append(_ITEM_LOTE_NEGATIVO)
+        elif isinstance(resultado, IdentificadoresConflitantesError):
+            itens.append(
+                {
+                    **_CAMPOS_NEGATIVO,
+                    "status": 409,
+                    "erro": {"detail": str(resultado), "code": "IDENTIFICADORES_CONFLITANTES"},
+                }
+            )
+        else:
+            itens.append({**_campos_evento(resultado), "status": 200, "erro": None})
+
+    return _resposta_json(orjson.dumps({"resultados": itens}))
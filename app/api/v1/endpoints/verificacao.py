@@ -0,0 +1,80 @@
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.db.session import conexao_psycopg
+from app.services.exceptions import ListaPessoasGrandeDemaisError, ListaPessoasInvalidaError
+from app.services.verificacao_pessoas import (
+    COLUNAS_SAIDA,
+    TIPOS_CONTEUDO,
+    FormatoSaida,
+    VerificacaoPessoasService,
+)
+
+router = APIRouter(tags=["verificacao"])
+service = VerificacaoPessoasService()
+
+
+async def _transmitir(partes: AsyncIterator[bytes], pilha: AsyncExitStack) -> AsyncIterator[bytes]:
+    try:
+        async for parte in partes:
+            yield parte
+    finally:
+        await pilha.aclose()
+
+
+@router.post(
+    "/verificacao/pessoas",
+    summary="Verificar alerta de uma lista de pessoas",
+    description=(
+        "Recebe no corpo um CSV (UTF-8, com cabeçalho) com a coluna `id_pessoa`; as demais colunas são "
+        "ignoradas. Devolve, em streaming e na ordem de envio, uma linha por pessoa com "
+        f"`{'`, `'.join(COLUNAS_SAIDA)}`. O `status` é um de: `NO BANCO DE ALERTA`, `avaliado, sem alerta`, "
+        "`encontrado, sem evento registrado`, `id_pessoa não encontrado na base`, `id_pessoa inválido` e "
+        "`id_pessoa vazio na planilha (linkage não identificou)`. "
+        f"Máximo de {settings.VERIFICACAO_PESSOAS_MAX_LINHAS} linhas."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}, "example": "row_id,id_pessoa\n1,123\n2,\n"}},
+        }
+    },
+    responses={
+        200: {"content": {tipo: {} for tipo in TIPOS_CONTEUDO.values()}},
+        401: {"description": "Não autorizado (API Key/HMAC ausentes ou inválidos)."},
+        413: {"description": "Lista acima do limite de linhas."},
+        422: {"description": "CSV inválido ou sem a coluna id_pessoa."},
+        500: {"description": "Erro interno."},
+    },
+)
+async def verificar_pessoas(
+    request: Request,
+    formato: FormatoSaida = Query("csv", description="Formato da resposta: `csv` ou `ndjson`."),
+) -> StreamingResponse:
+    # A conexão fica aberta até o fim da resposta; erros da entrada aparecem
+    # no COPY, antes de a resposta começar.
+    pilha = AsyncExitStack()
+    try:
+        conn = await pilha.enter_async_context(conexao_psycopg())
+        linhas = await service.carregar(
+            conn, request.stream(), max_linhas=settings.VERIFICACAO_PESSOAS_MAX_LINHAS
+        )
+    except ListaPessoasInvalidaError as e:
+        await pilha.aclose()
+        raise HTTPException(status_code=422, detail=str(e))
+    except ListaPessoasGrandeDemaisError as e:
+        await pilha.aclose()
+        raise HTTPException(status_code=413, detail=str(e))
+    except BaseException:
+        await pilha.aclose()
+        raise
+
+    return StreamingResponse(
+        _transmitir(service.gerar(conn, formato), pilha),
+        media_type=TIPOS_CONTEUDO[formato],
+        headers={"X-Total-Linhas": str(linhas)},
+    )
@@ -1,6 +1,12 @@
 from fastapi import APIRouter, Depends
+from app.api.v1.endpoints.diagnostico import router as diagnostico_router
+from app.api.v1.endpoints.estatisticas import router as estatisticas_router
 from app.api.v1.endpoints.relacao import router as relacao_router
+from app.api.v1.endpoints.verificacao import router as verificacao_router
 from app.core.auth_deps import swagger_api_key, swagger_hmac_headers
 
 api_router = APIRouter(dependencies=[Depends(swagger_api_key), Depends(swagger_hmac_headers)])
 api_router.include_router(relacao_router)
+api_router.include_router(estatisticas_router)
+api_router.include_router(verificacao_router)
+api_router.include_router(diagnostico_router)
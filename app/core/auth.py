@@ -1,13 +1,16 @@
 import hmac
 import time
 import hashlib
-from typing import Iterable, Optional
+from collections import deque
+from collections.abc import Callable
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.prometheus import ERROS, ETAPA_AUTH
 
 
 EXEMPT_PATH_PREFIXES = (
@@ -15,9 +18,15 @@ EXEMPT_PATH_PREFIXES = (
     "/docs",
     "/openapi.json",
     "/redoc",
+    "/metrics",
 )
 
 
+# Rotas que leem o body inteiro antes de gravar ou responder (uploads
+# grandes): o HMAC é conferido enquanto a aplicação lê o body, sem guardá-lo.
+HMAC_EM_STREAMING_PATHS = frozenset({"/api/v1/verificacao/pessoas"})
+
+
 def _is_exempt_path(path: str) -> bool:
     return any(path == p or path.startswith(p + "/") for p in EXEMPT_PATH_PREFIXES)
 
@@ -34,16 +43,8 @@ def _normalize_timestamp(ts_raw: str) -> Optional[int]:
     return ts_int
 
 
-def _sha256_hex(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
-
-
-def _build_signing_string(request: Request, ts_seconds: int, body_hash_hex: str) -> str:
-    query = request.url.query
-    path = request.url.path
-    method = request.method.upper()
-
-    return "\n".join([str(ts_seconds), method, path, query, body_hash_hex])
+def _build_signing_string(method: str, path: str, query: str, ts_seconds: int, body_hash_hex: str) -> str:
+    return "\n".join([str(ts_seconds), method.upper(), path, query, body_hash_hex])
 
 
 def _compute_hmac_hex(secret: str, signing_string: str) -> str:
@@ -51,57 +52,164 @@ def _compute_hmac_hex(secret: str, signing_string: str) -> str:
     return mac.hexdigest()
 
 
-class ApiAuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
+class _AssinaturaInvalida(Exception):
+    pass
+
+
+# HMAC conferido enquanto a aplicação lê o body, que não é guardado: a última
+# mensagem do body só é entregue se a assinatura confere; senão a leitura
+# levanta _AssinaturaInvalida (a transação do endpoint é desfeita) e o
+# middleware responde 401. Se a aplicação começar a responder antes de ler o
+# body inteiro, o restante é lido aqui e a resposta só sai com a assinatura
+# conferida.
+class _AssinaturaEmStreaming:
+    def __init__(self, receive: Receive, send: Send, confere: Callable[[str], bool]) -> None:
+        self._receive = receive
+        self._send = send
+        self._confere = confere
+        self._hasher = hashlib.sha256()
+        self._conferida = False
+
+    async def receive(self) -> Message:
+        if self._conferida:
+            return await self._receive()
+        message = await self._receive()
+        if message["type"] == "http.disconnect":
+            raise _AssinaturaInvalida
+        self._hasher.update(message.get("body", b""))
+        if not message.get("more_body", False):
+            if not self._confere(self._hasher.hexdigest()):
+                raise _AssinaturaInvalida
+            self._conferida = True
+        return message
+
+    async def send(self, message: Message) -> None:
+        while not self._conferida:
+            await self.receive()
+        await self._send(message)
+
+
+# Middleware ASGI puro: evita a task e o encapsulamento de streams do
+# BaseHTTPMiddleware. Chaves, origens e parâmetros de HMAC são lidos uma vez,
+# quando a pilha de middlewares é montada.
+class ApiAuthMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._api_keys = frozenset(settings.api_keys_list())
+        self._allowed_origins = frozenset(settings.allowed_origins_list())
+        self._enforce_origin_check = settings.ENFORCE_ORIGIN_CHECK
+        self._hmac_required = settings.hmac_required
+        self._api_secret = settings.API_SECRET
+        self._timestamp_tolerance = settings.TIMESTAMP_TOLERANCE_SECONDS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 0) Ignorar pre-flight
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # 1) Exceções
-        if _is_exempt_path(request.url.path):
-            return await call_next(request)
+        if _is_exempt_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        verificada = await self._verificar(scope, receive, send)
+        ETAPA_AUTH.observe(time.perf_counter() - inicio)
+
+        if verificada is None:
+            return
+        if isinstance(verificada, _AssinaturaEmStreaming):
+            try:
+                await self.app(scope, verificada.receive, verificada.send)
+            except _AssinaturaInvalida:
+                await _reject(scope, receive, send, "Invalid signature", 401)
+            return
+        await self.app(scope, verificada, send)
+
+    # Devolve o `receive` a repassar à aplicação (ou, nas rotas de
+    # HMAC_EM_STREAMING_PATHS, o verificador incremental), ou None se a
+    # requisição foi rejeitada (resposta já enviada) ou o cliente desconectou.
+    async def _verificar(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> Receive | _AssinaturaEmStreaming | None:
+        path = scope["path"]
+        headers = Headers(scope=scope)
 
         # 2) Validação de origem (complementa CORS; fácil desligar por env)
-        if settings.ENFORCE_ORIGIN_CHECK:
-            origin = request.headers.get("origin")
-            allowed = set(settings.allowed_origins_list())
-
-            if origin and allowed and origin not in allowed:
-                return JSONResponse({"detail": "Origin not allowed"}, status_code=403)
+        if self._enforce_origin_check:
+            origin = headers.get("origin")
+            if origin and self._allowed_origins and origin not in self._allowed_origins:
+                await _reject(scope, receive, send, "Origin not allowed", 403)
+                return None
 
         # 3) API key (header)
-        api_key = request.headers.get("x-api-key")
-        valid_keys: Iterable[str] = settings.api_keys_list()
-        if not api_key or api_key not in valid_keys:
-            return JSONResponse({"detail": "Unauthorized"}, status_code=401)
-        
+        api_key = headers.get("x-api-key")
+        if not api_key or api_key not in self._api_keys:
+            await _reject(scope, receive, send, "Unauthorized", 401)
+            return None
+
         # 4) Decide se exige HMAC
-        if not settings.hmac_required:
-            return await call_next(request)
+        if not self._hmac_required:
+            return receive
 
         # 5) Timestamp (anti-replay)
-        ts_raw = request.headers.get("x-timestamp")
+        ts_raw = headers.get("x-timestamp")
         ts_seconds = _normalize_timestamp(ts_raw) if ts_raw else None
         if ts_seconds is None:
-            return JSONResponse({"detail": "Missing/invalid X-Timestamp"}, status_code=401)
+            await _reject(scope, receive, send, "Missing/invalid X-Timestamp", 401)
+            return None
 
         now = int(time.time())
-        if abs(now - ts_seconds) > settings.TIMESTAMP_TOLERANCE_SECONDS:
-            return JSONResponse({"detail": "Stale request"}, status_code=401)
-
-        # 6) Body hash
-        body_bytes = await request.body()
-        body_hash = _sha256_hex(body_bytes)
+        if abs(now - ts_seconds) > self._timestamp_tolerance:
+            await _reject(scope, receive, send, "Stale request", 401)
+            return None
+
+        signature = headers.get("x-signature")
+        if not signature or not self._api_secret:
+            await _reject(scope, receive, send, "Missing signature/secret", 401)
+            return None
+
+        query = scope.get("query_string", b"").decode()
+
+        def _assinatura_confere(body_hash_hex: str) -> bool:
+            signing_string = _build_signing_string(scope["method"], path, query, ts_seconds, body_hash_hex)
+            return hmac.compare_digest(signature, _compute_hmac_hex(self._api_secret, signing_string))
+
+        if path in HMAC_EM_STREAMING_PATHS:
+            return _AssinaturaEmStreaming(receive, send, _assinatura_confere)
+
+        # 6) Body hash: calculado incrementalmente; as mensagens recebidas são
+        # guardadas como chegaram e repassadas depois, sem concatenar o body.
+        hasher = hashlib.sha256()
+        mensagens: deque[Message] = deque()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            hasher.update(message.get("body", b""))
+            mensagens.append(message)
+            if not message.get("more_body", False):
+                break
 
         # 7) Assinatura HMAC
-        signature = request.headers.get("x-signature")
-        if not signature or not settings.API_SECRET:
-            return JSONResponse({"detail": "Missing signature/secret"}, status_code=401)
+        if not _assinatura_confere(hasher.hexdigest()):
+            await _reject(scope, receive, send, "Invalid signature", 401)
+            return None
+
+        async def replay() -> Message:
+            if mensagens:
+                return mensagens.popleft()
+            return await receive()
 
-        signing_string = _build_signing_string(request, ts_seconds, body_hash)
-        expected = _compute_hmac_hex(settings.API_SECRET, signing_string)
+        return replay
 
-        if not hmac.compare_digest(signature, expected):
-            return JSONResponse({"detail": "Invalid signature"}, status_code=401)
 
-        return await call_next(request)
+async def _reject(scope: Scope, receive: Receive, send: Send, detail: str, status_code: int) -> None:
+    ERROS.labels(f"auth_{status_code}").inc()
+    response = JSONResponse({"detail": detail}, status_code=status_code)
+    await response(scope, receive, send)
@@ -0,0 +1,66 @@
+import math
+from collections.abc import Iterable
+from hashlib import blake2b
+
+MAX_HASHES = 16
+
+
+def _hashes(chave: bytes) -> tuple[int, int]:
+    digest = blake2b(chave, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+# Filtro de Bloom sobre chaves em bytes: `in` pode dar falso positivo (com a
+# taxa escolhida no dimensionamento), mas nunca falso negativo. As k posições
+# vêm de um único blake2b de 128 bits (h1 + i*h2, Kirsch-Mitzenmacher).
+class FiltroBloom:
+    __slots__ = ("bits", "num_bits", "num_hashes", "itens")
+
+    def __init__(self, num_bits: int, num_hashes: int) -> None:
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, min(MAX_HASHES, num_hashes))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.itens = 0
+
+    @classmethod
+    def dimensionar(
+        cls, itens: int, *, taxa_falso_positivo: float, memoria_max_bytes: int
+    ) -> "FiltroBloom":
+        # m = -n ln(p) / ln(2)^2 e k = m/n ln(2); o limite de memória prevalece
+        # sobre a taxa (que então fica maior que a pedida).
+        itens = max(1, itens)
+        num_bits = math.ceil(-itens * math.log(taxa_falso_positivo) / math.log(2) ** 2)
+        num_bits = min(num_bits, memoria_max_bytes * 8)
+        return cls(num_bits, round(num_bits / itens * math.log(2)))
+
+    def adicionar(self, chave: bytes) -> None:
+        self.adicionar_varios((chave,))
+
+    # Laço com tudo em variáveis locais: é o custo da construção do filtro.
+    def adicionar_varios(self, chaves: Iterable[bytes]) -> None:
+        bits, m, k = self.bits, self.num_bits, self.num_hashes
+        n = 0
+        for chave in chaves:
+            h1, h2 = _hashes(chave)
+            for _ in range(k):
+                posicao = h1 % m
+                bits[posicao >> 3] |= 1 << (posicao & 7)
+                h1 += h2
+            n += 1
+        self.itens += n
+
+    def __contains__(self, chave: bytes) -> bool:
+        h1, h2 = _hashes(chave)
+        bits, m = self.bits, self.num_bits
+        for _ in range(self.num_hashes):
+            posicao = h1 % m
+            if not bits[posicao >> 3] & (1 << (posicao & 7)):
+                return False
+            h1 += h2
+        return True
+
+    @property
+    def taxa_falso_positivo_estimada(self) -> float:
+        if not self.itens:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.itens / self.num_bits)) ** self.num_hashes
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from app.core.prometheus import CACHE_EVENTOS
+
+
+# Cache em memória (por worker) com remoção LRU e expiração por TTL.
+# Valores `None` também são guardados; por isso `obter` devolve
+# `(encontrado, valor)`. `geracao` muda a cada `limpar()`: quem leu a geração
+# antes de consultar a origem passa o valor a `guardar` para não repor no cache
+# um resultado calculado antes da invalidação. Com `nome`, os eventos também
+# são contados em /metrics (api_cache_eventos_total).
+class CacheLRU:
+    def __init__(self, *, max_itens: int, ttl_segundos: float, nome: str | None = None) -> None:
+        self._max_itens = max_itens
+        self._ttl_segundos = ttl_segundos
+        self._itens: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.geracao = 0
+
+        self.acertos = 0
+        self.falhas = 0
+        self.expiracoes = 0
+        self.remocoes_lru = 0
+        self.invalidacoes = 0
+
+        self._eventos = (
+            {
+                evento: CACHE_EVENTOS.labels(nome, evento)
+                for evento in ("acerto", "falha", "expiracao", "remocao_lru", "invalidacao")
+            }
+            if nome
+            else None
+        )
+
+    def _contar(self, evento: str) -> None:
+        if self._eventos is not None:
+            self._eventos[evento].inc()
+
+    @property
+    def habilitado(self) -> bool:
+        return self._max_itens > 0
+
+    def obter(self, chave: Hashable) -> tuple[bool, Any]:
+        item = self._itens.get(chave)
+        if item is None:
+            self.falhas += 1
+            self._contar("falha")
+            return False, None
+
+        expira_em, valor = item
+        if expira_em <= time.monotonic():
+            del self._itens[chave]
+            self.expiracoes += 1
+            self.falhas += 1
+            self._contar("expiracao")
+            self._contar("falha")
+            return False, None
+
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        self._contar("acerto")
+        return True, valor
+
+    def guardar(self, chave: Hashable, valor: Any, *, geracao: int | None = None) -> None:
+        if not self.habilitado:
+            return
+        if geracao is not None and geracao != self.geracao:
+            return
+
+        self._itens[chave] = (time.monotonic() + self._ttl_segundos, valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self._max_itens:
+            self._itens.popitem(last=False)
+            self.remocoes_lru += 1
+            self._contar("remocao_lru")
+
+    def limpar(self) -> None:
+        self._itens.clear()
+        self.geracao += 1
+        self.invalidacoes += 1
+        self._contar("invalidacao")
+
+    def estatisticas(self) -> dict[str, int | float]:
+        consultas = self.acertos + self.falhas
+        return {
+            "itens": len(self._itens),
+            "max_itens": self._max_itens,
+            "ttl_segundos": self._ttl_segundos,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "expiracoes": self.expiracoes,
+            "remocoes_lru": self.remocoes_lru,
+            "invalidacoes": self.invalidacoes,
+        }
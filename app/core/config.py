@@ -18,6 +18,55 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 5
     DATABASE_POOL_TIMEOUT: int = 60  # segundos
+    # Execuções de um mesmo comando antes de virar prepared statement no servidor
+    # (0 = prepara na primeira execução; negativo desativa, ex.: PgBouncer em modo transaction)
+    DATABASE_PREPARE_THRESHOLD: int = 0
+    # Conexões são substituídas após este tempo (0 desativa); com os keepalives
+    # TCP, dispensa o SELECT 1 (pre-ping) a cada checkout
+    DATABASE_POOL_RECYCLE_SEGUNDOS: int = 1800
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_TCP_KEEPALIVE_SEGUNDOS: int = 30
+    # Abre DATABASE_POOL_SIZE conexões na subida do worker, antes de aceitar requisições
+    DATABASE_AQUECER_POOL: bool = True
+    # Comandos SQL acima deste tempo são logados (consulta_lenta); negativo desativa
+    DATABASE_CONSULTA_LENTA_MS: float = 200.0
+    # Inclui o plano (EXPLAIN, sem ANALYZE) no log de consultas lentas
+    DATABASE_CONSULTA_LENTA_EXPLAIN: bool = False
+
+    # Métricas diárias (agregadas em memória por worker e gravadas em lote)
+    METRICAS_FLUSH_INTERVALO_SEGUNDOS: float = 5.0
+    METRICAS_FLUSH_MAX_CHAVES: int = 500
+    METRICAS_MAX_CHAVES_PENDENTES: int = 10000
+    # Faixas por chave em metricas_diarias_endpoint_faixa (cada worker grava em uma)
+    METRICAS_FAIXAS: int = 8
+    # Intervalo da compactação das faixas dos dias anteriores; 0 desativa
+    METRICAS_COMPACTACAO_INTERVALO_SEGUNDOS: float = 3600.0
+
+    # /api/v1/estatisticas: rollup estatisticas_diarias, atualizado a cada
+    # intervalo (0 desativa) recalculando os últimos JANELA_DIAS dias
+    ESTATISTICAS_ATUALIZACAO_INTERVALO_SEGUNDOS: float = 60.0
+    ESTATISTICAS_JANELA_DIAS: int = 2
+    # Cache das respostas (por worker). 0 itens desativa o cache.
+    ESTATISTICAS_CACHE_MAX_ITENS: int = 256
+    ESTATISTICAS_CACHE_TTL_SEGUNDOS: float = 30.0
+
+    # Limite de linhas de /api/v1/verificacao/pessoas (a lista ocupa uma
+    # conexão do pool enquanto a resposta é enviada)
+    VERIFICACAO_PESSOAS_MAX_LINHAS: int = 2_000_000
+
+    # Cache de resultados de /relacao (por worker). 0 itens desativa o cache.
+    CACHE_RELACAO_MAX_ITENS: int = 50000
+    CACHE_RELACAO_TTL_SEGUNDOS: float = 300.0
+    # Intervalo de consulta a monitoramento.dataset_versao (invalidação após cargas)
+    DATASET_VERSAO_INTERVALO_SEGUNDOS: float = 5.0
+    # Filtro de Bloom dos identificadores carregados (por worker): consultas sem
+    # nenhum identificador conhecido são respondidas sem ir ao banco
+    FILTRO_IDENTIFICADORES_HABILITADO: bool = True
+    FILTRO_IDENTIFICADORES_TAXA_FALSO_POSITIVO: float = 0.01
+    FILTRO_IDENTIFICADORES_MEMORIA_MAX_MB: int = 64
+    # Snapshot de /relacao gerado pelo loader (--snapshot); vazio desativa
+    SNAPSHOT_RELACAO_CAMINHO: str = ""
+    SNAPSHOT_RELACAO_INTERVALO_SEGUNDOS: float = 5.0
 
     # Auth
     # Lista chaves separadas por vírgula: "key1,key2,key3"
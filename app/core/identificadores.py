@@ -0,0 +1,55 @@
+from typing import NamedTuple
+
+# Armazenamento dos identificadores em monitoramento.individuo_identificador
+# (V13): o tipo vira um código SMALLINT e o valor, quando tem exatamente a
+# quantidade de dígitos do tipo, um BIGINT (valor_numerico); os demais valores
+# (e tipos sem `digitos`) ficam como texto (valor_texto). Manter estes códigos
+# idênticos aos de monitoramento.tipo_identificador (V13; conferido em
+# tests/test_identificadores.py): o loader e a API usam esta tabela, as
+# consultas SQL usam a do banco. Os códigos a partir de 100 (tipos antigos,
+# sempre em texto) existem só no banco.
+
+
+class TipoIdentificador(NamedTuple):
+    codigo: int
+    digitos: int | None
+
+
+TIPOS_IDENTIFICADOR: dict[str, TipoIdentificador] = {
+    "cpf": TipoIdentificador(1, 11),
+    "cns": TipoIdentificador(2, 15),
+}
+
+NOMES_POR_CODIGO = {tipo.codigo: nome for nome, tipo in TIPOS_IDENTIFICADOR.items()}
+
+# Valor em texto (com os zeros à esquerda) a partir das colunas armazenadas,
+# com `ii` = individuo_identificador e `t` = tipo_identificador.
+VALOR_TEXTO_SQL = "COALESCE(lpad(ii.valor_numerico::text, t.digitos, '0'), ii.valor_texto)"
+
+
+class IdentificadorCodificado(NamedTuple):
+    tipo_codigo: int
+    valor_numerico: int | None
+    valor_texto: str | None
+
+
+# None quando o tipo não é conhecido: nenhum identificador dele foi carregado.
+def codificar_identificador(tipo: str, valor: str) -> IdentificadorCodificado | None:
+    info = TIPOS_IDENTIFICADOR.get(tipo)
+    if info is None:
+        return None
+    if info.digitos is not None and len(valor) == info.digitos and valor.isascii() and valor.isdigit():
+        return IdentificadorCodificado(info.codigo, int(valor), None)
+    return IdentificadorCodificado(info.codigo, None, valor)
+
+
+def decodificar_identificador(
+    tipo_codigo: int, valor_numerico: int | None, valor_texto: str | None
+) -> tuple[str, str]:
+    nome = NOMES_POR_CODIGO.get(tipo_codigo, str(tipo_codigo))
+    if valor_numerico is None:
+        return nome, valor_texto or ""
+    info = TIPOS_IDENTIFICADOR.get(nome)
+    if info is None or info.digitos is None:
+        return nome, str(valor_numerico)
+    return nome, str(valor_numerico).zfill(info.digitos)
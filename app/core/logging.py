@@ -2,10 +2,13 @@ import sys
 import logging
 import time
 import uuid
+from contextvars import ContextVar
 
 import orjson
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.prometheus import ERROS, REQUISICOES
 
 
 def configure_logging(level: str = "INFO") -> None:
@@ -17,40 +20,71 @@ def configure_logging(level: str = "INFO") -> None:
 
 logger = logging.getLogger("app.request")
 
+# Request id da requisição em andamento, para logs emitidos fora do middleware
+# (ex.: consultas lentas em app/db/instrumentacao.py).
+request_id_atual: ContextVar[str | None] = ContextVar("request_id_atual", default=None)
+
+
+def _observar(scope: Scope, status_code: int, duration: float) -> None:
+    # Rota como template (ex.: /api/v1/relacao/{tipo_evento}), definida pelo
+    # roteador no scope; sem rota (404), um rótulo fixo evita cardinalidade.
+    rota = getattr(scope.get("route"), "path", None) or "nao_encontrada"
+    REQUISICOES.labels(rota, scope["method"], str(status_code)).observe(duration)
+
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-Id") or str(uuid.uuid4())
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
         start = time.perf_counter()
+        status_code = 500
+        token = request_id_atual.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-Id"] = request_id
+            await send(message)
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_request_id)
         except Exception:
+            ERROS.labels("excecao_nao_tratada").inc()
+            _observar(scope, 500, time.perf_counter() - start)
             logger.exception(
                 orjson.dumps(
                     {
                         "event": "error",
                         "request_id": request_id,
-                        "method": request.method,
-                        "path": request.url.path,
+                        "method": scope["method"],
+                        "path": scope["path"],
                     }
                 ).decode()
             )
             raise
+        finally:
+            request_id_atual.reset(token)
 
-        duration_ms = (time.perf_counter() - start) * 1000.0
-        response.headers["X-Request-Id"] = request_id
+        duration = time.perf_counter() - start
+        _observar(scope, status_code, duration)
+        duration_ms = duration * 1000.0
 
         logger.info(
             orjson.dumps(
                 {
                     "event": "request",
                     "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
                     "duration_ms": round(duration_ms, 2),
                 }
             ).decode()
         )
-        return response
@@ -0,0 +1,90 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Métricas de runtime no formato do Prometheus (GET /metrics).
+#
+# Com Gunicorn, cada worker grava os valores em arquivos mmap no diretório de
+# PROMETHEUS_MULTIPROC_DIR (definido em scripts/start.sh) e o /metrics de
+# qualquer worker agrega todos eles. Sem a variável (dev, testes), vale o
+# registro do próprio processo.
+
+BUCKETS_SEGUNDOS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUISICOES = Histogram(
+    "api_requisicao_duracao_segundos",
+    "Duração das requisições HTTP por rota (template), método e status.",
+    ["rota", "metodo", "status"],
+    buckets=BUCKETS_SEGUNDOS,
+)
+
+ETAPAS = Histogram(
+    "api_etapa_duracao_segundos",
+    "Duração das etapas do processamento de uma consulta.",
+    ["etapa"],
+    buckets=BUCKETS_SEGUNDOS,
+)
+
+ERROS = Counter(
+    "api_erros",
+    "Erros por tipo (exceções não tratadas, rejeições de autenticação, conflitos, flush de métricas).",
+    ["tipo"],
+)
+
+CACHE_EVENTOS = Counter(
+    "api_cache_eventos",
+    "Eventos dos caches em memória (acerto, falha, expiracao, remocao_lru, invalidacao).",
+    ["cache", "evento"],
+)
+
+POOL_CONEXOES = Gauge(
+    "api_db_pool_conexoes",
+    "Conexões do pool do SQLAlchemy, somadas entre os workers (abertas, em_uso).",
+    ["estado"],
+    multiprocess_mode="livesum",
+)
+
+# Séries usadas no caminho quente, resolvidas uma vez.
+ETAPA_AUTH = ETAPAS.labels(etapa="auth")
+ETAPA_RESOLUCAO_IDENTIFICADORES = ETAPAS.labels(etapa="resolucao_identificadores")
+ETAPA_SELECAO_EVENTO = ETAPAS.labels(etapa="selecao_evento")
+# /relacao resolve identificadores e seleciona o evento numa única consulta.
+ETAPA_RESOLUCAO_E_SELECAO = ETAPAS.labels(etapa="resolucao_e_selecao")
+ETAPA_ESCRITA_METRICAS = ETAPAS.labels(etapa="escrita_metricas")
+# Obter uma conexão do pool (espera com o pool esgotado + abertura de conexões).
+ETAPA_ESPERA_POOL = ETAPAS.labels(etapa="espera_pool")
+# Resolução e seleção pelo snapshot em mmap, sem SQL.
+ETAPA_SNAPSHOT = ETAPAS.labels(etapa="snapshot")
+
+
+def gerar_metricas() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,295 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections.abc import Iterable
+from datetime import date
+from pathlib import Path
+from typing import IO
+
+from app.db.repositories.relacao_repo import EventoRelacionado
+
+# Snapshot imutável das consultas de /relacao, gerado pelo loader
+# (scripts/load_parquet.py --snapshot) e lido pelos workers via mmap
+# (app/services/snapshot_relacao.py).
+#
+# Layout (little-endian):
+#   cabeçalho  CABECALHO, com o sha256 de tudo o que vem depois dele
+#   identificadores  n x (chave de 16 bytes, individuo_id), ordenado pela chave
+#   eventos    n x EVENTO: o evento de alerta prioritário por
+#              (individuo_id, tipo_evento), ordenado por individuo_id
+#   strings    u16 tamanho + UTF-8 (até STRING_MAX_BYTES); os eventos guardam
+#              o offset (NULO = None)
+#
+# A chave é o sha256 (truncado em 16 bytes) de "tipo\x1fvalor": o loader a
+# calcula no Postgres e a API em Python (chave_snapshot).
+
+MAGICO = b"VSRELSNP"
+FORMATO = 1
+CABECALHO = struct.Struct("<8sIIQQQQQQQQ32s")
+IDENTIFICADOR = struct.Struct("<16sq")
+EVENTO = struct.Struct("<qIIiII")
+TAMANHO_STRING = struct.Struct("<H")
+STRING_MAX_BYTES = 0xFFFF
+NULO = 0xFFFFFFFF
+_EPOCA = date(1970, 1, 1).toordinal()
+_BUFFER_BYTES = 1 << 20
+
+
+class SnapshotInvalido(Exception):
+    pass
+
+
+def chave_snapshot(tipo: str, valor: str) -> bytes:
+    return hashlib.sha256(f"{tipo}\x1f{valor}".encode()).digest()[:16]
+
+
+class _Strings:
+    # Strings de vocabulário pequeno (tipo_evento, método, banco) são gravadas
+    # uma vez; id_registro_identificacao vai sempre direto.
+    def __init__(self, arquivo: IO[bytes]) -> None:
+        self._arquivo = arquivo
+        self._repetidas: dict[str, int] = {}
+        self.tamanho = 0
+
+    def gravar(self, valor: str | None, *, repetida: bool = False) -> int:
+        if valor is None:
+            return NULO
+        if repetida and valor in self._repetidas:
+            return self._repetidas[valor]
+        dados = valor.encode()
+        if len(dados) > STRING_MAX_BYTES:
+            raise SnapshotInvalido(
+                f"string de {len(dados)} bytes excede o limite de {STRING_MAX_BYTES} bytes "
+                f"do snapshot: {valor[:40]!r}..."
+            )
+        offset = self.tamanho
+        if offset + TAMANHO_STRING.size + len(dados) >= NULO:
+            raise SnapshotInvalido("tabela de strings maior que 4 GB")
+        self._arquivo.write(TAMANHO_STRING.pack(len(dados)) + dados)
+        self.tamanho += TAMANHO_STRING.size + len(dados)
+        if repetida:
+            self._repetidas[valor] = offset
+        return offset
+
+
+# Grava o snapshot em um arquivo temporário no mesmo diretório e o move para
+# `caminho` com os.replace: os workers veem o arquivo antigo ou o novo inteiro.
+# `identificadores` deve vir ordenado pela chave e `eventos` por individuo_id.
+def escrever_snapshot(
+    caminho: Path,
+    *,
+    dataset_versao: int,
+    identificadores: Iterable[tuple[bytes, int]],
+    eventos: Iterable[tuple[int, str, str, date, str | None, str | None]],
+) -> dict[str, int]:
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    sha = hashlib.sha256()
+    fd, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=f".{caminho.name}.")
+    try:
+        with os.fdopen(fd, "wb") as arquivo, tempfile.TemporaryFile() as spool:
+            arquivo.write(b"\0" * CABECALHO.size)
+            buffer = bytearray()
+
+            def _gravar(dados: bytes) -> None:
+                buffer.extend(dados)
+                if len(buffer) >= _BUFFER_BYTES:
+                    _descarregar()
+
+            def _descarregar() -> None:
+                sha.update(buffer)
+                arquivo.write(buffer)
+                buffer.clear()
+
+            n_identificadores = 0
+            anterior = b""
+            for chave, individuo_id in identificadores:
+                if chave <= anterior:
+                    raise SnapshotInvalido("identificadores fora de ordem ou chave repetida")
+                anterior = chave
+                _gravar(IDENTIFICADOR.pack(chave, individuo_id))
+                n_identificadores += 1
+
+            strings = _Strings(spool)
+            n_eventos = 0
+            individuo_anterior = None
+            for individuo_id, tipo_evento, metodo, data, banco, id_registro in eventos:
+                if individuo_anterior is not None and individuo_id < individuo_anterior:
+                    raise SnapshotInvalido("eventos fora de ordem")
+                individuo_anterior = individuo_id
+                _gravar(
+                    EVENTO.pack(
+                        individuo_id,
+                        strings.gravar(tipo_evento, repetida=True),
+                        strings.gravar(metodo, repetida=True),
+                        data.toordinal() - _EPOCA,
+                        strings.gravar(banco, repetida=True),
+                        strings.gravar(id_registro),
+                    )
+                )
+                n_eventos += 1
+            _descarregar()
+
+            spool.seek(0)
+            while bloco := spool.read(_BUFFER_BYTES):
+                sha.update(bloco)
+                arquivo.write(bloco)
+
+            off_identificadores = CABECALHO.size
+            off_eventos = off_identificadores + n_identificadores * IDENTIFICADOR.size
+            off_strings = off_eventos + n_eventos * EVENTO.size
+            tamanho = off_strings + strings.tamanho
+
+            arquivo.seek(0)
+            arquivo.write(
+                CABECALHO.pack(
+                    MAGICO,
+                    FORMATO,
+                    0,
+                    dataset_versao,
+                    int(time.time()),
+                    n_identificadores,
+                    n_eventos,
+                    off_identificadores,
+                    off_eventos,
+                    off_strings,
+                    tamanho,
+                    sha.digest(),
+                )
+            )
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        Path(temporario).unlink(missing_ok=True)
+        raise
+
+    return {"identificadores": n_identificadores, "eventos": n_eventos, "bytes": tamanho}
+
+
+# Leitura do snapshot via mmap (somente leitura): as páginas ficam no page
+# cache e são compartilhadas entre os workers. As buscas são binárias e
+# síncronas; os resultados são copiados para fora do mmap.
+class SnapshotRelacao:
+    def __init__(self, caminho: Path, *, verificar_checksum: bool = True) -> None:
+        self.caminho = caminho
+        with open(caminho, "rb") as arquivo:
+            estado = os.fstat(arquivo.fileno())
+            if estado.st_size < CABECALHO.size:
+                raise SnapshotInvalido(f"{caminho}: arquivo menor que o cabeçalho")
+            self._mm = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identidade = (estado.st_dev, estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+        try:
+            (
+                magico,
+                formato,
+                _,
+                self.dataset_versao,
+                self.criado_em,
+                self.n_identificadores,
+                self.n_eventos,
+                self._off_identificadores,
+                self._off_eventos,
+                self._off_strings,
+                tamanho,
+                checksum,
+            ) = CABECALHO.unpack_from(self._mm, 0)
+
+            if magico != MAGICO:
+                raise SnapshotInvalido(f"{caminho}: não é um snapshot de relação")
+            if formato != FORMATO:
+                raise SnapshotInvalido(f"{caminho}: formato {formato} não suportado (esperado {FORMATO})")
+            if (
+                tamanho != len(self._mm)
+                or self._off_identificadores != CABECALHO.size
+                or self._off_eventos
+                != self._off_identificadores + self.n_identificadores * IDENTIFICADOR.size
+                or self._off_strings != self._off_eventos + self.n_eventos * EVENTO.size
+                or self._off_strings > tamanho
+            ):
+                raise SnapshotInvalido(f"{caminho}: tamanhos das seções não conferem")
+            if verificar_checksum:
+                sha = hashlib.sha256()
+                for inicio in range(CABECALHO.size, tamanho, 16 * _BUFFER_BYTES):
+                    sha.update(self._mm[inicio : min(tamanho, inicio + 16 * _BUFFER_BYTES)])
+                if sha.digest() != checksum:
+                    raise SnapshotInvalido(f"{caminho}: checksum não confere")
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def fechar(self) -> None:
+        self._mm.close()
+
+    def individuo(self, tipo: str, valor: str) -> int | None:
+        chave = chave_snapshot(tipo, valor)
+        mm, base, tamanho = self._mm, self._off_identificadores, IDENTIFICADOR.size
+        inicio, fim = 0, self.n_identificadores
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            posicao = base + meio * tamanho
+            atual = mm[posicao : posicao + 16]
+            if atual < chave:
+                inicio = meio + 1
+            elif atual > chave:
+                fim = meio
+            else:
+                individuo_id: int = struct.unpack_from("<q", mm, posicao + 16)[0]
+                return individuo_id
+        return None
+
+    def individuos(self, pares: list[tuple[str, str]]) -> list[int]:
+        encontrados = {self.individuo(tipo, valor) for tipo, valor in pares}
+        return sorted(i for i in encontrados if i is not None)
+
+    def _string(self, offset: int) -> str | None:
+        if offset == NULO:
+            return None
+        posicao = self._off_strings + offset
+        (tamanho,) = TAMANHO_STRING.unpack_from(self._mm, posicao)
+        inicio = posicao + TAMANHO_STRING.size
+        return self._mm[inicio : inicio + tamanho].decode()
+
+    def _string_obrigatoria(self, offset: int) -> str:
+        valor = self._string(offset)
+        if valor is None:
+            raise SnapshotInvalido(f"{self.caminho}: string obrigatória ausente no evento")
+        return valor
+
+    def evento(self, individuo_id: int, tipo_evento: str) -> EventoRelacionado | None:
+        mm, base, tamanho = self._mm, self._off_eventos, EVENTO.size
+        inicio, fim = 0, self.n_eventos
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if struct.unpack_from("<q", mm, base + meio * tamanho)[0] < individuo_id:
+                inicio = meio + 1
+            else:
+                fim = meio
+
+        for indice in range(inicio, self.n_eventos):
+            atual, tipo, metodo, dias, banco, id_registro = EVENTO.unpack_from(
+                mm, base + indice * tamanho
+            )
+            if atual != individuo_id:
+                break
+            if self._string(tipo) == tipo_evento:
+                return EventoRelacionado(
+                    individuo_id,
+                    self._string_obrigatoria(metodo),
+                    date.fromordinal(_EPOCA + dias),
+                    self._string(banco),
+                    self._string(id_registro),
+                )
+        return None
+
+    # Mesmo contrato de RelacaoRepository.buscar_evento_relacionado.
+    def buscar(
+        self, pares: list[tuple[str, str]], tipo_evento: str
+    ) -> tuple[list[int], EventoRelacionado | None]:
+        individuos = self.individuos(pares)
+        if len(individuos) != 1:
+            return individuos, None
+        return individuos, self.evento(individuos[0], tipo_evento)
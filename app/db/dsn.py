@@ -0,0 +1,12 @@
+# DSN libpq (psycopg) a partir de uma URL do SQLAlchemy, como a DATABASE_URL:
+# usado pelos scripts, que falam com o banco direto pelo psycopg.
+def dsn_psycopg(database_url: str) -> str:
+    url = database_url.strip().strip('"').strip("'")
+
+    if url.startswith("postgresql+psycopg://"):
+        return "postgresql://" + url.removeprefix("postgresql+psycopg://")
+
+    if url.startswith("postgresql+psycopg_async://"):
+        return "postgresql://" + url.removeprefix("postgresql+psycopg_async://")
+
+    return url
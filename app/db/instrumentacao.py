@@ -0,0 +1,188 @@
+import logging
+import re
+import time
+from typing import Any
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from app.core.logging import request_id_atual
+
+logger = logging.getLogger("app.db")
+
+# Comandos distintos acompanhados por worker; além disso, tudo vai para "outras".
+MAX_CONSULTAS_DISTINTAS = 200
+_OUTRAS = "outras"
+_EXPLICAVEIS = ("SELECT", "WITH")
+
+
+def _compactar(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+def _descrever(valor: Any) -> Any:
+    if valor is None or isinstance(valor, bool):
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    return type(valor).__name__
+
+
+# Parâmetros sem os valores (podem conter identificadores pessoais): só nome,
+# tipo e tamanho das listas.
+def redigir_parametros(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {chave: _descrever(valor) for chave, valor in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return {"lote": len(parameters), "primeiro": redigir_parametros(parameters[0])}
+        return [_descrever(valor) for valor in parameters]
+    return _descrever(parameters)
+
+
+# Tempo de cada comando SQL executado pelo engine, agregado por texto do
+# comando (por worker). Comandos acima de `limite_lento_ms` são logados com o
+# request_id da requisição, os parâmetros redigidos e, opcionalmente, o plano
+# (EXPLAIN, sem ANALYZE, dentro de um savepoint).
+class EstatisticasConsultas:
+    def __init__(self, *, limite_lento_ms: float, explain: bool = False) -> None:
+        self.limite_lento_ms = limite_lento_ms
+        self.explain = explain
+        # statement original -> [texto compacto, execuções, total_ms, max_ms, lentas]
+        self._por_statement: dict[str, list[Any]] = {}
+
+    def instrumentar(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._antes)
+        event.listen(engine, "after_cursor_execute", self._depois)
+        event.listen(engine, "handle_error", self._erro)
+
+    def _antes(
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+    def _erro(self, exception_context: ExceptionContext) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("inicio_consultas"):
+            conn.info["inicio_consultas"].pop()
+
+    def _depois(
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        duracao_ms = (time.perf_counter() - conn.info["inicio_consultas"].pop()) * 1000.0
+        lenta = 0 <= self.limite_lento_ms <= duracao_ms
+        self.registrar(statement, duracao_ms, lenta=lenta)
+        if lenta:
+            self._logar_lenta(conn, statement, parameters, duracao_ms)
+
+    def registrar(self, statement: str, duracao_ms: float, *, lenta: bool = False) -> None:
+        item = self._por_statement.get(statement)
+        if item is None:
+            if len(self._por_statement) >= MAX_CONSULTAS_DISTINTAS:
+                statement = _OUTRAS
+                item = self._por_statement.get(_OUTRAS)
+            if item is None:
+                texto = _OUTRAS if statement == _OUTRAS else _compactar(statement)
+                item = self._por_statement[statement] = [texto, 0, 0.0, 0.0, 0]
+        item[1] += 1
+        item[2] += duracao_ms
+        if duracao_ms > item[3]:
+            item[3] = duracao_ms
+        if lenta:
+            item[4] += 1
+
+    def _logar_lenta(self, conn: Connection, statement: str, parameters: Any, duracao_ms: float) -> None:
+        registro: dict[str, Any] = {
+            "event": "consulta_lenta",
+            "request_id": request_id_atual.get(),
+            "duracao_ms": round(duracao_ms, 2),
+            "consulta": _compactar(statement),
+            "parametros": redigir_parametros(parameters),
+        }
+        if self.explain and statement.lstrip().upper().startswith(_EXPLICAVEIS):
+            registro["plano"] = self._explicar(conn, statement, parameters)
+        logger.warning(orjson.dumps(registro, default=str).decode())
+
+    # Roda no mesmo contexto síncrono do evento (o adaptador async do SQLAlchemy
+    # faz a ponte), em outro cursor para não descartar o resultado original.
+    # O savepoint evita que uma falha do EXPLAIN aborte a transação da requisição.
+    def _explicar(self, conn: Connection, statement: str, parameters: Any) -> list[str] | str:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT explain_consulta_lenta")
+            try:
+                cursor.execute("EXPLAIN " + statement, parameters)
+                plano = [linha[0] for linha in cursor.fetchall()]
+            except Exception as exc:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+                return f"erro: {exc}"
+            cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+            return plano
+        except Exception as exc:
+            return f"erro: {exc}"
+        finally:
+            cursor.close()
+
+    def estatisticas(self) -> list[dict[str, Any]]:
+        itens = sorted(self._por_statement.values(), key=lambda item: item[2], reverse=True)
+        return [
+            {
+                "consulta": texto,
+                "execucoes": execucoes,
+                "total_ms": round(total_ms, 2),
+                "media_ms": round(total_ms / execucoes, 3),
+                "max_ms": round(max_ms, 2),
+                "lentas": lentas,
+            }
+            for texto, execucoes, total_ms, max_ms, lentas in itens
+        ]
+
+    def zerar(self) -> None:
+        self._por_statement.clear()
+
+
+# Tempo para obter uma conexão do pool (medido em app/db/session.py): inclui a
+# espera por uma conexão livre com o pool esgotado e a abertura de conexões.
+class EstatisticasPool:
+    def __init__(self) -> None:
+        self.retiradas = 0
+        self.espera_total_segundos = 0.0
+        self.espera_max_segundos = 0.0
+        self.timeouts = 0
+        self.overflow_max = 0
+
+    def registrar(self, espera_segundos: float, overflow: int) -> None:
+        self.retiradas += 1
+        self.espera_total_segundos += espera_segundos
+        if espera_segundos > self.espera_max_segundos:
+            self.espera_max_segundos = espera_segundos
+        if overflow > self.overflow_max:
+            self.overflow_max = overflow
+
+    def estatisticas(self) -> dict[str, int | float]:
+        return {
+            "retiradas": self.retiradas,
+            "espera_media_ms": (
+                round(self.espera_total_segundos / self.retiradas * 1000.0, 3)
+                if self.retiradas
+                else 0.0
+            ),
+            "espera_max_ms": round(self.espera_max_segundos * 1000.0, 3),
+            "timeouts": self.timeouts,
+            "overflow_max": self.overflow_max,
+        }
@@ -0,0 +1,10 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class DatasetRepository:
+    async def versao_atual(self, db: AsyncSession) -> int:
+        res = await db.execute(
+            text("SELECT versao FROM monitoramento.dataset_versao WHERE id = 1")
+        )
+        return res.scalar_one_or_none() or 0
@@ -0,0 +1,121 @@
+from datetime import date
+from typing import Any, NamedTuple, cast
+
+from sqlalchemy import CursorResult, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+class EstatisticaGeral(NamedTuple):
+    total_consultas: int
+    total_positivas: int
+    primeiro_dia: date | None
+    ultimo_dia: date | None
+    dias_com_atividade: int
+
+
+class EstatisticaMetodo(NamedTuple):
+    metodo_identificacao: str
+    chamadas: int
+    positivas: int
+
+
+class EstatisticaMensal(NamedTuple):
+    mes: str
+    total_consultas: int
+    positivas: int
+
+
+# Filtro de período comum às consultas; limites nulos não restringem.
+_PERIODO = """
+    tipo_evento = :tipo_evento
+    AND (CAST(:desde AS date) IS NULL OR data >= CAST(:desde AS date))
+    AND (CAST(:ate AS date) IS NULL OR data <= CAST(:ate AS date))
+"""
+
+_GERAL = text(
+    f"""
+    SELECT
+        COALESCE(SUM(total_chamadas), 0)::bigint,
+        COALESCE(SUM(respostas_positivas), 0)::bigint,
+        MIN(data),
+        MAX(data),
+        COUNT(DISTINCT data)
+    FROM monitoramento.estatisticas_diarias
+    WHERE {_PERIODO}
+    """
+)
+
+_POR_METODO = text(
+    f"""
+    SELECT metodo_identificacao, SUM(total_chamadas)::bigint, SUM(respostas_positivas)::bigint
+    FROM monitoramento.estatisticas_diarias
+    WHERE {_PERIODO}
+    GROUP BY metodo_identificacao
+    ORDER BY 2 DESC, metodo_identificacao
+    """
+)
+
+_MENSAL = text(
+    f"""
+    SELECT
+        TO_CHAR(DATE_TRUNC('month', data), 'YYYY-MM'),
+        SUM(total_chamadas)::bigint,
+        SUM(respostas_positivas)::bigint
+    FROM monitoramento.estatisticas_diarias
+    WHERE {_PERIODO}
+    GROUP BY DATE_TRUNC('month', data)
+    ORDER BY DATE_TRUNC('month', data)
+    """
+)
+
+
+class EstatisticasRepository:
+    async def geral(
+        self, conn: AsyncConnection, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> EstatisticaGeral:
+        res = await conn.execute(_GERAL, {"tipo_evento": tipo_evento, "desde": desde, "ate": ate})
+        return EstatisticaGeral(*res.one())
+
+    async def por_metodo(
+        self, conn: AsyncConnection, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> list[EstatisticaMetodo]:
+        res = await conn.execute(_POR_METODO, {"tipo_evento": tipo_evento, "desde": desde, "ate": ate})
+        return [EstatisticaMetodo(*linha) for linha in res]
+
+    async def mensal(
+        self, conn: AsyncConnection, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> list[EstatisticaMensal]:
+        res = await conn.execute(_MENSAL, {"tipo_evento": tipo_evento, "desde": desde, "ate": ate})
+        return [EstatisticaMensal(*linha) for linha in res]
+
+    # Recalcula o rollup a partir de `desde` (índice por data em
+    # metricas_diarias_endpoint_faixa); só as linhas que mudaram são gravadas.
+    # Um worker por vez (advisory lock da transação). Retorna as linhas gravadas.
+    async def atualizar_rollup(self, db: AsyncSession, *, desde: date) -> int:
+        travado = await db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(hashtext('monitoramento.estatisticas_diarias'))")
+        )
+        if not travado:
+            return 0
+
+        res = await db.execute(
+            text(
+                """
+                INSERT INTO monitoramento.estatisticas_diarias AS e
+                    (tipo_evento, data, metodo_identificacao, total_chamadas, respostas_positivas, atualizado_em)
+                SELECT tipo_evento, data, metodo_identificacao,
+                       SUM(total_chamadas), SUM(respostas_positivas), now()
+                FROM monitoramento.metricas_diarias_endpoint_faixa
+                WHERE data >= :desde
+                GROUP BY tipo_evento, data, metodo_identificacao
+                ON CONFLICT (tipo_evento, data, metodo_identificacao) DO UPDATE SET
+                    total_chamadas = EXCLUDED.total_chamadas,
+                    respostas_positivas = EXCLUDED.respostas_positivas,
+                    atualizado_em = now()
+                WHERE (e.total_chamadas, e.respostas_positivas)
+                    IS DISTINCT FROM (EXCLUDED.total_chamadas, EXCLUDED.respostas_positivas)
+                """
+            ),
+            {"desde": desde},
+        )
+        return max(cast(CursorResult[Any], res).rowcount, 0)
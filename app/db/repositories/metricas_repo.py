@@ -1,39 +1,106 @@
 from datetime import date
+from typing import Any, NamedTuple, cast
 
-from sqlalchemy import text
+from sqlalchemy import CursorResult, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+class IncrementoMetrica(NamedTuple):
+    endpoint: str
+    tipo_evento: str
+    metodo_identificacao: str | None
+    dia: date
+    total: int
+    positivos: int
+
+
 class MetricasRepository:
-    async def incr_diario(
+    async def incr_diario_lote(
         self,
         db: AsyncSession,
         *,
-        endpoint: str,
-        tipo_evento: str,
-        metodo_identificacao: str,
-        dia: date,
-        positivo: bool,
+        incrementos: list[IncrementoMetrica],
+        faixa: int = 0,
     ) -> None:
+        # Consolida por chave antes do upsert: o ON CONFLICT não aceita a mesma
+        # linha duas vezes no mesmo comando. A ordenação mantém a ordem de
+        # bloqueio estável entre workers; com faixas diferentes, workers não
+        # disputam as mesmas linhas.
+        por_chave: dict[tuple[str, str, str, date], list[int]] = {}
+        for inc in incrementos:
+            chave = (inc.endpoint, inc.tipo_evento, inc.metodo_identificacao or "n_a", inc.dia)
+            acumulado = por_chave.setdefault(chave, [0, 0])
+            acumulado[0] += inc.total
+            acumulado[1] += inc.positivos
+
+        if not por_chave:
+            return
+
+        chaves = sorted(por_chave)
         await db.execute(
             text(
                 """
-                INSERT INTO monitoramento.metricas_diarias_endpoint
-                    (endpoint, tipo_evento, metodo_identificacao, data, total_chamadas, respostas_positivas, updated_at)
-                VALUES
-                    (:endpoint, :tipo_evento, :metodo_identificacao, :data, 1, :pos, now())
-                ON CONFLICT (endpoint, tipo_evento, metodo_identificacao, data)
+                INSERT INTO monitoramento.metricas_diarias_endpoint_faixa AS m
+                    (endpoint, tipo_evento, metodo_identificacao, data, faixa, total_chamadas, respostas_positivas, updated_at)
+                SELECT u.endpoint, u.tipo_evento, u.metodo_identificacao, u.data, :faixa, u.total, u.pos, now()
+                FROM unnest(
+                    CAST(:endpoints AS text[]),
+                    CAST(:tipos_evento AS text[]),
+                    CAST(:metodos AS text[]),
+                    CAST(:datas AS date[]),
+                    CAST(:totais AS bigint[]),
+                    CAST(:positivos AS bigint[])
+                ) AS u(endpoint, tipo_evento, metodo_identificacao, data, total, pos)
+                ON CONFLICT (endpoint, tipo_evento, metodo_identificacao, data, faixa)
                 DO UPDATE SET
-                    total_chamadas = monitoramento.metricas_diarias_endpoint.total_chamadas + 1,
-                    respostas_positivas = monitoramento.metricas_diarias_endpoint.respostas_positivas + EXCLUDED.respostas_positivas,
+                    total_chamadas = m.total_chamadas + EXCLUDED.total_chamadas,
+                    respostas_positivas = m.respostas_positivas + EXCLUDED.respostas_positivas,
                     updated_at = now()
                 """
             ),
             {
-                "endpoint": endpoint,
-                "tipo_evento": tipo_evento,
-                "metodo_identificacao": metodo_identificacao or "n_a",
-                "data": dia,
-                "pos": 1 if positivo else 0,
+                "faixa": faixa,
+                "endpoints": [c[0] for c in chaves],
+                "tipos_evento": [c[1] for c in chaves],
+                "metodos": [c[2] for c in chaves],
+                "datas": [c[3] for c in chaves],
+                "totais": [por_chave[c][0] for c in chaves],
+                "positivos": [por_chave[c][1] for c in chaves],
             },
         )
+
+    # Soma na faixa 0 as demais faixas dos dias anteriores a hoje. Só um
+    # worker compacta por vez (advisory lock da transação); os outros saem
+    # sem fazer nada. Retorna as chaves compactadas.
+    async def compactar_faixas(self, db: AsyncSession) -> int:
+        travado = await db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(hashtext('monitoramento.metricas_diarias_endpoint_faixa'))")
+        )
+        if not travado:
+            return 0
+
+        res = await db.execute(
+            text(
+                """
+                WITH removidas AS (
+                    DELETE FROM monitoramento.metricas_diarias_endpoint_faixa
+                    WHERE data < current_date AND faixa <> 0
+                    RETURNING endpoint, tipo_evento, metodo_identificacao, data,
+                              total_chamadas, respostas_positivas, updated_at
+                )
+                INSERT INTO monitoramento.metricas_diarias_endpoint_faixa AS m
+                    (endpoint, tipo_evento, metodo_identificacao, data, faixa, total_chamadas, respostas_positivas, updated_at)
+                SELECT endpoint, tipo_evento, metodo_identificacao, data, 0,
+                       SUM(total_chamadas), SUM(respostas_positivas), MAX(updated_at)
+                FROM removidas
+                GROUP BY endpoint, tipo_evento, metodo_identificacao, data
+                ORDER BY endpoint, tipo_evento, metodo_identificacao, data
+                ON CONFLICT (endpoint, tipo_evento, metodo_identificacao, data, faixa)
+                DO UPDATE SET
+                    total_chamadas = m.total_chamadas + EXCLUDED.total_chamadas,
+                    respostas_positivas = m.respostas_positivas + EXCLUDED.respostas_positivas,
+                    updated_at = GREATEST(m.updated_at, EXCLUDED.updated_at)
+                """
+            )
+        )
+        return max(cast(CursorResult[Any], res).rowcount, 0)
@@ -1,56 +1,195 @@
-from sqlalchemy import case, select, tuple_
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import NamedTuple
 
-from app.models.individuo_evento import IndividuoEvento
-from app.models.individuo_identificador import IndividuoIdentificador
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.identificadores import codificar_identificador
+
+# Texto fixo (parâmetros em arrays) independentemente da quantidade de
+# identificadores: o SQLAlchemy reaproveita a compilação e o psycopg passa a
+# executar o comando como prepared statement no servidor. O evento vem de
+# monitoramento.evento_alerta, já escolhido pelo loader (uma leitura pela PK).
+# Identificadores numéricos e em texto são buscados cada um no seu índice
+# (ux_individuo_identificador_numerico / _texto, V13).
+_BUSCAR_EVENTO_RELACIONADO = text(
+    """
+    WITH individuos AS (
+        SELECT array_agg(DISTINCT r.individuo_id ORDER BY r.individuo_id) AS ids
+        FROM (
+            SELECT ii.individuo_id
+            FROM unnest(
+                CAST(:tipos_numericos AS smallint[]),
+                CAST(:valores_numericos AS bigint[])
+            ) AS p(tipo_codigo, valor_numerico)
+            JOIN monitoramento.individuo_identificador ii
+              ON ii.tipo_codigo = p.tipo_codigo
+             AND ii.valor_numerico = p.valor_numerico
+            UNION ALL
+            SELECT ii.individuo_id
+            FROM unnest(
+                CAST(:tipos_texto AS smallint[]),
+                CAST(:valores_texto AS text[])
+            ) AS p(tipo_codigo, valor_texto)
+            JOIN monitoramento.individuo_identificador ii
+              ON ii.tipo_codigo = p.tipo_codigo
+             AND ii.valor_texto = p.valor_texto
+        ) r
+    )
+    SELECT
+        i.ids AS individuos,
+        e.individuo_id,
+        e.metodo_identificacao,
+        e.data_identificacao,
+        e.banco_origem_identificacao,
+        e.id_registro_identificacao
+    FROM individuos i
+    LEFT JOIN monitoramento.evento_alerta e
+      ON cardinality(i.ids) = 1
+     AND e.individuo_id = i.ids[1]
+     AND e.tipo_evento = :tipo_evento
+    """
+)
+
+_BUSCAR_INDIVIDUOS_LOTE = text(
+    """
+    SELECT DISTINCT r.posicao, r.individuo_id
+    FROM (
+        SELECT c.posicao, ii.individuo_id
+        FROM unnest(
+            CAST(:posicoes_numericos AS integer[]),
+            CAST(:tipos_numericos AS smallint[]),
+            CAST(:valores_numericos AS bigint[])
+        ) AS c(posicao, tipo_codigo, valor_numerico)
+        JOIN monitoramento.individuo_identificador ii
+          ON ii.tipo_codigo = c.tipo_codigo
+         AND ii.valor_numerico = c.valor_numerico
+        UNION ALL
+        SELECT c.posicao, ii.individuo_id
+        FROM unnest(
+            CAST(:posicoes_texto AS integer[]),
+            CAST(:tipos_texto AS smallint[]),
+            CAST(:valores_texto AS text[])
+        ) AS c(posicao, tipo_codigo, valor_texto)
+        JOIN monitoramento.individuo_identificador ii
+          ON ii.tipo_codigo = c.tipo_codigo
+         AND ii.valor_texto = c.valor_texto
+    ) r
+    ORDER BY r.posicao, r.individuo_id
+    """
+)
+
+_BUSCAR_EVENTOS_IDENTIFICACAO_LOTE = text(
+    """
+    SELECT
+        e.individuo_id,
+        e.metodo_identificacao,
+        e.data_identificacao,
+        e.banco_origem_identificacao,
+        e.id_registro_identificacao
+    FROM monitoramento.evento_alerta e
+    WHERE e.individuo_id = ANY(CAST(:individuo_ids AS bigint[]))
+      AND e.tipo_evento = :tipo_evento
+    """
+)
+
+
+# Evento selecionado para a resposta de /relacao: só as colunas usadas, numa
+# tupla imutável (sem entidade do ORM nem Row do SQLAlchemy guardados no cache).
+class EventoRelacionado(NamedTuple):
+    individuo_id: int
+    metodo_identificacao: str
+    data_identificacao: date
+    banco_origem_identificacao: str | None
+    id_registro_identificacao: str | None
+
+
+# Parâmetros (arrays) das consultas acima para os pares (tipo, valor) de cada
+# posição; pares de tipos desconhecidos ficam de fora (não há como existirem).
+# Sem `posicoes`, só os da consulta individual.
+def parametros_identificadores(
+    consultas: list[list[tuple[str, str]]], *, posicoes: bool = True
+) -> dict[str, list[int | str | None]]:
+    parametros: dict[str, list[int | str | None]] = {
+        "posicoes_numericos": [],
+        "tipos_numericos": [],
+        "valores_numericos": [],
+        "posicoes_texto": [],
+        "tipos_texto": [],
+        "valores_texto": [],
+    }
+    for posicao, pares in enumerate(consultas):
+        for tipo, valor in pares:
+            codificado = codificar_identificador(tipo, valor)
+            if codificado is None:
+                continue
+            if codificado.valor_numerico is not None:
+                parametros["posicoes_numericos"].append(posicao)
+                parametros["tipos_numericos"].append(codificado.tipo_codigo)
+                parametros["valores_numericos"].append(codificado.valor_numerico)
+            else:
+                parametros["posicoes_texto"].append(posicao)
+                parametros["tipos_texto"].append(codificado.tipo_codigo)
+                parametros["valores_texto"].append(codificado.valor_texto)
+    if not posicoes:
+        del parametros["posicoes_numericos"], parametros["posicoes_texto"]
+    return parametros
 
 
 class RelacaoRepository:
-    async def buscar_individuos(
+    async def buscar_evento_relacionado(
         self,
-        db: AsyncSession,
+        db: AsyncConnection,
         *,
         pares_identificadores: list[tuple[str, str]],
-    ) -> list[int]:
-        if not pares_identificadores:
-            return []
-
-        q = (
-            select(IndividuoIdentificador.individuo_id)
-            .where(
-                tuple_(
-                    IndividuoIdentificador.tipo_identificador,
-                    IndividuoIdentificador.valor_identificador,
-                ).in_(pares_identificadores)
-            )
-            .distinct()
+        tipo_evento: str,
+    ) -> tuple[list[int], EventoRelacionado | None]:
+        # Resolve os identificadores, detecta conflito (mais de um indivíduo) e
+        # lê o evento prioritário em um único round trip. O evento só é
+        # buscado quando os identificadores apontam para exatamente um indivíduo.
+        parametros = parametros_identificadores([pares_identificadores], posicoes=False)
+        if not parametros["tipos_numericos"] and not parametros["tipos_texto"]:
+            return [], None
+
+        res = await db.execute(
+            _BUSCAR_EVENTO_RELACIONADO, {**parametros, "tipo_evento": tipo_evento}
         )
+        row = res.one()
+
+        individuos = list(row[0] or [])
+        evento = EventoRelacionado._make(row[1:]) if row[1] is not None else None
+        return individuos, evento
+
+    async def buscar_individuos_lote(
+        self,
+        db: AsyncConnection,
+        *,
+        consultas: list[list[tuple[str, str]]],
+    ) -> dict[int, list[int]]:
+        # posição da consulta -> individuo_id distintos (ordenados) encontrados
+        parametros = parametros_identificadores(consultas)
+        if not parametros["posicoes_numericos"] and not parametros["posicoes_texto"]:
+            return {}
+
+        res = await db.execute(_BUSCAR_INDIVIDUOS_LOTE, parametros)
 
-        res = await db.execute(q)
-        return list(res.scalars().all())
+        individuos: dict[int, list[int]] = {}
+        for posicao, individuo_id in res.all():
+            individuos.setdefault(posicao, []).append(individuo_id)
+        return individuos
 
-    async def buscar_evento_identificacao(
+    async def buscar_eventos_identificacao_lote(
         self,
-        db: AsyncSession,
+        db: AsyncConnection,
         *,
-        individuo_id: int,
+        individuo_ids: list[int],
         tipo_evento: str,
-    ) -> IndividuoEvento | None:
-        prioridade = case(
-            (IndividuoEvento.metodo_identificacao == "notificacao_sinan", 0),
-            (IndividuoEvento.metodo_identificacao == "modelo_semantica_explicita", 1),
-            else_=2,
-        )
+    ) -> dict[int, EventoRelacionado]:
+        if not individuo_ids:
+            return {}
 
-        q = (
-            select(IndividuoEvento)
-            .where(IndividuoEvento.individuo_id == individuo_id)
-            .where(IndividuoEvento.tipo_evento == tipo_evento)
-            .where(IndividuoEvento.metodo_identificacao != "n_a")
-            .where(IndividuoEvento.gera_alerta.is_(True))
-            .order_by(prioridade.asc(), IndividuoEvento.data_identificacao.desc())
-            .limit(1)
+        res = await db.execute(
+            _BUSCAR_EVENTOS_IDENTIFICACAO_LOTE,
+            {"individuo_ids": individuo_ids, "tipo_evento": tipo_evento},
         )
-
-        res = await db.execute(q)
-        return res.scalar_one_or_none()
+        return {row[0]: EventoRelacionado._make(row) for row in res}
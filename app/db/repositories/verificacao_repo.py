@@ -0,0 +1,87 @@
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+import psycopg
+
+from app.services.exceptions import ListaPessoasGrandeDemaisError
+
+# Lista recebida, na ordem de envio; desfeita com a transação.
+_CRIAR_LISTA = """
+CREATE TEMP TABLE verificacao_pessoas (
+    linha INTEGER NOT NULL,
+    id_pessoa TEXT NOT NULL
+) ON COMMIT DROP
+"""
+
+# Uma passada: os eventos só dos indivíduos da lista, agregados por indivíduo
+# e juntados à lista (hash join), em vez de um GROUP BY sobre as linhas da lista.
+_STATUS = """
+WITH lista AS (
+    SELECT
+        linha,
+        id_pessoa,
+        CASE WHEN id_pessoa ~ '^[0-9]{1,18}$' THEN id_pessoa::bigint END AS id
+    FROM verificacao_pessoas
+),
+eventos AS (
+    SELECT
+        ie.individuo_id,
+        bool_or(ie.gera_alerta) AS esta_no_alerta,
+        array_agg(DISTINCT ie.metodo_identificacao::text) FILTER (WHERE ie.gera_alerta)
+            AS metodos_com_alerta,
+        array_agg(DISTINCT ie.metodo_identificacao::text) FILTER (WHERE NOT ie.gera_alerta)
+            AS metodos_avaliados_sem_alerta
+    FROM monitoramento.individuo_evento ie
+    WHERE ie.individuo_id IN (SELECT id FROM lista WHERE id IS NOT NULL)
+    GROUP BY ie.individuo_id
+)
+SELECT
+    l.linha,
+    l.id_pessoa,
+    CASE
+        WHEN l.id_pessoa = '' THEN 'id_pessoa vazio na planilha (linkage não identificou)'
+        WHEN l.id IS NULL THEN 'id_pessoa inválido'
+        WHEN i.id IS NULL THEN 'id_pessoa não encontrado na base'
+        WHEN e.individuo_id IS NULL THEN 'encontrado, sem evento registrado'
+        WHEN e.esta_no_alerta THEN 'NO BANCO DE ALERTA'
+        ELSE 'avaliado, sem alerta'
+    END,
+    COALESCE(e.esta_no_alerta, false),
+    COALESCE(e.metodos_com_alerta, '{}'),
+    COALESCE(e.metodos_avaliados_sem_alerta, '{}')
+FROM lista l
+LEFT JOIN monitoramento.individuo i ON i.id = l.id
+LEFT JOIN eventos e ON e.individuo_id = l.id
+ORDER BY l.linha
+"""
+
+
+# Opera direto na conexão psycopg (COPY e cursor nomeado), dentro da transação
+# aberta pelo chamador.
+class VerificacaoPessoasRepository:
+    async def copiar_lista(
+        self,
+        conn: psycopg.AsyncConnection,
+        valores: AsyncIterable[str],
+        *,
+        max_linhas: int,
+    ) -> int:
+        linhas = 0
+        async with conn.cursor() as cur:
+            await cur.execute(_CRIAR_LISTA)
+            async with cur.copy("COPY verificacao_pessoas (linha, id_pessoa) FROM STDIN") as copy:
+                async for valor in valores:
+                    linhas += 1
+                    if linhas > max_linhas:
+                        raise ListaPessoasGrandeDemaisError(max_linhas)
+                    await copy.write_row((linhas, valor))
+            await cur.execute("ANALYZE verificacao_pessoas")
+        return linhas
+
+    async def iter_status(
+        self, conn: psycopg.AsyncConnection, *, tamanho_lote: int
+    ) -> AsyncIterator[list[tuple[Any, ...]]]:
+        async with conn.cursor(name="verificacao_pessoas_status") as cur:
+            await cur.execute(_STATUS)
+            while lote := await cur.fetchmany(tamanho_lote):
+                yield lote
@@ -1,15 +1,121 @@
-from collections.abc import AsyncGenerator
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, cast
+
+import orjson
+import psycopg
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection
 from app.core.config import settings
+from app.core.prometheus import ETAPA_ESPERA_POOL, POOL_CONEXOES
+from app.db.instrumentacao import EstatisticasConsultas, EstatisticasPool
+
+logger = logging.getLogger("app.db")
+
+estatisticas_pool = EstatisticasPool()
+
+# Limite do aquecimento do pool: o worker só responde ao Gunicorn depois do
+# startup, então não pode ficar esperando um banco inacessível.
+AQUECIMENTO_TIMEOUT_SEGUNDOS = 10.0
+
+
+# Pool padrão do engine async, medindo quanto cada checkout leva para obter a
+# conexão (esperando uma livre ou abrindo uma nova).
+class PoolCronometrado(AsyncAdaptedQueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        inicio = time.perf_counter()
+        try:
+            registro = super()._do_get()
+        except exc.TimeoutError:
+            estatisticas_pool.timeouts += 1
+            raise
+        espera = time.perf_counter() - inicio
+        estatisticas_pool.registrar(espera, max(0, self.overflow()))
+        ETAPA_ESPERA_POOL.observe(espera)
+        return registro
+
+
+_connect_args: dict[str, Any] = {
+    "prepare_threshold": (
+        settings.DATABASE_PREPARE_THRESHOLD
+        if settings.DATABASE_PREPARE_THRESHOLD >= 0
+        else None
+    ),
+}
+if settings.DATABASE_TCP_KEEPALIVE_SEGUNDOS > 0:
+    # Conexões mortas (failover, firewall/NAT derrubando conexões ociosas) são
+    # detectadas pelo TCP, sem um SELECT 1 por checkout.
+    _connect_args.update(
+        keepalives=1,
+        keepalives_idle=settings.DATABASE_TCP_KEEPALIVE_SEGUNDOS,
+        keepalives_interval=max(1, settings.DATABASE_TCP_KEEPALIVE_SEGUNDOS // 3),
+        keepalives_count=3,
+    )
 
 engine = create_async_engine(
     settings.DATABASE_URL,
+    poolclass=PoolCronometrado,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
-    pool_pre_ping=True,
+    pool_recycle=(
+        settings.DATABASE_POOL_RECYCLE_SEGUNDOS
+        if settings.DATABASE_POOL_RECYCLE_SEGUNDOS > 0
+        else -1
+    ),
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    connect_args=_connect_args,
+)
+
+estatisticas_consultas = EstatisticasConsultas(
+    limite_lento_ms=settings.DATABASE_CONSULTA_LENTA_MS,
+    explain=settings.DATABASE_CONSULTA_LENTA_EXPLAIN,
 )
+estatisticas_consultas.instrumentar(engine.sync_engine)
+
+_conexoes_abertas = POOL_CONEXOES.labels("abertas")
+_conexoes_em_uso = POOL_CONEXOES.labels("em_uso")
+
+
+@event.listens_for(engine.sync_engine.pool, "connect")
+def _ao_conectar(
+    dbapi_connection: DBAPIConnection, connection_record: ConnectionPoolEntry
+) -> None:
+    _conexoes_abertas.inc()
+
+
+@event.listens_for(engine.sync_engine.pool, "close")
+def _ao_fechar(
+    dbapi_connection: DBAPIConnection, connection_record: ConnectionPoolEntry
+) -> None:
+    _conexoes_abertas.dec()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _ao_retirar(
+    dbapi_connection: DBAPIConnection,
+    connection_record: ConnectionPoolEntry,
+    connection_proxy: PoolProxiedConnection,
+) -> None:
+    _conexoes_em_uso.inc()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _ao_devolver(
+    dbapi_connection: DBAPIConnection | None, connection_record: ConnectionPoolEntry
+) -> None:
+    _conexoes_em_uso.dec()
+
 
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -19,6 +125,73 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+# Conexão das consultas de leitura do caminho quente (/relacao): sem
+# AsyncSession (identity map, unit of work) e em transação READ ONLY — o
+# psycopg emite BEGIN READ ONLY, sem round trip extra. A conexão só sai do pool
+# quando o contexto é aberto (acertos de cache não usam conexão).
+@asynccontextmanager
+async def conexao_leitura() -> AsyncIterator[AsyncConnection]:
+    async with engine.connect() as conn:
+        await conn.execution_options(postgresql_readonly=True)
+        yield conn
+
+
+# Conexão psycopg de uma conexão do pool, para COPY e cursores do servidor.
+# Tudo roda numa transação desfeita na devolução ao pool (tabelas temporárias
+# com ON COMMIT DROP somem junto).
+@asynccontextmanager
+async def conexao_psycopg() -> AsyncIterator[psycopg.AsyncConnection]:
+    async with engine.connect() as conn:
+        bruta = await conn.get_raw_connection()
+        yield cast(psycopg.AsyncConnection, bruta.driver_connection)
+
+
+# Abre as DATABASE_POOL_SIZE conexões do pool de uma vez, na subida do worker
+# (lifespan), para que as primeiras requisições não paguem a conexão. Falhas
+# são logadas e não impedem a subida: o pool volta a abrir sob demanda.
+async def aquecer_pool() -> int:
+    if not settings.DATABASE_AQUECER_POOL or settings.DATABASE_POOL_SIZE <= 0:
+        return 0
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(
+        *(
+            asyncio.wait_for(engine.connect().start(), AQUECIMENTO_TIMEOUT_SEGUNDOS)
+            for _ in range(settings.DATABASE_POOL_SIZE)
+        ),
+        return_exceptions=True,
+    )
+    conexoes = [r for r in resultados if not isinstance(r, BaseException)]
+    falhas = [r for r in resultados if isinstance(r, BaseException)]
+    for conexao in conexoes:
+        await conexao.close()
+
+    registro: dict[str, Any] = {
+        "event": "pool_aquecido" if not falhas else "pool_aquecimento_incompleto",
+        "conexoes": len(conexoes),
+        "duracao_ms": round((time.perf_counter() - inicio) * 1000.0, 2),
+    }
+    if falhas:
+        registro["erro"] = repr(falhas[0])
+        logger.warning(orjson.dumps(registro).decode())
+    else:
+        logger.info(orjson.dumps(registro).decode())
+    return len(conexoes)
+
+
+def estatisticas_pool_conexoes() -> dict[str, int | float]:
+    # o engine é criado com poolclass=PoolCronometrado
+    pool = cast(PoolCronometrado, engine.sync_engine.pool)
+    return {
+        "tamanho": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "em_uso": pool.checkedout(),
+        "livres": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        **estatisticas_pool.estatisticas(),
+    }
+
+
 async def db_ping() -> bool:
     try:
         async with SessionLocal() as session:
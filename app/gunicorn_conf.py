@@ -0,0 +1,21 @@
+import os
+import shutil
+from typing import Any
+
+from prometheus_client import multiprocess
+
+# Configuração do Gunicorn (scripts/start.sh): prepara o diretório das métricas
+# do Prometheus compartilhado entre os workers (ver app/core/prometheus.py).
+
+
+def on_starting(server: Any) -> None:
+    diretorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if diretorio:
+        # arquivos de uma execução anterior somariam valores antigos
+        shutil.rmtree(diretorio, ignore_errors=True)
+        os.makedirs(diretorio, exist_ok=True)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
@@ -6,10 +9,45 @@ from app.core.auth import ApiAuthMiddleware
 from app.core.config import settings
 from app.core.errors import internal_exception_handler
 from app.core.logging import configure_logging, RequestLoggingMiddleware
-from app.db.session import db_ping
+from app.core.prometheus import gerar_metricas
+from app.db.session import (
+    aquecer_pool,
+    db_ping,
+    estatisticas_pool_conexoes,
+)
+from app.services.estatisticas_diarias import atualizador_estatisticas
+from app.services.metricas_agregador import agregador_metricas
+from app.services.filtro_identificadores import filtro_identificadores
+from app.services.relacao_service import cache_relacao
+from app.services.snapshot_relacao import monitor_snapshot_relacao
+from app.services.versao_dataset import monitor_versao_dataset
 
 configure_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uvicorn só aceita conexões depois do startup do lifespan.
+    await aquecer_pool()
+    monitor_versao_dataset.ao_mudar(cache_relacao.limpar)
+    monitor_versao_dataset.ao_mudar(filtro_identificadores.invalidar)
+    await monitor_versao_dataset.iniciar()
+    # montado em background: até ficar pronto, as consultas vão ao banco
+    await filtro_identificadores.iniciar()
+    await monitor_snapshot_relacao.iniciar()
+    await agregador_metricas.iniciar()
+    await atualizador_estatisticas.iniciar()
+    try:
+        yield
+    finally:
+        await atualizador_estatisticas.parar()
+        await monitor_versao_dataset.parar()
+        await filtro_identificadores.parar()
+        await monitor_snapshot_relacao.parar()
+        # Grava as métricas pendentes antes de o worker encerrar.
+        await agregador_metricas.parar()
+
+
 app = FastAPI(
     title="API Monitoramento Saúde - Vital Strategies Brasil",
     version="1.0.0",
@@ -23,11 +61,24 @@ app = FastAPI(
             "name": "relacao",
             "description": "Endpoints para verificar se existe relação entre identificadores e um tipo de evento.",
         },
+        {
+            "name": "estatisticas",
+            "description": "Estatísticas de uso (positividade, métodos e tendência mensal) a partir de um rollup diário.",
+        },
+        {
+            "name": "verificacao",
+            "description": "Verificação em massa do status de alerta de listas de id_pessoa.",
+        },
+        {
+            "name": "diagnostico",
+            "description": "Estado interno do worker: caches, filtro, snapshot e tempo dos comandos SQL.",
+        },
         {
             "name": "health",
             "description": "Verificações de disponibilidade da API e do banco de dados.",
         },
     ],
+    lifespan=lifespan,
 )
 
 allowed_origins = settings.allowed_origins_list()
@@ -51,10 +102,28 @@ async def health():
 
 
 @app.get("/health/db", tags=["health"])
-async def health_db():
+async def health_db() -> dict[str, Any]:
     ok = await db_ping()
-    return (
-        {"status": "ok", "database": "up"}
-        if ok
-        else {"status": "degraded", "database": "down"}
-    )
+    return {
+        **(
+            {"status": "ok", "database": "up"}
+            if ok
+            else {"status": "degraded", "database": "down"}
+        ),
+        "pool": estatisticas_pool_conexoes(),
+    }
+
+
+@app.get("/health/metricas", tags=["health"])
+async def health_metricas() -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "metricas": agregador_metricas.estatisticas(),
+        "rollup_estatisticas": atualizador_estatisticas.estatisticas(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    conteudo, content_type = gerar_metricas()
+    return Response(content=conteudo, media_type=content_type)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, DateTime, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class CargaManifesto(Base):
+    __tablename__ = "carga_manifesto"
+    __table_args__ = {"schema": "monitoramento"}
+
+    caminho: Mapped[str] = mapped_column(Text, primary_key=True)
+    tamanho_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    mtime_ns: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(Text, nullable=False)
+    linhas: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    carregado_em: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
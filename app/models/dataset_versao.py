@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, CheckConstraint, DateTime, SmallInteger, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DatasetVersao(Base):
+    __tablename__ = "dataset_versao"
+    __table_args__ = (
+        CheckConstraint("id = 1", name="dataset_versao_unica_chk"),
+        {"schema": "monitoramento"},
+    )
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    versao: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    atualizado_em: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
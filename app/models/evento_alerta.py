@@ -0,0 +1,49 @@
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, Date, ForeignKey, SmallInteger, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+from app.models.individuo_evento import BancoOrigemIdentificacaoEnum, MetodoIdentificacaoEnum
+
+
+# Regra de escolha do evento de alerta (menor prioridade vence), usada pelo
+# loader ao montar evento_alerta.
+class PrioridadeMetodoIdentificacao(Base):
+    __tablename__ = "prioridade_metodo_identificacao"
+    __table_args__ = {"schema": "monitoramento"}
+
+    metodo_identificacao: Mapped[str] = mapped_column(MetodoIdentificacaoEnum, primary_key=True)
+    prioridade: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+
+# Prioridade dos métodos sem linha em prioridade_metodo_identificacao (uma linha).
+class PrioridadeMetodoIdentificacaoPadrao(Base):
+    __tablename__ = "prioridade_metodo_identificacao_padrao"
+    __table_args__ = (CheckConstraint("unica"), {"schema": "monitoramento"})
+
+    unica: Mapped[bool] = mapped_column(Boolean, primary_key=True, default=True)
+    prioridade: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+
+# Evento de alerta prioritário por (individuo_id, tipo_evento), mantido pelo loader.
+class EventoAlerta(Base):
+    __tablename__ = "evento_alerta"
+    __table_args__ = {"schema": "monitoramento"}
+
+    individuo_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("monitoramento.individuo.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    tipo_evento: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    metodo_identificacao: Mapped[str] = mapped_column(MetodoIdentificacaoEnum, nullable=False)
+
+    data_identificacao: Mapped[object] = mapped_column(Date, nullable=False)
+
+    banco_origem_identificacao: Mapped[str | None] = mapped_column(
+        BancoOrigemIdentificacaoEnum,
+        nullable=True,
+    )
+
+    id_registro_identificacao: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -9,6 +9,7 @@ from sqlalchemy import (
     func,
     Enum,
     CheckConstraint,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -32,10 +33,19 @@ BancoOrigemIdentificacaoEnum = Enum(
 )
 
 
+# Particionada por LIST (tipo_evento) na V14: a chave primária inclui as
+# colunas de partição. Partições novas: CALL monitoramento.criar_particao_evento.
 class IndividuoEvento(Base):
     __tablename__ = "individuo_evento"
     __table_args__ = (
-        Index("idx_individuo_evento_lookup", "individuo_id", "tipo_evento"),
+        Index(
+            "idx_individuo_evento_alerta",
+            "individuo_id",
+            "tipo_evento",
+            postgresql_where=text(
+                "gera_alerta = true AND metodo_identificacao <> 'n_a'"
+            ),
+        ),
         CheckConstraint(
             """
             (id_registro_identificacao IS NULL AND banco_origem_identificacao IS NULL)
@@ -57,7 +67,7 @@ class IndividuoEvento(Base):
                 "AND banco_origem_identificacao IS NOT NULL"
             ),
         ),
-        {"schema": "monitoramento"},
+        {"schema": "monitoramento", "postgresql_partition_by": "LIST (tipo_evento)"},
     )
 
     id: Mapped[int] = mapped_column(
@@ -69,10 +79,10 @@ class IndividuoEvento(Base):
     individuo_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("monitoramento.individuo.id", ondelete="CASCADE"),
-        nullable=False,
+        primary_key=True,
     )
 
-    tipo_evento: Mapped[str] = mapped_column(Text, nullable=False)
+    tipo_evento: Mapped[str] = mapped_column(Text, primary_key=True)
 
     data_identificacao: Mapped[object] = mapped_column(Date, nullable=False)
 
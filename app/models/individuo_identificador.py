@@ -1,16 +1,43 @@
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Text, func
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
 
 
+# Tipo como código (monitoramento.tipo_identificador) e valor como BIGINT ou,
+# quando não é numérico para o tipo, como texto (app/core/identificadores.py).
 class IndividuoIdentificador(Base):
     __tablename__ = "individuo_identificador"
     __table_args__ = (
+        CheckConstraint(
+            "(valor_numerico IS NULL) <> (valor_texto IS NULL)",
+            name="individuo_identificador_valor_chk",
+        ),
+        Index(
+            "ux_individuo_identificador_numerico",
+            "tipo_codigo",
+            "valor_numerico",
+            unique=True,
+            postgresql_include=["individuo_id"],
+            postgresql_where=text("valor_numerico IS NOT NULL"),
+        ),
         Index(
-            "idx_individuo_identificador_lookup",
-            "tipo_identificador",
-            "valor_identificador",
+            "ux_individuo_identificador_texto",
+            "tipo_codigo",
+            "valor_texto",
+            unique=True,
+            postgresql_include=["individuo_id"],
+            postgresql_where=text("valor_texto IS NOT NULL"),
         ),
         {"schema": "monitoramento"},
     )
@@ -21,8 +48,18 @@ class IndividuoIdentificador(Base):
         ForeignKey("monitoramento.individuo.id", ondelete="CASCADE"),
         nullable=False,
     )
-    tipo_identificador: Mapped[str] = mapped_column(Text, nullable=False)
-    valor_identificador: Mapped[str] = mapped_column(Text, nullable=False)
+    tipo_codigo: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    valor_numerico: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    valor_texto: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[object] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+class TipoIdentificador(Base):
+    __tablename__ = "tipo_identificador"
+    __table_args__ = {"schema": "monitoramento"}
+
+    codigo: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    nome: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    digitos: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
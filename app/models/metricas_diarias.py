@@ -1,13 +1,15 @@
-from sqlalchemy import BigInteger, Date, DateTime, PrimaryKeyConstraint, Text, func
+from sqlalchemy import BigInteger, Date, DateTime, PrimaryKeyConstraint, SmallInteger, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
 
 
+# Contadores em faixas (V15); a view monitoramento.metricas_diarias_endpoint
+# soma as faixas de cada chave.
 class MetricasDiariasEndpoint(Base):
-    __tablename__ = "metricas_diarias_endpoint"
+    __tablename__ = "metricas_diarias_endpoint_faixa"
     __table_args__ = (
-        PrimaryKeyConstraint("endpoint", "tipo_evento", "data"),
+        PrimaryKeyConstraint("endpoint", "tipo_evento", "metodo_identificacao", "data", "faixa"),
         {"schema": "monitoramento"},
     )
 
@@ -23,6 +25,7 @@ class MetricasDiariasEndpoint(Base):
     updated_at: Mapped[object] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
-    metodo_identificacao: Mapped[str | None] = mapped_column(
-        Text, nullable=True
+    metodo_identificacao: Mapped[str] = mapped_column(
+        Text, nullable=False, server_default="n_a"
     )
+    faixa: Mapped[int] = mapped_column(SmallInteger, nullable=False, server_default="0")
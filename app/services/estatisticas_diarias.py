@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import date, timedelta
+from typing import TypeVar, cast
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.core.cache import CacheLRU
+from app.core.config import settings
+from app.core.prometheus import ERROS
+from app.db.repositories.estatisticas_repo import (
+    EstatisticaGeral,
+    EstatisticaMensal,
+    EstatisticaMetodo,
+    EstatisticasRepository,
+)
+from app.db.session import SessionLocal, conexao_leitura
+
+logger = logging.getLogger("app.metricas")
+
+T = TypeVar("T")
+
+cache_estatisticas = CacheLRU(
+    max_itens=settings.ESTATISTICAS_CACHE_MAX_ITENS,
+    ttl_segundos=settings.ESTATISTICAS_CACHE_TTL_SEGUNDOS,
+    nome="estatisticas",
+)
+
+
+# Mantém monitoramento.estatisticas_diarias em dia: a cada `intervalo_segundos`
+# recalcula os últimos `janela_dias` dias (as métricas só são gravadas pela
+# própria API, para o dia corrente; a janela cobre flushes atrasados).
+class AtualizadorEstatisticas:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        intervalo_segundos: float,
+        janela_dias: int,
+        repo: EstatisticasRepository | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._intervalo_segundos = intervalo_segundos
+        self._janela_dias = janela_dias
+        self._repo = repo or EstatisticasRepository()
+        self._tarefa: asyncio.Task[None] | None = None
+        self.atualizacoes = 0
+        self.atualizacoes_falhas = 0
+        self.ultima_atualizacao_em: float | None = None
+
+    async def atualizar(self) -> None:
+        inicio = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                linhas = await self._repo.atualizar_rollup(
+                    db, desde=date.today() - timedelta(days=self._janela_dias)
+                )
+                await db.commit()
+        except Exception:
+            self.atualizacoes_falhas += 1
+            ERROS.labels("rollup_estatisticas").inc()
+            logger.exception(orjson.dumps({"event": "rollup_estatisticas_falhou"}).decode())
+            return
+
+        self.atualizacoes += 1
+        self.ultima_atualizacao_em = time.time()
+        if linhas:
+            logger.info(
+                orjson.dumps(
+                    {
+                        "event": "rollup_estatisticas",
+                        "linhas": linhas,
+                        "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+                    }
+                ).decode()
+            )
+
+    async def _executar(self) -> None:
+        while True:
+            await asyncio.sleep(self._intervalo_segundos)
+            await self.atualizar()
+
+    async def iniciar(self) -> None:
+        if self._tarefa is None and self._intervalo_segundos > 0:
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def estatisticas(self) -> dict[str, float | int | None]:
+        return {
+            "atualizacoes": self.atualizacoes,
+            "atualizacoes_falhas": self.atualizacoes_falhas,
+            "ultima_atualizacao_em": self.ultima_atualizacao_em,
+        }
+
+
+# Leituras do rollup com cache de TTL curto: painéis consultando a cada poucos
+# segundos custam um acerto de cache por worker.
+class EstatisticasService:
+    def __init__(
+        self,
+        cache: CacheLRU | None = None,
+        conexao: Callable[[], AbstractAsyncContextManager[AsyncConnection]] | None = None,
+    ) -> None:
+        self._repo = EstatisticasRepository()
+        self._cache = cache or cache_estatisticas
+        self._conexao = conexao or conexao_leitura
+
+    async def geral(
+        self, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> EstatisticaGeral:
+        return await self._com_cache(self._repo.geral, tipo_evento, desde, ate)
+
+    async def por_metodo(
+        self, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> list[EstatisticaMetodo]:
+        return await self._com_cache(self._repo.por_metodo, tipo_evento, desde, ate)
+
+    async def mensal(
+        self, *, tipo_evento: str, desde: date | None, ate: date | None
+    ) -> list[EstatisticaMensal]:
+        return await self._com_cache(self._repo.mensal, tipo_evento, desde, ate)
+
+    async def _com_cache(
+        self,
+        consulta: Callable[..., Awaitable[T]],
+        tipo_evento: str,
+        desde: date | None,
+        ate: date | None,
+    ) -> T:
+        chave = (consulta.__name__, tipo_evento, desde, ate)
+        encontrado, guardado = self._cache.obter(chave)
+        if encontrado:
+            return cast(T, guardado)
+
+        async with self._conexao() as conn:
+            resultado = await consulta(conn, tipo_evento=tipo_evento, desde=desde, ate=ate)
+        self._cache.guardar(chave, resultado)
+        return resultado
+
+
+atualizador_estatisticas = AtualizadorEstatisticas(
+    SessionLocal,
+    intervalo_segundos=settings.ESTATISTICAS_ATUALIZACAO_INTERVALO_SEGUNDOS,
+    janela_dias=settings.ESTATISTICAS_JANELA_DIAS,
+)
@@ -2,3 +2,13 @@ class IdentificadoresConflitantesError(Exception):
     def __init__(self, individuo_ids: list[int]) -> None:
         self.individuo_ids = individuo_ids
         super().__init__("Identificadores informados correspondem a mais de um indivíduo.")
+
+
+class ListaPessoasInvalidaError(Exception):
+    pass
+
+
+class ListaPessoasGrandeDemaisError(Exception):
+    def __init__(self, max_linhas: int) -> None:
+        self.max_linhas = max_linhas
+        super().__init__(f"A lista excede o limite de {max_linhas} linhas.")
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.bloom import FiltroBloom
+from app.core.config import settings
+from app.core.identificadores import VALOR_TEXTO_SQL
+from app.core.prometheus import CACHE_EVENTOS
+from app.db.session import conexao_leitura
+from app.services.versao_dataset import monitor_versao_dataset
+
+logger = logging.getLogger("app.dataset")
+
+# Mesma chave dos dois lados: tipo e valor separados por \x1f (não aparece em
+# identificadores), em UTF-8.
+SEPARADOR = "\x1f"
+LINHAS_POR_LOTE = 5000
+
+_CONTAR = text("SELECT count(*) FROM monitoramento.individuo_identificador")
+_VERSAO = text("SELECT versao FROM monitoramento.dataset_versao WHERE id = 1")
+_CHAVES = text(
+    f"SELECT convert_to(t.nome || chr(31) || {VALOR_TEXTO_SQL}, 'UTF8')"
+    " FROM monitoramento.individuo_identificador ii"
+    " JOIN monitoramento.tipo_identificador t ON t.codigo = ii.tipo_codigo"
+)
+
+
+def chave_identificador(tipo: str, valor: str) -> bytes:
+    return f"{tipo}{SEPARADOR}{valor}".encode()
+
+
+# Filtro de Bloom (por worker) dos pares (tipo, valor) de
+# monitoramento.individuo_identificador. Se nenhum identificador de uma consulta
+# está no filtro, a consulta é negativa sem ir ao banco. Enquanto o filtro não
+# está pronto (subida do worker, carga nova), tudo vai ao banco.
+#
+# É montado em background a partir de um snapshot (REPEATABLE READ) e só entra
+# em uso se nenhuma invalidação aconteceu durante a montagem e se a versão do
+# snapshot é a que o MonitorVersaoDataset conhece (`versao_atual`). Snapshot
+# mais antigo que o monitor: é montado de novo; mais novo (carga que o monitor
+# ainda não leu): fica guardado e entra em uso quando o monitor chegar à
+# versão. Cargas novas são percebidas pelo monitor (mesmo atraso do cache de
+# resultados). Um filtro de versão diferente da do monitor nunca é usado: um
+# negativo dele pode ser um identificador de carga mais nova.
+class FiltroIdentificadores:
+    def __init__(
+        self,
+        conexao: Callable[[], AbstractAsyncContextManager[AsyncConnection]],
+        *,
+        taxa_falso_positivo: float,
+        memoria_max_mb: int,
+        habilitado: bool = True,
+        versao_atual: Callable[[], int | None] | None = None,
+    ) -> None:
+        self._conexao = conexao
+        self._versao_atual = versao_atual
+        self._taxa_falso_positivo = taxa_falso_positivo
+        self._memoria_max_bytes = memoria_max_mb * 1024 * 1024
+        self.habilitado = habilitado
+        self.filtro: FiltroBloom | None = None
+        self.versao: int | None = None
+        # (filtro, versão, duração) montado à frente do monitor
+        self._pendente: tuple[FiltroBloom, int, float] | None = None
+        self._geracao = 0
+        self._tarefa: asyncio.Task[None] | None = None
+        self._descartadas = CACHE_EVENTOS.labels("filtro_identificadores", "descartada")
+        self._consultadas = CACHE_EVENTOS.labels("filtro_identificadores", "possivel")
+        self.descartadas = 0
+        self.possiveis = 0
+        self.ultima_montagem_segundos: float | None = None
+
+    def pode_existir(self, pares: list[tuple[str, str]]) -> bool:
+        filtro = self.filtro
+        if filtro is None or not self._em_dia():
+            return True
+        for tipo, valor in pares:
+            if chave_identificador(tipo, valor) in filtro:
+                self.possiveis += 1
+                self._consultadas.inc()
+                return True
+        self.descartadas += 1
+        self._descartadas.inc()
+        return False
+
+    # Com o monitor numa versão conhecida e diferente da do filtro (carga
+    # publicada entre o snapshot do filtro e a primeira leitura do monitor, que
+    # não avisa ninguém), o filtro sai de uso e é montado de novo.
+    def _em_dia(self) -> bool:
+        if self._versao_atual is None:
+            return True
+        atual = self._versao_atual()
+        if atual == self.versao:
+            return True
+        if atual is not None:
+            self.invalidar()
+        return False
+
+    async def montar(self) -> None:
+        geracao = self._geracao
+        inicio = time.perf_counter()
+
+        while True:
+            filtro, versao = await self._ler()
+            if geracao != self._geracao:
+                return
+            atual = self._versao_atual() if self._versao_atual is not None else None
+            if atual is None or atual == versao:
+                break
+            if versao > atual:
+                # publicado por invalidar(), quando o monitor ler a versão
+                self._pendente = (filtro, versao, time.perf_counter() - inicio)
+                logger.info(
+                    orjson.dumps(
+                        {"event": "filtro_identificadores_aguardando_monitor", "versao": versao, "atual": atual}
+                    ).decode()
+                )
+                return
+            logger.info(
+                orjson.dumps(
+                    {"event": "filtro_identificadores_desatualizado", "versao": versao, "atual": atual}
+                ).decode()
+            )
+
+        self._publicar(filtro, versao, time.perf_counter() - inicio)
+
+    def _publicar(self, filtro: FiltroBloom, versao: int, duracao_segundos: float) -> None:
+        self.filtro, self.versao = filtro, versao
+        self.ultima_montagem_segundos = duracao_segundos
+        logger.info(
+            orjson.dumps(
+                {
+                    "event": "filtro_identificadores_montado",
+                    "versao": versao,
+                    "identificadores": filtro.itens,
+                    "memoria_bytes": len(filtro.bits),
+                    "taxa_falso_positivo_estimada": round(filtro.taxa_falso_positivo_estimada, 5),
+                    "duracao_s": round(duracao_segundos, 2),
+                }
+            ).decode()
+        )
+
+    async def _ler(self) -> tuple[FiltroBloom, int]:
+        async with self._conexao() as conn:
+            await conn.execution_options(isolation_level="REPEATABLE READ")
+            versao = (await conn.execute(_VERSAO)).scalar_one_or_none() or 0
+            total = (await conn.execute(_CONTAR)).scalar_one()
+            filtro = FiltroBloom.dimensionar(
+                total,
+                taxa_falso_positivo=self._taxa_falso_positivo,
+                memoria_max_bytes=self._memoria_max_bytes,
+            )
+            resultado = await conn.stream(
+                _CHAVES.execution_options(yield_per=LINHAS_POR_LOTE)
+            )
+            async for lote in resultado.scalars().partitions():
+                # o hash de um lote leva dezenas de ms: roda numa thread, e o
+                # loop segue atendendo requisições (a thread cede o GIL a cada
+                # intervalo de troca). O filtro ainda não é visível a ninguém.
+                await asyncio.to_thread(filtro.adicionar_varios, lote)
+        return filtro, versao
+
+    async def _montar_em_background(self) -> None:
+        try:
+            await self.montar()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(orjson.dumps({"event": "filtro_identificadores_falhou"}).decode())
+
+    # Callback do MonitorVersaoDataset: o filtro atual pode não ter os
+    # identificadores da carga nova, então sai de uso até o próximo ficar pronto
+    # (ou até o guardado à frente do monitor, se é da versão que ele leu).
+    def invalidar(self) -> None:
+        self._geracao += 1
+        self.filtro = None
+        self.versao = None
+        pendente, self._pendente = self._pendente, None
+        if not self.habilitado:
+            return
+        if pendente is not None and self._versao_atual is not None and self._versao_atual() == pendente[1]:
+            self._publicar(*pendente)
+            return
+        if self._tarefa is not None and not self._tarefa.done():
+            self._tarefa.cancel()
+        self._tarefa = asyncio.get_running_loop().create_task(self._montar_em_background())
+
+    async def iniciar(self) -> None:
+        if self.habilitado and self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._montar_em_background())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def estatisticas(self) -> dict[str, int | float | bool | None]:
+        filtro = self.filtro
+        return {
+            "habilitado": self.habilitado,
+            "pronto": filtro is not None,
+            "versao": self.versao,
+            "identificadores": filtro.itens if filtro else None,
+            "memoria_bytes": len(filtro.bits) if filtro else None,
+            "taxa_falso_positivo_estimada": (
+                round(filtro.taxa_falso_positivo_estimada, 5) if filtro else None
+            ),
+            "ultima_montagem_segundos": self.ultima_montagem_segundos,
+            "descartadas": self.descartadas,
+            "possiveis": self.possiveis,
+        }
+
+
+filtro_identificadores = FiltroIdentificadores(
+    conexao_leitura,
+    taxa_falso_positivo=settings.FILTRO_IDENTIFICADORES_TAXA_FALSO_POSITIVO,
+    memoria_max_mb=settings.FILTRO_IDENTIFICADORES_MEMORIA_MAX_MB,
+    habilitado=settings.FILTRO_IDENTIFICADORES_HABILITADO,
+    versao_atual=lambda: monitor_versao_dataset.versao,
+)
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.prometheus import ERROS, ETAPA_ESCRITA_METRICAS
+from app.db.repositories.metricas_repo import IncrementoMetrica, MetricasRepository
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("app.metricas")
+
+ChaveMetrica = tuple[str, str, str | None, date]
+
+
+# Acumula as métricas diárias em memória (por worker) e grava os deltas em lote.
+# O registro é síncrono e não toca o banco; uma task faz o flush a cada
+# `intervalo_segundos` ou quando `max_chaves_flush` chaves ficam pendentes.
+# A memória é limitada a `max_chaves_pendentes` chaves distintas: deltas de
+# chaves novas acima do limite são descartados e contabilizados.
+# Cada worker grava na sua faixa (pid % `faixas`) e, a cada
+# `compactacao_intervalo_segundos`, tenta compactar as faixas dos dias anteriores.
+class MetricasAgregador:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        repo: MetricasRepository | None = None,
+        intervalo_segundos: float,
+        max_chaves_flush: int,
+        max_chaves_pendentes: int,
+        faixas: int = 1,
+        compactacao_intervalo_segundos: float = 0.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._repo = repo or MetricasRepository()
+        self._intervalo_segundos = intervalo_segundos
+        self._max_chaves_flush = max_chaves_flush
+        self._max_chaves_pendentes = max_chaves_pendentes
+        self._faixas = max(faixas, 1)
+        self._compactacao_intervalo_segundos = compactacao_intervalo_segundos
+        self._proxima_compactacao: float | None = None
+
+        self._pendentes: dict[ChaveMetrica, list[int]] = {}
+        self._pendente_desde: float | None = None
+        self._lock_flush = asyncio.Lock()
+        self._acordar = asyncio.Event()
+        self._tarefa: asyncio.Task[None] | None = None
+        self._parando = False
+
+        self.flushes = 0
+        self.flushes_falhos = 0
+        self.deltas_gravados = 0
+        self.deltas_descartados = 0
+        self.ultimo_flush_em: float | None = None
+        self.ultimo_flush_duracao_segundos: float | None = None
+        self.compactacoes = 0
+        self.compactacoes_falhas = 0
+
+    # Pelo pid do processo que grava, lido a cada uso: continua certa mesmo
+    # se o objeto tiver sido criado antes de um fork.
+    @property
+    def faixa(self) -> int:
+        return os.getpid() % self._faixas
+
+    def registrar(
+        self,
+        *,
+        endpoint: str,
+        tipo_evento: str,
+        metodo_identificacao: str | None,
+        total: int = 1,
+        positivos: int = 0,
+    ) -> None:
+        chave = (endpoint, tipo_evento, metodo_identificacao, date.today())
+        if not self._acumular(chave, total, positivos):
+            return
+
+        if self._pendente_desde is None:
+            self._pendente_desde = time.monotonic()
+
+        if len(self._pendentes) >= self._max_chaves_flush:
+            self._acordar.set()
+
+    def _acumular(self, chave: ChaveMetrica, total: int, positivos: int) -> bool:
+        acumulado = self._pendentes.get(chave)
+        if acumulado is None:
+            if len(self._pendentes) >= self._max_chaves_pendentes:
+                self.deltas_descartados += total
+                return False
+            acumulado = self._pendentes[chave] = [0, 0]
+
+        acumulado[0] += total
+        acumulado[1] += positivos
+        return True
+
+    async def flush(self) -> None:
+        async with self._lock_flush:
+            if not self._pendentes:
+                return
+
+            lote, self._pendentes = self._pendentes, {}
+            pendente_desde, self._pendente_desde = self._pendente_desde, None
+
+            inicio = time.perf_counter()
+            try:
+                async with self._session_factory() as db:
+                    await self._repo.incr_diario_lote(
+                        db,
+                        incrementos=[
+                            IncrementoMetrica(*chave, total, positivos)
+                            for chave, (total, positivos) in lote.items()
+                        ],
+                        faixa=self.faixa,
+                    )
+                    await db.commit()
+            except Exception:
+                self.flushes_falhos += 1
+                ERROS.labels("flush_metricas").inc()
+                logger.exception(
+                    orjson.dumps(
+                        {
+                            "event": "metric_flush_failed",
+                            "chaves": len(lote),
+                        }
+                    ).decode()
+                )
+                # Devolve os deltas para a próxima tentativa (respeitando o limite).
+                for chave, (total, positivos) in lote.items():
+                    self._acumular(chave, total, positivos)
+                if self._pendentes:
+                    candidatos = [t for t in (pendente_desde, self._pendente_desde) if t is not None]
+                    self._pendente_desde = min(candidatos) if candidatos else time.monotonic()
+                return
+
+            self.flushes += 1
+            self.deltas_gravados += sum(total for total, _ in lote.values())
+            self.ultimo_flush_em = time.time()
+            self.ultimo_flush_duracao_segundos = time.perf_counter() - inicio
+            ETAPA_ESCRITA_METRICAS.observe(self.ultimo_flush_duracao_segundos)
+
+    async def _executar(self) -> None:
+        while not self._parando:
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=self._intervalo_segundos)
+            except asyncio.TimeoutError:
+                pass
+            self._acordar.clear()
+            await self.flush()
+            await self._compactar_se_devido()
+
+    async def _compactar_se_devido(self) -> None:
+        if self._compactacao_intervalo_segundos <= 0:
+            return
+        agora = time.monotonic()
+        if self._proxima_compactacao is None:
+            self._proxima_compactacao = agora + self._compactacao_intervalo_segundos
+        if agora < self._proxima_compactacao:
+            return
+        self._proxima_compactacao = agora + self._compactacao_intervalo_segundos
+        await self.compactar()
+
+    async def compactar(self) -> None:
+        inicio = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                chaves = await self._repo.compactar_faixas(db)
+                await db.commit()
+        except Exception:
+            self.compactacoes_falhas += 1
+            ERROS.labels("compactacao_metricas").inc()
+            logger.exception(orjson.dumps({"event": "metric_compaction_failed"}).decode())
+            return
+
+        self.compactacoes += 1
+        if chaves:
+            logger.info(
+                orjson.dumps(
+                    {
+                        "event": "metric_compaction",
+                        "chaves": chaves,
+                        "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+                    }
+                ).decode()
+            )
+
+    async def iniciar(self) -> None:
+        if self._tarefa is None:
+            self._parando = False
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        # Sem cancelamento: um flush em andamento termina antes do flush final.
+        if self._tarefa is not None:
+            self._parando = True
+            self._acordar.set()
+            await self._tarefa
+            self._tarefa = None
+
+        await self.flush()
+
+    def estatisticas(self) -> dict[str, float | int | None]:
+        atraso = (
+            time.monotonic() - self._pendente_desde
+            if self._pendente_desde is not None
+            else 0.0
+        )
+        return {
+            "chaves_pendentes": len(self._pendentes),
+            "faixa": self.faixa,
+            "atraso_flush_segundos": round(atraso, 3),
+            "flushes": self.flushes,
+            "flushes_falhos": self.flushes_falhos,
+            "deltas_gravados": self.deltas_gravados,
+            "deltas_descartados": self.deltas_descartados,
+            "ultimo_flush_em": self.ultimo_flush_em,
+            "ultimo_flush_duracao_segundos": self.ultimo_flush_duracao_segundos,
+            "compactacoes": self.compactacoes,
+            "compactacoes_falhas": self.compactacoes_falhas,
+        }
+
+
+agregador_metricas = MetricasAgregador(
+    SessionLocal,
+    intervalo_segundos=settings.METRICAS_FLUSH_INTERVALO_SEGUNDOS,
+    max_chaves_flush=settings.METRICAS_FLUSH_MAX_CHAVES,
+    max_chaves_pendentes=settings.METRICAS_MAX_CHAVES_PENDENTES,
+    faixas=settings.METRICAS_FAIXAS,
+    compactacao_intervalo_segundos=settings.METRICAS_COMPACTACAO_INTERVALO_SEGUNDOS,
+)
@@ -1,38 +1,70 @@
 import logging
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from typing import cast
+
 import orjson
-from datetime import date
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from app.db.repositories.metricas_repo import MetricasRepository
-from app.db.repositories.relacao_repo import RelacaoRepository
-from app.models.individuo_evento import IndividuoEvento
+from app.core.cache import CacheLRU
+from app.core.config import settings
+from app.core.prometheus import (
+    ERROS,
+    ETAPA_RESOLUCAO_E_SELECAO,
+    ETAPA_RESOLUCAO_IDENTIFICADORES,
+    ETAPA_SELECAO_EVENTO,
+    ETAPA_SNAPSHOT,
+)
+from app.db.repositories.relacao_repo import EventoRelacionado, RelacaoRepository
+from app.db.session import conexao_leitura
 from app.services.exceptions import IdentificadoresConflitantesError
+from app.services.filtro_identificadores import FiltroIdentificadores, filtro_identificadores
+from app.services.metricas_agregador import MetricasAgregador, agregador_metricas
+from app.services.snapshot_relacao import MonitorSnapshotRelacao, monitor_snapshot_relacao
+from app.services.versao_dataset import monitor_versao_dataset
 
 logger = logging.getLogger("app.metricas")
 
+cache_relacao = CacheLRU(
+    max_itens=settings.CACHE_RELACAO_MAX_ITENS,
+    ttl_segundos=settings.CACHE_RELACAO_TTL_SEGUNDOS,
+    nome="relacao",
+)
+
 
 class RelacaoService:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        agregador: MetricasAgregador | None = None,
+        cache: CacheLRU | None = None,
+        conexao: Callable[[], AbstractAsyncContextManager[AsyncConnection]] | None = None,
+        filtro: FiltroIdentificadores | None = None,
+        snapshot: MonitorSnapshotRelacao | None = None,
+        versao_dataset: Callable[[], int | None] | None = None,
+    ) -> None:
         self._relacao_repo = RelacaoRepository()
-        self._metricas_repo = MetricasRepository()
+        self._conexao = conexao or conexao_leitura
+        self._filtro = filtro or filtro_identificadores
+        self._snapshot = snapshot or monitor_snapshot_relacao
+        self._agregador = agregador or agregador_metricas
+        self._cache = cache or cache_relacao
+        self._versao_dataset = versao_dataset or (lambda: monitor_versao_dataset.versao)
 
     async def buscar_evento_relacionado(
         self,
-        db: AsyncSession,
         *,
         endpoint: str,
         tipo_evento: str,
         pares_identificadores: list[tuple[str, str]],
-    ) -> IndividuoEvento | None:
-        individuos = await self._relacao_repo.buscar_individuos(
-            db,
+    ) -> EventoRelacionado | None:
+        individuos, evento = await self._resolver(
+            tipo_evento=tipo_evento,
             pares_identificadores=pares_identificadores,
         )
 
-        if not individuos:
-            evento = None
-        elif len(individuos) > 1:
+        if len(individuos) > 1:
             logger.warning(
                 orjson.dumps(
                     {
@@ -43,23 +75,16 @@ class RelacaoService:
                     }
                 ).decode()
             )
-            evento = None
-            await self._registrar_metricas(
-                db,
+            ERROS.labels("conflito_identificadores").inc()
+            self._registrar_metricas(
                 endpoint=endpoint,
                 tipo_evento=tipo_evento,
+                metodo_identificacao=None,
                 positivo=False,
             )
             raise IdentificadoresConflitantesError(individuos)
-        else:
-            evento = await self._relacao_repo.buscar_evento_identificacao(
-                db,
-                tipo_evento=tipo_evento,
-                individuo_id=individuos[0],
-            )
 
-        await self._registrar_metricas(
-            db,
+        self._registrar_metricas(
             endpoint=endpoint,
             tipo_evento=tipo_evento,
             metodo_identificacao=evento.metodo_identificacao if evento else None,
@@ -68,33 +93,189 @@ class RelacaoService:
 
         return evento
 
-    async def _registrar_metricas(
+    # Ordem: snapshot (mmap, sem SQL) quando está em dia com o banco; senão o
+    # filtro de identificadores (negativo sem ir ao banco), o cache e o banco.
+    async def _resolver(
         self,
-        db: AsyncSession,
         *,
-        endpoint: str,
         tipo_evento: str,
-        metodo_identificacao: str | None,
-        positivo: bool,
-    ) -> None:
-        try:
-            await self._metricas_repo.incr_diario(
-                db,
-                endpoint=endpoint,
-                tipo_evento=tipo_evento,
-                metodo_identificacao=metodo_identificacao,
-                dia=date.today(),
-                positivo=positivo,
+        pares_identificadores: list[tuple[str, str]],
+    ) -> tuple[list[int], EventoRelacionado | None]:
+        snapshot = self._snapshot.ativo()
+        if snapshot is not None:
+            inicio = time.perf_counter()
+            resultado = snapshot.buscar(pares_identificadores, tipo_evento)
+            ETAPA_SNAPSHOT.observe(time.perf_counter() - inicio)
+            return resultado
+
+        if not self._filtro.pode_existir(pares_identificadores):
+            return [], None
+
+        return await self._buscar_com_cache(
+            tipo_evento=tipo_evento,
+            pares_identificadores=pares_identificadores,
+        )
+
+    async def _buscar_com_cache(
+        self,
+        *,
+        tipo_evento: str,
+        pares_identificadores: list[tuple[str, str]],
+    ) -> tuple[list[int], EventoRelacionado | None]:
+        # Resultados negativos e conflitos também são guardados; as métricas
+        # continuam sendo registradas pelo chamador a cada requisição.
+        if not self._cache.habilitado:
+            return await self._consultar(
+                tipo_evento=tipo_evento, pares_identificadores=pares_identificadores
             )
-            await db.commit()
-        except Exception:
-            logger.exception(
+
+        chave = (tipo_evento, tuple(sorted(set(pares_identificadores))))
+        encontrado, guardado = self._cache.obter(chave)
+        if encontrado:
+            return cast(tuple[list[int], EventoRelacionado | None], guardado)
+
+        # A geração só muda quando o monitor vê uma versão nova depois de já
+        # conhecer outra; a primeira leitura dele não avisa ninguém. Por isso o
+        # resultado só é guardado se o monitor já conhecia a versão antes da
+        # consulta e ela não mudou até o fim (como no filtro de identificadores).
+        geracao = self._cache.geracao
+        versao = self._versao_dataset()
+        resultado = await self._consultar(
+            tipo_evento=tipo_evento, pares_identificadores=pares_identificadores
+        )
+        if versao is not None and versao == self._versao_dataset():
+            self._cache.guardar(chave, resultado, geracao=geracao)
+        return resultado
+
+    async def _consultar(
+        self,
+        *,
+        tipo_evento: str,
+        pares_identificadores: list[tuple[str, str]],
+    ) -> tuple[list[int], EventoRelacionado | None]:
+        async with self._conexao() as conn:
+            inicio = time.perf_counter()
+            try:
+                return await self._relacao_repo.buscar_evento_relacionado(
+                    conn,
+                    pares_identificadores=pares_identificadores,
+                    tipo_evento=tipo_evento,
+                )
+            finally:
+                ETAPA_RESOLUCAO_E_SELECAO.observe(time.perf_counter() - inicio)
+
+    async def buscar_eventos_relacionados_lote(
+        self,
+        *,
+        endpoint: str,
+        tipo_evento: str,
+        consultas: list[list[tuple[str, str]]],
+    ) -> list[EventoRelacionado | IdentificadoresConflitantesError | None]:
+        individuos_por_consulta: dict[int, list[int]] = {}
+        eventos: dict[int, EventoRelacionado] = {}
+        snapshot = self._snapshot.ativo()
+
+        if snapshot is not None:
+            inicio = time.perf_counter()
+            for posicao, pares in enumerate(consultas):
+                individuos = snapshot.individuos(pares)
+                if individuos:
+                    individuos_por_consulta[posicao] = individuos
+                if len(individuos) == 1 and individuos[0] not in eventos:
+                    evento = snapshot.evento(individuos[0], tipo_evento)
+                    if evento is not None:
+                        eventos[individuos[0]] = evento
+            ETAPA_SNAPSHOT.observe(time.perf_counter() - inicio)
+            consultas_banco: list[list[tuple[str, str]]] = []
+        else:
+            # Consultas sem nenhum identificador no filtro ficam vazias (mesma
+            # posição, resultado negativo); se nenhuma sobrar, o banco não é usado.
+            consultas_banco = [
+                pares if self._filtro.pode_existir(pares) else [] for pares in consultas
+            ]
+
+        if any(consultas_banco):
+            async with self._conexao() as conn:
+                inicio = time.perf_counter()
+                individuos_por_consulta = await self._relacao_repo.buscar_individuos_lote(
+                    conn,
+                    consultas=consultas_banco,
+                )
+                ETAPA_RESOLUCAO_IDENTIFICADORES.observe(time.perf_counter() - inicio)
+
+                individuos_unicos = sorted(
+                    {
+                        individuos[0]
+                        for individuos in individuos_por_consulta.values()
+                        if len(individuos) == 1
+                    }
+                )
+                inicio = time.perf_counter()
+                eventos = await self._relacao_repo.buscar_eventos_identificacao_lote(
+                    conn,
+                    individuo_ids=individuos_unicos,
+                    tipo_evento=tipo_evento,
+                )
+                ETAPA_SELECAO_EVENTO.observe(time.perf_counter() - inicio)
+
+        resultados: list[EventoRelacionado | IdentificadoresConflitantesError | None] = []
+        contagens: dict[str | None, list[int]] = {}
+        conflitos: list[int] = []
+
+        for posicao in range(len(consultas)):
+            individuos = individuos_por_consulta.get(posicao, [])
+
+            resultado: EventoRelacionado | IdentificadoresConflitantesError | None
+            if len(individuos) > 1:
+                conflitos.append(posicao)
+                resultado = IdentificadoresConflitantesError(individuos)
+                metodo = None
+            else:
+                evento = eventos.get(individuos[0]) if individuos else None
+                metodo = evento.metodo_identificacao if evento is not None else None
+                resultado = evento
+
+            contagem = contagens.setdefault(metodo, [0, 0])
+            contagem[0] += 1
+            if resultado is not None and not isinstance(resultado, IdentificadoresConflitantesError):
+                contagem[1] += 1
+
+            resultados.append(resultado)
+
+        if conflitos:
+            ERROS.labels("conflito_identificadores").inc(len(conflitos))
+            logger.warning(
                 orjson.dumps(
                     {
-                        "event": "metric_write_failed",
-                        "endpoint": endpoint,
+                        "event": "identificadores_conflitantes_lote",
                         "tipo_evento": tipo_evento,
+                        "consultas": conflitos,
                     }
                 ).decode()
             )
-            await db.rollback()
+
+        for metodo, (total, positivos) in contagens.items():
+            self._agregador.registrar(
+                endpoint=endpoint,
+                tipo_evento=tipo_evento,
+                metodo_identificacao=metodo,
+                total=total,
+                positivos=positivos,
+            )
+
+        return resultados
+
+    def _registrar_metricas(
+        self,
+        *,
+        endpoint: str,
+        tipo_evento: str,
+        metodo_identificacao: str | None,
+        positivo: bool,
+    ) -> None:
+        self._agregador.registrar(
+            endpoint=endpoint,
+            tipo_evento=tipo_evento,
+            metodo_identificacao=metodo_identificacao,
+            positivos=1 if positivo else 0,
+        )
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import orjson
+
+from app.core.config import settings
+from app.core.snapshot import SnapshotRelacao
+from app.services.versao_dataset import monitor_versao_dataset
+
+logger = logging.getLogger("app.dataset")
+
+
+# Mantém aberto (mmap) o snapshot de /relacao gerado pelo loader e troca para o
+# arquivo novo quando ele aparece (o loader o substitui com os.replace). O
+# snapshot só é usado enquanto a versão gravada nele for a versão atual do
+# banco (monitoramento.dataset_versao): depois de uma carga sem --snapshot,
+# as consultas voltam ao banco até um snapshot novo ser gerado.
+class MonitorSnapshotRelacao:
+    def __init__(
+        self,
+        caminho: str,
+        *,
+        intervalo_segundos: float,
+        versao_dataset: Callable[[], int | None],
+    ) -> None:
+        self._caminho = Path(caminho) if caminho else None
+        self._intervalo_segundos = intervalo_segundos
+        self._versao_dataset = versao_dataset
+        self._tarefa: asyncio.Task[None] | None = None
+        self.snapshot: SnapshotRelacao | None = None
+
+    @property
+    def habilitado(self) -> bool:
+        return self._caminho is not None
+
+    def ativo(self) -> SnapshotRelacao | None:
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.dataset_versao != self._versao_dataset():
+            return None
+        return snapshot
+
+    async def verificar(self) -> None:
+        if self._caminho is None:
+            return
+        try:
+            estado = os.stat(self._caminho)
+        except FileNotFoundError:
+            return
+        identidade = (estado.st_dev, estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        if self.snapshot is not None and self.snapshot.identidade == identidade:
+            return
+
+        try:
+            # checksum de um arquivo grande: fora do event loop
+            novo = await asyncio.to_thread(SnapshotRelacao, self._caminho)
+        except Exception:
+            logger.exception(
+                orjson.dumps({"event": "snapshot_relacao_invalido", "caminho": str(self._caminho)}).decode()
+            )
+            return
+
+        # As buscas são síncronas: nenhuma está em andamento durante a troca.
+        anterior, self.snapshot = self.snapshot, novo
+        if anterior is not None:
+            anterior.fechar()
+        logger.info(
+            orjson.dumps(
+                {
+                    "event": "snapshot_relacao_carregado",
+                    "caminho": str(self._caminho),
+                    "dataset_versao": novo.dataset_versao,
+                    "identificadores": novo.n_identificadores,
+                    "eventos": novo.n_eventos,
+                }
+            ).decode()
+        )
+
+    async def _executar(self) -> None:
+        while True:
+            await self.verificar()
+            await asyncio.sleep(self._intervalo_segundos)
+
+    async def iniciar(self) -> None:
+        if self.habilitado and self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        if self.snapshot is not None:
+            self.snapshot.fechar()
+            self.snapshot = None
+
+    def estatisticas(self) -> dict[str, int | bool | str | None]:
+        snapshot = self.snapshot
+        return {
+            "habilitado": self.habilitado,
+            "caminho": str(self._caminho) if self._caminho else None,
+            "ativo": self.ativo() is not None,
+            "dataset_versao": snapshot.dataset_versao if snapshot else None,
+            "identificadores": snapshot.n_identificadores if snapshot else None,
+            "eventos": snapshot.n_eventos if snapshot else None,
+            "criado_em": snapshot.criado_em if snapshot else None,
+        }
+
+
+monitor_snapshot_relacao = MonitorSnapshotRelacao(
+    settings.SNAPSHOT_RELACAO_CAMINHO,
+    intervalo_segundos=settings.SNAPSHOT_RELACAO_INTERVALO_SEGUNDOS,
+    versao_dataset=lambda: monitor_versao_dataset.versao,
+)
@@ -0,0 +1,117 @@
+import codecs
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import Any, Literal
+
+import orjson
+import psycopg
+
+from app.db.repositories.verificacao_repo import VerificacaoPessoasRepository
+from app.services.exceptions import ListaPessoasInvalidaError
+
+FormatoSaida = Literal["csv", "ndjson"]
+
+TIPOS_CONTEUDO: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+COLUNAS_SAIDA = (
+    "linha",
+    "id_pessoa",
+    "status",
+    "esta_no_alerta",
+    "metodos_com_alerta",
+    "metodos_avaliados_sem_alerta",
+)
+
+
+def _coluna_id_pessoa(cabecalho: list[str]) -> int:
+    nomes = [nome.strip().lower() for nome in cabecalho]
+    if "id_pessoa" not in nomes:
+        raise ListaPessoasInvalidaError("O cabeçalho do CSV precisa ter a coluna id_pessoa.")
+    return nomes.index("id_pessoa")
+
+
+# Lê um CSV com cabeçalho (a coluna id_pessoa; as demais são ignoradas) a partir
+# de pedaços de bytes, sem juntar a entrada inteira: só a linha incompleta do
+# fim de cada pedaço fica guardada. Campos entre aspas não podem ter quebra de linha.
+async def ler_id_pessoa(partes: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    coluna: int | None = None
+
+    def _valores(linhas: list[str]) -> Iterable[str]:
+        nonlocal coluna
+        for registro in csv.reader(linhas):
+            if not registro:
+                continue
+            if coluna is None:
+                coluna = _coluna_id_pessoa(registro)
+                continue
+            yield registro[coluna].strip() if coluna < len(registro) else ""
+
+    try:
+        async for parte in partes:
+            linhas = (resto + decodificador.decode(parte)).split("\n")
+            resto = linhas.pop()
+            for valor in _valores(linhas):
+                yield valor
+
+        for valor in _valores([resto + decodificador.decode(b"", final=True)]):
+            yield valor
+    except UnicodeDecodeError:
+        raise ListaPessoasInvalidaError("A entrada precisa estar em UTF-8.") from None
+    except csv.Error as e:
+        raise ListaPessoasInvalidaError(f"CSV inválido: {e}") from None
+
+    if coluna is None:
+        raise ListaPessoasInvalidaError("Entrada vazia: envie um CSV com a coluna id_pessoa.")
+
+
+def _csv(lote: list[tuple[Any, ...]]) -> bytes:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    for linha, id_pessoa, status, alerta, com_alerta, sem_alerta in lote:
+        escritor.writerow(
+            (
+                linha,
+                id_pessoa,
+                status,
+                "true" if alerta else "false",
+                ";".join(com_alerta),
+                ";".join(sem_alerta),
+            )
+        )
+    return buffer.getvalue().encode()
+
+
+def _ndjson(lote: list[tuple[Any, ...]]) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(zip(COLUNAS_SAIDA, registro)), option=orjson.OPT_APPEND_NEWLINE)
+        for registro in lote
+    )
+
+
+# Verificação de uma lista de id_pessoa (CLI e API): a lista entra por COPY
+# numa tabela temporária e o status sai em lotes do cursor do servidor, então
+# a memória usada não depende do tamanho da lista. `conn` precisa estar numa
+# transação (a tabela temporária é desfeita com ela).
+class VerificacaoPessoasService:
+    def __init__(self, repo: VerificacaoPessoasRepository | None = None) -> None:
+        self._repo = repo or VerificacaoPessoasRepository()
+
+    async def carregar(
+        self, conn: psycopg.AsyncConnection, partes: AsyncIterable[bytes], *, max_linhas: int
+    ) -> int:
+        return await self._repo.copiar_lista(conn, ler_id_pessoa(partes), max_linhas=max_linhas)
+
+    async def gerar(
+        self, conn: psycopg.AsyncConnection, formato: FormatoSaida, *, tamanho_lote: int = 5000
+    ) -> AsyncIterator[bytes]:
+        formatar = _csv if formato == "csv" else _ndjson
+        if formato == "csv":
+            yield (",".join(COLUNAS_SAIDA) + "\n").encode()
+        async for lote in self._repo.iter_status(conn, tamanho_lote=tamanho_lote):
+            yield formatar(lote)
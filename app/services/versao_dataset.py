@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.repositories.dataset_repo import DatasetRepository
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("app.dataset")
+
+
+# Consulta periodicamente monitoramento.dataset_versao e avisa os interessados
+# (caches do worker) quando o loader publica uma nova carga.
+class MonitorVersaoDataset:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        intervalo_segundos: float,
+        repo: DatasetRepository | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._intervalo_segundos = intervalo_segundos
+        self._repo = repo or DatasetRepository()
+        self._callbacks: list[Callable[[], None]] = []
+        self._tarefa: asyncio.Task[None] | None = None
+        self.versao: int | None = None
+
+    def ao_mudar(self, callback: Callable[[], None]) -> None:
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    async def verificar(self) -> None:
+        try:
+            async with self._session_factory() as db:
+                versao = await self._repo.versao_atual(db)
+        except Exception:
+            logger.exception(orjson.dumps({"event": "dataset_versao_falhou"}).decode())
+            return
+
+        anterior, self.versao = self.versao, versao
+        if anterior is None or anterior == versao:
+            return
+
+        logger.info(
+            orjson.dumps(
+                {"event": "dataset_versao_alterada", "anterior": anterior, "atual": versao}
+            ).decode()
+        )
+        for callback in self._callbacks:
+            callback()
+
+    async def _executar(self) -> None:
+        while True:
+            await self.verificar()
+            await asyncio.sleep(self._intervalo_segundos)
+
+    async def iniciar(self) -> None:
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+
+monitor_versao_dataset = MonitorVersaoDataset(
+    SessionLocal,
+    intervalo_segundos=settings.DATASET_VERSAO_INTERVALO_SEGUNDOS,
+)
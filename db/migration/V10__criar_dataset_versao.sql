@@ -0,0 +1,11 @@
+-- Versão do conjunto de dados carregado. O loader (scripts/load_parquet.py)
+-- incrementa `versao` a cada carga; os workers da API consultam esta linha
+-- periodicamente e descartam os caches quando ela muda.
+CREATE TABLE monitoramento.dataset_versao (
+    id SMALLINT PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT dataset_versao_unica_chk CHECK (id = 1)
+);
+
+INSERT INTO monitoramento.dataset_versao (id, versao) VALUES (1, 1);
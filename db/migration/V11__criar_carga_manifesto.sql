@@ -0,0 +1,12 @@
+-- Arquivos .parquet já carregados por scripts/load_parquet.py. Um arquivo com
+-- o mesmo caminho, tamanho e fingerprint (sha256 do conteúdo) é ignorado nas
+-- próximas execuções, a menos que o loader seja chamado com --force. Com o
+-- mesmo tamanho e mtime_ns (st_mtime_ns), o loader nem calcula o sha256.
+CREATE TABLE monitoramento.carga_manifesto (
+    caminho TEXT PRIMARY KEY,
+    tamanho_bytes BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    linhas BIGINT NOT NULL,
+    carregado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
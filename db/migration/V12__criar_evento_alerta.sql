@@ -0,0 +1,62 @@
+-- Prioridade de cada método de identificação na escolha do evento de alerta
+-- (menor vence; empate pela data mais recente). É a única definição da regra:
+-- o loader (scripts/load_parquet.py) a usa para montar evento_alerta. Métodos
+-- sem linha aqui ficam com a prioridade de prioridade_metodo_identificacao_padrao
+-- (uma linha). Depois de alterar, recalcule com
+-- `python scripts/load_parquet.py --recalcular-evento-alerta`.
+CREATE TABLE monitoramento.prioridade_metodo_identificacao (
+    metodo_identificacao monitoramento.metodo_identificacao_enum PRIMARY KEY,
+    prioridade SMALLINT NOT NULL
+);
+
+CREATE TABLE monitoramento.prioridade_metodo_identificacao_padrao (
+    unica BOOLEAN PRIMARY KEY DEFAULT true CHECK (unica),
+    prioridade SMALLINT NOT NULL
+);
+
+INSERT INTO monitoramento.prioridade_metodo_identificacao_padrao (prioridade)
+VALUES (2);
+
+INSERT INTO monitoramento.prioridade_metodo_identificacao (metodo_identificacao, prioridade)
+VALUES
+    ('notificacao_sinan', 0),
+    ('modelo_semantica_explicita', 1),
+    ('modelo_classificacao_provavel', 2);
+
+-- Evento de alerta prioritário de cada (individuo_id, tipo_evento), mantido
+-- pelo loader a cada carga: /relacao lê uma linha pela chave primária em vez
+-- de ordenar os eventos a cada requisição.
+CREATE TABLE monitoramento.evento_alerta (
+    individuo_id BIGINT NOT NULL
+        REFERENCES monitoramento.individuo(id)
+        ON DELETE CASCADE,
+    tipo_evento TEXT NOT NULL,
+    metodo_identificacao monitoramento.metodo_identificacao_enum NOT NULL,
+    data_identificacao DATE NOT NULL,
+    banco_origem_identificacao monitoramento.banco_origem_identificacao_enum,
+    id_registro_identificacao TEXT,
+    PRIMARY KEY (individuo_id, tipo_evento)
+);
+
+INSERT INTO monitoramento.evento_alerta (
+    individuo_id,
+    tipo_evento,
+    metodo_identificacao,
+    data_identificacao,
+    banco_origem_identificacao,
+    id_registro_identificacao
+)
+SELECT DISTINCT ON (ie.individuo_id, ie.tipo_evento)
+    ie.individuo_id,
+    ie.tipo_evento,
+    ie.metodo_identificacao,
+    ie.data_identificacao,
+    ie.banco_origem_identificacao,
+    ie.id_registro_identificacao
+FROM monitoramento.individuo_evento ie
+CROSS JOIN monitoramento.prioridade_metodo_identificacao_padrao pp
+LEFT JOIN monitoramento.prioridade_metodo_identificacao p
+  ON p.metodo_identificacao = ie.metodo_identificacao
+WHERE ie.gera_alerta = true
+  AND ie.metodo_identificacao <> 'n_a'
+ORDER BY ie.individuo_id, ie.tipo_evento, COALESCE(p.prioridade, pp.prioridade), ie.data_identificacao DESC;
@@ -0,0 +1,86 @@
+-- Tipos de identificador. `digitos` é o tamanho dos valores guardados como
+-- número (valor_numerico); tipos sem `digitos` guardam sempre o texto. Os
+-- códigos precisam ser os mesmos de app/core/identificadores.py.
+CREATE TABLE monitoramento.tipo_identificador (
+    codigo SMALLINT PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    digitos SMALLINT
+);
+
+INSERT INTO monitoramento.tipo_identificador (codigo, nome, digitos)
+VALUES
+    (1, 'cpf', 11),
+    (2, 'cns', 15);
+
+-- Fallback para tipos fora de cpf/cns já gravados: sem `digitos`, os valores
+-- ficam em valor_texto, com códigos a partir de 100 (os de 1 a 99 são os de
+-- app/core/identificadores.py).
+INSERT INTO monitoramento.tipo_identificador (codigo, nome)
+SELECT 99 + row_number() OVER (ORDER BY tipo_identificador), tipo_identificador
+FROM (
+    SELECT DISTINCT tipo_identificador
+    FROM monitoramento.individuo_identificador
+    WHERE tipo_identificador NOT IN ('cpf', 'cns')
+) outros;
+
+-- A tabela é reescrita (em vez de ALTER + UPDATE, que dobraria o heap) com o
+-- tipo como SMALLINT e o valor como BIGINT quando tem exatamente `digitos`
+-- dígitos; o resto vai para valor_texto. Os ids e a sequence são mantidos.
+CREATE TABLE monitoramento.individuo_identificador__v13 (
+    id BIGINT NOT NULL DEFAULT nextval('monitoramento.individuo_identificador_id_seq'),
+    individuo_id BIGINT NOT NULL,
+    tipo_codigo SMALLINT NOT NULL,
+    valor_numerico BIGINT,
+    valor_texto TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO monitoramento.individuo_identificador__v13
+    (id, individuo_id, tipo_codigo, valor_numerico, valor_texto, created_at)
+SELECT
+    ii.id,
+    ii.individuo_id,
+    t.codigo,
+    CASE
+        WHEN length(ii.valor_identificador) = t.digitos AND ii.valor_identificador ~ '^[0-9]+$'
+        THEN ii.valor_identificador::bigint
+    END,
+    CASE
+        WHEN length(ii.valor_identificador) = t.digitos AND ii.valor_identificador ~ '^[0-9]+$'
+        THEN NULL
+        ELSE ii.valor_identificador
+    END,
+    ii.created_at
+FROM monitoramento.individuo_identificador ii
+JOIN monitoramento.tipo_identificador t ON t.nome = ii.tipo_identificador;
+
+ALTER SEQUENCE monitoramento.individuo_identificador_id_seq OWNED BY NONE;
+DROP TABLE monitoramento.individuo_identificador;
+-- Gerações de --full-refresh com o layout antigo não podem mais ser restauradas.
+DROP TABLE IF EXISTS monitoramento.individuo_identificador__anterior;
+DROP TABLE IF EXISTS monitoramento.individuo_identificador__sombra;
+
+ALTER TABLE monitoramento.individuo_identificador__v13 RENAME TO individuo_identificador;
+ALTER SEQUENCE monitoramento.individuo_identificador_id_seq
+    OWNED BY monitoramento.individuo_identificador.id;
+
+ALTER TABLE monitoramento.individuo_identificador
+    ADD CONSTRAINT individuo_identificador_pkey PRIMARY KEY (id),
+    ADD CONSTRAINT individuo_identificador_individuo_id_fkey
+        FOREIGN KEY (individuo_id) REFERENCES monitoramento.individuo(id) ON DELETE CASCADE,
+    ADD CONSTRAINT individuo_identificador_valor_chk
+        CHECK ((valor_numerico IS NULL) <> (valor_texto IS NULL));
+
+-- Um índice único por forma de armazenamento; individuo_id incluído para a
+-- resolução de identificadores ser só index-only scan.
+CREATE UNIQUE INDEX ux_individuo_identificador_numerico
+ON monitoramento.individuo_identificador (tipo_codigo, valor_numerico)
+INCLUDE (individuo_id)
+WHERE valor_numerico IS NOT NULL;
+
+CREATE UNIQUE INDEX ux_individuo_identificador_texto
+ON monitoramento.individuo_identificador (tipo_codigo, valor_texto)
+INCLUDE (individuo_id)
+WHERE valor_texto IS NOT NULL;
+
+ANALYZE monitoramento.individuo_identificador;
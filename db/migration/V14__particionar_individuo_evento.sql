@@ -0,0 +1,133 @@
+-- individuo_evento particionada por LIST (tipo_evento): uma partição por tipo
+-- de evento (opcionalmente subparticionada por HASH (individuo_id)) e uma
+-- partição padrão para tipos ainda sem partição própria. Consultas com
+-- tipo_evento = ... leem só a partição do tipo; os índices criados aqui valem
+-- para todas as partições, inclusive as criadas depois.
+--
+-- A chave primária de uma tabela particionada precisa conter as colunas das
+-- chaves de partição: passa a ser (id, tipo_evento, individuo_id).
+
+ALTER SEQUENCE monitoramento.individuo_evento_id_seq OWNED BY NONE;
+ALTER TABLE monitoramento.individuo_evento RENAME TO individuo_evento__v14;
+ALTER TABLE monitoramento.individuo_evento__v14 RENAME CONSTRAINT individuo_evento_pkey TO individuo_evento__v14_pkey;
+ALTER INDEX monitoramento.ux_individuo_evento_origem_metodo RENAME TO ux_individuo_evento_origem_metodo__v14;
+ALTER INDEX monitoramento.idx_individuo_evento_alerta RENAME TO idx_individuo_evento_alerta__v14;
+
+CREATE TABLE monitoramento.individuo_evento (
+    id BIGINT NOT NULL DEFAULT nextval('monitoramento.individuo_evento_id_seq'),
+    individuo_id BIGINT NOT NULL,
+    tipo_evento TEXT NOT NULL,
+    data_identificacao DATE NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    metodo_identificacao monitoramento.metodo_identificacao_enum NOT NULL DEFAULT 'n_a',
+    banco_origem_identificacao monitoramento.banco_origem_identificacao_enum,
+    id_registro_identificacao TEXT,
+    gera_alerta BOOLEAN NOT NULL DEFAULT false,
+    CONSTRAINT individuo_evento_pkey PRIMARY KEY (id, tipo_evento, individuo_id),
+    CONSTRAINT individuo_evento_individuo_id_fkey
+        FOREIGN KEY (individuo_id) REFERENCES monitoramento.individuo(id) ON DELETE CASCADE,
+    CONSTRAINT individuo_evento_identificacao_origem_chk CHECK (
+        (id_registro_identificacao IS NULL AND banco_origem_identificacao IS NULL)
+        OR
+        (id_registro_identificacao IS NOT NULL AND banco_origem_identificacao IS NOT NULL)
+    )
+) PARTITION BY LIST (tipo_evento);
+
+ALTER SEQUENCE monitoramento.individuo_evento_id_seq
+    OWNED BY monitoramento.individuo_evento.id;
+
+CREATE UNIQUE INDEX ux_individuo_evento_origem_metodo
+  ON monitoramento.individuo_evento (
+    individuo_id,
+    tipo_evento,
+    metodo_identificacao,
+    banco_origem_identificacao,
+    id_registro_identificacao
+  )
+  WHERE id_registro_identificacao IS NOT NULL
+    AND banco_origem_identificacao IS NOT NULL;
+
+-- Índice de alerta parcial, criado em cada partição.
+CREATE INDEX idx_individuo_evento_alerta
+ON monitoramento.individuo_evento (individuo_id, tipo_evento)
+WHERE gera_alerta = true AND metodo_identificacao <> 'n_a';
+
+CREATE TABLE monitoramento.individuo_evento_padrao
+PARTITION OF monitoramento.individuo_evento DEFAULT;
+
+-- Cria a partição de um tipo de evento (com `particoes_hash` > 1, subparticionada
+-- por HASH (individuo_id)) e move para ela as linhas do tipo que estavam na
+-- partição padrão. Ex.: CALL monitoramento.criar_particao_evento('violencia', 4);
+CREATE PROCEDURE monitoramento.criar_particao_evento(
+    p_tipo_evento TEXT,
+    p_particoes_hash INTEGER DEFAULT 0
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    nome TEXT := 'individuo_evento_' || regexp_replace(lower(p_tipo_evento), '[^a-z0-9]+', '_', 'g');
+    i INTEGER;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE monitoramento.%I (LIKE monitoramento.individuo_evento '
+        'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)%s',
+        nome,
+        CASE WHEN p_particoes_hash > 1 THEN ' PARTITION BY HASH (individuo_id)' ELSE '' END
+    );
+
+    IF p_particoes_hash > 1 THEN
+        FOR i IN 0 .. p_particoes_hash - 1 LOOP
+            EXECUTE format(
+                'CREATE TABLE monitoramento.%I PARTITION OF monitoramento.%I '
+                'FOR VALUES WITH (MODULUS %s, REMAINDER %s)',
+                nome || '_h' || i, nome, p_particoes_hash, i
+            );
+        END LOOP;
+    END IF;
+
+    EXECUTE format(
+        'WITH movidas AS ('
+        '    DELETE FROM monitoramento.individuo_evento_padrao WHERE tipo_evento = %L RETURNING *'
+        ') INSERT INTO monitoramento.%I SELECT * FROM movidas',
+        p_tipo_evento, nome
+    );
+
+    EXECUTE format(
+        'ALTER TABLE monitoramento.individuo_evento ATTACH PARTITION monitoramento.%I '
+        'FOR VALUES IN (%L)',
+        nome, p_tipo_evento
+    );
+END;
+$$;
+
+CALL monitoramento.criar_particao_evento('violencia');
+
+INSERT INTO monitoramento.individuo_evento (
+    id,
+    individuo_id,
+    tipo_evento,
+    data_identificacao,
+    created_at,
+    metodo_identificacao,
+    banco_origem_identificacao,
+    id_registro_identificacao,
+    gera_alerta
+)
+SELECT
+    id,
+    individuo_id,
+    tipo_evento,
+    data_identificacao,
+    created_at,
+    metodo_identificacao,
+    banco_origem_identificacao,
+    id_registro_identificacao,
+    gera_alerta
+FROM monitoramento.individuo_evento__v14;
+
+DROP TABLE monitoramento.individuo_evento__v14;
+-- Gerações de --full-refresh com a tabela não particionada não podem mais ser restauradas.
+DROP TABLE IF EXISTS monitoramento.individuo_evento__anterior;
+DROP TABLE IF EXISTS monitoramento.individuo_evento__sombra;
+
+ANALYZE monitoramento.individuo_evento;
@@ -0,0 +1,53 @@
+-- Contadores diários em faixas: cada worker soma na sua faixa (0..N-1) da
+-- chave, e não na mesma linha que os outros workers, o que elimina a espera
+-- por lock de linha no upsert. A leitura soma as faixas na view
+-- metricas_diarias_endpoint, com as mesmas colunas da tabela anterior.
+-- A compactação (feita pela API) soma na faixa 0 as faixas dos dias fechados.
+
+ALTER TABLE monitoramento.metricas_diarias_endpoint RENAME TO metricas_diarias_endpoint_faixa;
+ALTER TABLE monitoramento.metricas_diarias_endpoint_faixa
+    ADD COLUMN faixa SMALLINT NOT NULL DEFAULT 0;
+
+ALTER TABLE monitoramento.metricas_diarias_endpoint_faixa
+    DROP CONSTRAINT metricas_diarias_endpoint_pkey;
+ALTER TABLE monitoramento.metricas_diarias_endpoint_faixa
+    ADD CONSTRAINT metricas_diarias_endpoint_faixa_pkey
+    PRIMARY KEY (endpoint, tipo_evento, metodo_identificacao, data, faixa);
+
+CREATE VIEW monitoramento.metricas_diarias_endpoint AS
+SELECT
+    endpoint,
+    tipo_evento,
+    data,
+    SUM(total_chamadas)::bigint AS total_chamadas,
+    SUM(respostas_positivas)::bigint AS respostas_positivas,
+    MAX(updated_at) AS updated_at,
+    metodo_identificacao
+FROM monitoramento.metricas_diarias_endpoint_faixa
+GROUP BY endpoint, tipo_evento, metodo_identificacao, data;
+
+-- Quem lia a tabela (dashboards, papéis só de leitura) passa a ler a view:
+-- ela recebe os privilégios concedidos na tabela renomeada (o dono já é o
+-- mesmo; grantee 0 é PUBLIC).
+DO $$
+DECLARE
+    p record;
+BEGIN
+    FOR p IN
+        SELECT
+            a.privilege_type,
+            a.is_grantable,
+            CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END AS grantee
+        FROM pg_class c
+        CROSS JOIN LATERAL aclexplode(c.relacl) a
+        WHERE c.oid = 'monitoramento.metricas_diarias_endpoint_faixa'::regclass
+          AND a.grantee <> c.relowner
+    LOOP
+        EXECUTE format(
+            'GRANT %s ON monitoramento.metricas_diarias_endpoint TO %s%s',
+            p.privilege_type,
+            p.grantee,
+            CASE WHEN p.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END
+        );
+    END LOOP;
+END $$;
@@ -0,0 +1,25 @@
+-- Rollup diário das métricas de uso por (tipo_evento, método), somando
+-- endpoints e faixas, lido pelos endpoints /api/v1/estatisticas no lugar de
+-- varreduras de metricas_diarias_endpoint. A API atualiza os dias recentes
+-- periodicamente (upsert só das linhas que mudaram).
+
+CREATE TABLE monitoramento.estatisticas_diarias (
+    tipo_evento TEXT NOT NULL,
+    data DATE NOT NULL,
+    metodo_identificacao TEXT NOT NULL,
+    total_chamadas BIGINT NOT NULL,
+    respostas_positivas BIGINT NOT NULL,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT estatisticas_diarias_pkey PRIMARY KEY (tipo_evento, data, metodo_identificacao)
+);
+
+-- A atualização lê só os dias recentes. `data` não muda nos upserts das
+-- métricas: o índice não impede HOT updates.
+CREATE INDEX idx_metricas_diarias_endpoint_faixa_data
+ON monitoramento.metricas_diarias_endpoint_faixa (data);
+
+INSERT INTO monitoramento.estatisticas_diarias
+    (tipo_evento, data, metodo_identificacao, total_chamadas, respostas_positivas)
+SELECT tipo_evento, data, metodo_identificacao, SUM(total_chamadas), SUM(respostas_positivas)
+FROM monitoramento.metricas_diarias_endpoint_faixa
+GROUP BY tipo_evento, data, metodo_identificacao;
@@ -0,0 +1,10 @@
+-- Índice parcial dos eventos de alerta, no lugar de
+-- idx_individuo_evento_lookup_alerta (mesmas colunas iniciais, predicado mais
+-- restrito). Já é a forma final: a escolha do evento prioritário fica em
+-- monitoramento.evento_alerta (V12), e o loader só precisa localizar os
+-- eventos de alerta de cada (individuo_id, tipo_evento) afetado pela carga.
+CREATE INDEX idx_individuo_evento_alerta
+ON monitoramento.individuo_evento (individuo_id, tipo_evento)
+WHERE gera_alerta = true AND metodo_identificacao <> 'n_a';
+
+DROP INDEX IF EXISTS monitoramento.idx_individuo_evento_lookup_alerta;
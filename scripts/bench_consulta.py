@@ -0,0 +1,169 @@
+"""Benchmark do caminho de leitura de /relacao: AsyncSession x conexão read-only.
+
+Compara, contra um banco com dados carregados e sem o cache de resultados, o
+custo por consulta de:
+
+- sessao: o caminho anterior (AsyncSession por requisição, como get_db(), e o
+  Row do SQLAlchemy como resultado);
+- conexao: o caminho atual (conexao_leitura(): AsyncConnection em transação
+  READ ONLY e o resultado como EventoRelacionado).
+
+Os dois modos executam o mesmo SQL (RelacaoRepository) com os mesmos
+identificadores, sorteados de monitoramento.individuo_identificador. Para cada
+modo são medidos a latência (média, p50, p99) e, com tracemalloc, os bytes
+alocados (pico) e retidos por consulta. A medição de memória roda numa segunda
+passada, porque o tracemalloc deixa o Python mais lento.
+
+Uso:
+    python scripts/bench_consulta.py --database-url postgresql+psycopg://... --consultas 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _configurar_ambiente(database_url: str) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    # logs de consultas lentas não interessam aqui
+    os.environ.setdefault("DATABASE_CONSULTA_LENTA_MS", "-1")
+
+
+async def _amostrar_pares(conexao_leitura, quantidade: int) -> list[list[tuple[str, str]]]:
+    from sqlalchemy import text
+
+    from app.core.identificadores import VALOR_TEXTO_SQL
+
+    async with conexao_leitura() as conn:
+        res = await conn.execute(
+            text(
+                f"""
+                SELECT t.nome, {VALOR_TEXTO_SQL}
+                FROM monitoramento.individuo_identificador ii TABLESAMPLE SYSTEM (1)
+                JOIN monitoramento.tipo_identificador t ON t.codigo = ii.tipo_codigo
+                LIMIT :quantidade
+                """
+            ),
+            {"quantidade": quantidade},
+        )
+        return [[(tipo, valor)] for tipo, valor in res]
+
+
+async def _consulta_sessao(session_local, pares, tipo_evento):
+    from app.db.repositories.relacao_repo import (
+        _BUSCAR_EVENTO_RELACIONADO,
+        parametros_identificadores,
+    )
+
+    parametros = parametros_identificadores([pares], posicoes=False)
+
+    # caminho anterior: sessão do ORM e Row como resultado
+    async with session_local() as db:
+        res = await db.execute(
+            _BUSCAR_EVENTO_RELACIONADO, {**parametros, "tipo_evento": tipo_evento}
+        )
+        row = res.one()
+        return list(row.individuos or []), (row if row.individuo_id is not None else None)
+
+
+async def _consulta_conexao(conexao_leitura, repo, pares, tipo_evento):
+    async with conexao_leitura() as conn:
+        return await repo.buscar_evento_relacionado(
+            conn, pares_identificadores=pares, tipo_evento=tipo_evento
+        )
+
+
+async def _medir(consulta, amostras, tipo_evento, *, memoria: bool) -> dict:
+    latencias: list[float] = []
+    picos: list[int] = []
+    retidos = 0
+    resultados = []
+
+    if memoria:
+        tracemalloc.start()
+    try:
+        for pares in amostras:
+            if memoria:
+                antes, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+            inicio = time.perf_counter()
+            # mantém o resultado vivo, como o cache faria
+            resultados.append(await consulta(pares, tipo_evento))
+            latencias.append(time.perf_counter() - inicio)
+            if memoria:
+                depois, pico = tracemalloc.get_traced_memory()
+                picos.append(pico - antes)
+                retidos += depois - antes
+    finally:
+        if memoria:
+            tracemalloc.stop()
+
+    if memoria:
+        return {
+            "pico_bytes_por_consulta": int(sum(picos) / len(picos)),
+            "retidos_bytes_por_consulta": int(retidos / len(amostras)),
+        }
+    ordenadas = sorted(latencias)
+    return {
+        "media_us": round(sum(latencias) / len(latencias) * 1e6, 1),
+        "p50_us": round(ordenadas[len(ordenadas) // 2] * 1e6, 1),
+        "p99_us": round(ordenadas[min(len(ordenadas) - 1, int(0.99 * len(ordenadas)))] * 1e6, 1),
+    }
+
+
+async def _executar(args: argparse.Namespace) -> None:
+    from app.db.repositories.relacao_repo import RelacaoRepository
+    from app.db.session import SessionLocal, aquecer_pool, conexao_leitura, engine
+
+    repo = RelacaoRepository()
+    await aquecer_pool()
+    try:
+        amostras = await _amostrar_pares(conexao_leitura, args.consultas)
+        if not amostras:
+            raise SystemExit("Nenhum identificador encontrado: carregue dados antes do benchmark.")
+
+        modos = {
+            "sessao": lambda pares, tipo: _consulta_sessao(SessionLocal, pares, tipo),
+            "conexao": lambda pares, tipo: _consulta_conexao(conexao_leitura, repo, pares, tipo),
+        }
+        # aquecimento: compilação do SQL, prepared statements e caches do psycopg
+        for consulta in modos.values():
+            for pares in amostras[: min(200, len(amostras))]:
+                await consulta(pares, args.tipo_evento)
+
+        print(f"consultas={len(amostras)} tipo_evento={args.tipo_evento}")
+        for nome, consulta in modos.items():
+            tempo = await _medir(consulta, amostras, args.tipo_evento, memoria=False)
+            memoria = await _medir(consulta, amostras, args.tipo_evento, memoria=True)
+            print(
+                f"{nome:<8} media={tempo['media_us']:>8} us  p50={tempo['p50_us']:>8} us  "
+                f"p99={tempo['p99_us']:>8} us  "
+                f"alocado(pico)={memoria['pico_bytes_por_consulta']:>7} B  "
+                f"retido={memoria['retidos_bytes_por_consulta']:>6} B"
+            )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--consultas", type=int, default=5000)
+    parser.add_argument("--tipo-evento", default="violencia")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("DATABASE_URL não informado (use --database-url ou env DATABASE_URL).")
+
+    _configurar_ambiente(args.database_url)
+    asyncio.run(_executar(args))
+
+
+if __name__ == "__main__":
+    main()
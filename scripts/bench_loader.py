@@ -0,0 +1,206 @@
+"""Benchmark do loader (scripts/load_parquet.py) com dados sintéticos.
+
+Gera parquet com scripts/gerar_parquet_sintetico.py (ou usa uma pasta já
+gerada com --parquet-dir), carrega cada arquivo no Postgres indicado e mede o
+tempo de cada etapa do loader:
+
+- fingerprint: sha256 do arquivo (manifesto de carga);
+- decodificacao: tempo em que o COPY esperou leitura/normalização/CSV;
+- copy: envio dos dados para a tabela temporária;
+- insert_individuo, insert_identificador, insert_evento: os INSERT ... SELECT DISTINCT;
+- evento_alerta: recálculo dos eventos de alerta prioritários afetados;
+- checagem_conflitos e setval;
+- transacao: a transação inteira, incluindo o commit.
+
+O resultado (parâmetros, commit do repositório, tempos por arquivo e totais,
+linhas/s e pico de memória) é gravado em JSON; com --comparar, as etapas são
+comparadas com um JSON de execução anterior.
+
+Use um banco descartável: a carga escreve nas tabelas de monitoramento e
+--limpar as esvazia (TRUNCATE) antes de começar.
+
+Uso:
+    python scripts/bench_loader.py --database-url postgresql://... --pessoas 1000000 --limpar
+    python scripts/bench_loader.py --parquet-dir /tmp/sintetico --comparar bench_loader_anterior.json
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import orjson
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from gerar_parquet_sintetico import gerar  # noqa: E402
+from load_parquet import (  # noqa: E402
+    LeituraParquet,
+    _iter_parquet_files,
+    load_parquet_file,
+)
+
+from app.db.dsn import dsn_psycopg  # noqa: E402
+
+ETAPAS = [
+    "fingerprint",
+    "decodificacao",
+    "copy",
+    "insert_individuo",
+    "insert_identificador",
+    "checagem_conflitos",
+    "insert_evento",
+    "evento_alerta",
+    "setval",
+    "transacao",
+]
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _limpar(conn: psycopg.Connection) -> None:
+    with conn.transaction():
+        conn.execute(
+            """
+            TRUNCATE monitoramento.evento_alerta,
+                     monitoramento.individuo_evento,
+                     monitoramento.individuo_identificador,
+                     monitoramento.individuo,
+                     monitoramento.carga_manifesto
+            RESTART IDENTITY;
+            """
+        )
+
+
+def _imprimir(resultado: dict, anterior: dict | None) -> None:
+    total = resultado["total"]
+    tempos_anteriores = (anterior or {}).get("total", {}).get("tempos", {})
+
+    print(
+        f"linhas={total['linhas']} segundos={total['segundos']:.2f} "
+        f"linhas/s={total['linhas_por_segundo']} pico_rss_mb={total['pico_rss_mb']}"
+    )
+    for etapa in ETAPAS:
+        segundos = total["tempos"].get(etapa, 0.0)
+        linha = f"  {etapa:<22} {segundos:9.3f} s"
+        if etapa in tempos_anteriores and tempos_anteriores[etapa] > 0:
+            variacao = (segundos / tempos_anteriores[etapa] - 1) * 100
+            linha += f"  ({variacao:+6.1f}% vs {anterior.get('commit') or 'anterior'})"
+        print(linha)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--parquet-dir", help="Pasta com parquet já gerado (não gera dados).")
+    parser.add_argument("--pessoas", type=int, default=100_000)
+    parser.add_argument("--identificadores-por-pessoa", type=int, default=2)
+    parser.add_argument("--eventos-por-pessoa", type=int, default=2)
+    parser.add_argument("--taxa-conflito", type=float, default=0.001)
+    parser.add_argument("--arquivos", type=int, default=1)
+    parser.add_argument("--row-group-size", type=int, default=250_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--threads-leitura", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--memoria-leitura-mb", type=int, default=512)
+    parser.add_argument(
+        "--limpar",
+        action="store_true",
+        help="Esvazia as tabelas de monitoramento (TRUNCATE) antes da carga.",
+    )
+    parser.add_argument("--saida-json", default="bench_loader.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar as etapas.")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("DATABASE_URL não informado (use --database-url ou env DATABASE_URL).")
+
+    anterior = orjson.loads(Path(args.comparar).read_bytes()) if args.comparar else None
+
+    with tempfile.TemporaryDirectory(prefix="bench_loader_") as temporario:
+        if args.parquet_dir:
+            arquivos = _iter_parquet_files(args.parquet_dir)
+            segundos_geracao = None
+        else:
+            inicio = time.perf_counter()
+            arquivos = gerar(
+                Path(temporario),
+                pessoas=args.pessoas,
+                identificadores_por_pessoa=args.identificadores_por_pessoa,
+                eventos_por_pessoa=args.eventos_por_pessoa,
+                taxa_conflito=args.taxa_conflito,
+                arquivos=args.arquivos,
+                row_group_size=args.row_group_size,
+                semente=args.semente,
+            )
+            segundos_geracao = time.perf_counter() - inicio
+
+        if not arquivos:
+            raise SystemExit("Nenhum arquivo .parquet encontrado.")
+
+        leitura = LeituraParquet(
+            batch_size=args.batch_size,
+            threads=args.threads_leitura,
+            memoria_max_mb=args.memoria_leitura_mb,
+        )
+        por_arquivo = []
+        tempos_total: dict[str, float] = {}
+        inicio = time.perf_counter()
+
+        with psycopg.connect(dsn_psycopg(args.database_url)) as conn:
+            if args.limpar:
+                _limpar(conn)
+
+            for fp in arquivos:
+                tempos: dict[str, float] = {}
+                res = load_parquet_file(
+                    conn, fp, leitura=leitura, strict_identificador=False, force=True, tempos=tempos
+                )
+                for etapa, segundos in tempos.items():
+                    tempos_total[etapa] = tempos_total.get(etapa, 0.0) + segundos
+                por_arquivo.append({"arquivo": fp.name, **res, "tempos": tempos})
+                print(f"OK: {fp.name} -> {res}")
+
+        segundos = time.perf_counter() - inicio
+
+    linhas = sum(item["rows_copiadas"] for item in por_arquivo)
+    parametros = {k: v for k, v in vars(args).items() if k not in ("database_url", "comparar")}
+    resultado = {
+        "commit": _commit_atual(),
+        "executado_em": datetime.now(timezone.utc).isoformat(),
+        "parametros": parametros,
+        "segundos_geracao": segundos_geracao,
+        "arquivos": por_arquivo,
+        "total": {
+            "linhas": linhas,
+            "segundos": segundos,
+            "linhas_por_segundo": int(linhas / segundos) if segundos > 0 else 0,
+            "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+            "tempos": tempos_total,
+        },
+    }
+
+    Path(args.saida_json).write_bytes(orjson.dumps(resultado, option=orjson.OPT_INDENT_2))
+    _imprimir(resultado, anterior)
+    print(f"Resultado gravado em {args.saida_json}")
+
+
+if __name__ == "__main__":
+    main()
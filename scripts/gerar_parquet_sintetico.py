@@ -0,0 +1,188 @@
+"""Gera arquivos .parquet sintéticos no formato lido por scripts/load_parquet.py.
+
+As colunas e tipos são os de `COLUMNS` do loader. Cada pessoa recebe
+`--identificadores-por-pessoa` identificadores (cpf/cns alternados, metade dos
+cpfs formatados com pontuação) e `--eventos-por-pessoa` eventos; o parquet é
+desnormalizado como as exportações reais (uma linha por identificador x
+evento). `--taxa-conflito` é a fração de identificadores que repete o valor de
+outra pessoa, o que exercita a checagem de conflitos do loader.
+
+Os dados são determinísticos para a mesma `--semente`.
+
+Uso:
+    python scripts/gerar_parquet_sintetico.py --saida /tmp/sintetico --pessoas 1000000
+"""
+
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from load_parquet import COLUMNS  # noqa: E402
+
+SCHEMA = pa.schema(
+    [
+        ("id_pessoa", pa.int64()),
+        ("tipo_evento", pa.string()),
+        ("metodo_identificacao", pa.string()),
+        ("data_identificacao", pa.date32()),
+        ("tipo_identificador", pa.string()),
+        ("valor_identificador", pa.string()),
+        ("banco_origem_identificacao", pa.string()),
+        ("id_registro_identificacao", pa.string()),
+        ("gera_alerta", pa.bool_()),
+    ]
+)
+assert SCHEMA.names == COLUMNS
+
+METODOS = [
+    "notificacao_sinan",
+    "modelo_semantica_explicita",
+    "modelo_classificacao_provavel",
+    "n_a",
+]
+BANCOS = ["e-SUS APS", "Sinan - Violências"]
+DATA_INICIAL = date(2020, 1, 1)
+DIAS = 5 * 365
+
+
+def _valor_identificador(tipo: str, pessoa: int, indice: int) -> str:
+    if tipo == "cpf":
+        digitos = f"{(pessoa * 1000 + indice) % 10**11:011d}"
+        if pessoa % 2:
+            return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+        return digitos
+    return f"7{(pessoa * 1000 + indice) % 10**14:014d}"
+
+
+def _linhas_pessoa(
+    rng: random.Random,
+    pessoa: int,
+    *,
+    identificadores_por_pessoa: int,
+    eventos_por_pessoa: int,
+    taxa_conflito: float,
+) -> list[tuple]:
+    identificadores = []
+    for indice in range(identificadores_por_pessoa):
+        tipo = "cpf" if indice % 2 == 0 else "cns"
+        # conflito: reaproveita o identificador de outra pessoa (a anterior)
+        dono = pessoa - 1 if pessoa > 1 and rng.random() < taxa_conflito else pessoa
+        identificadores.append((tipo, _valor_identificador(tipo, dono, indice)))
+
+    eventos = []
+    for indice in range(eventos_por_pessoa):
+        metodo = rng.choice(METODOS)
+        if metodo == "n_a":
+            banco, registro = None, None
+        else:
+            banco, registro = rng.choice(BANCOS), f"{pessoa}-{indice}"
+        eventos.append(
+            (
+                "violencia",
+                metodo,
+                DATA_INICIAL + timedelta(days=rng.randrange(DIAS)),
+                banco,
+                registro,
+                metodo != "n_a" and rng.random() < 0.8,
+            )
+        )
+
+    return [
+        (pessoa, evento, metodo, data, tipo, valor, banco, registro, alerta)
+        for (tipo, valor) in identificadores
+        for (evento, metodo, data, banco, registro, alerta) in eventos
+    ]
+
+
+def gerar(
+    saida: Path,
+    *,
+    pessoas: int,
+    identificadores_por_pessoa: int,
+    eventos_por_pessoa: int,
+    taxa_conflito: float,
+    arquivos: int = 1,
+    row_group_size: int = 250_000,
+    semente: int = 42,
+) -> list[Path]:
+    saida.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(semente)
+    por_arquivo = -(-pessoas // arquivos)
+    caminhos: list[Path] = []
+
+    for numero in range(arquivos):
+        primeira = numero * por_arquivo + 1
+        ultima = min(pessoas, primeira + por_arquivo - 1)
+        caminho = saida / f"sintetico_{numero:04d}.parquet"
+
+        with pq.ParquetWriter(caminho, SCHEMA) as writer:
+            linhas: list[tuple] = []
+            for pessoa in range(primeira, ultima + 1):
+                linhas.extend(
+                    _linhas_pessoa(
+                        rng,
+                        pessoa,
+                        identificadores_por_pessoa=identificadores_por_pessoa,
+                        eventos_por_pessoa=eventos_por_pessoa,
+                        taxa_conflito=taxa_conflito,
+                    )
+                )
+                if len(linhas) >= row_group_size:
+                    writer.write_table(_tabela(linhas), row_group_size=row_group_size)
+                    linhas = []
+            if linhas:
+                writer.write_table(_tabela(linhas), row_group_size=row_group_size)
+
+        caminhos.append(caminho)
+
+    return caminhos
+
+
+def _tabela(linhas: list[tuple]) -> pa.Table:
+    colunas = list(zip(*linhas))
+    return pa.Table.from_arrays(
+        [pa.array(col, type=campo.type) for col, campo in zip(colunas, SCHEMA)],
+        schema=SCHEMA,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", required=True, help="Pasta onde os .parquet serão gravados.")
+    parser.add_argument("--pessoas", type=int, default=100_000)
+    parser.add_argument("--identificadores-por-pessoa", type=int, default=2)
+    parser.add_argument("--eventos-por-pessoa", type=int, default=2)
+    parser.add_argument("--taxa-conflito", type=float, default=0.001)
+    parser.add_argument("--arquivos", type=int, default=1)
+    parser.add_argument("--row-group-size", type=int, default=250_000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.pessoas < 1 or args.arquivos < 1:
+        raise SystemExit("--pessoas e --arquivos devem ser maiores ou iguais a 1.")
+    if not 0 <= args.taxa_conflito <= 1:
+        raise SystemExit("--taxa-conflito deve estar entre 0 e 1.")
+
+    caminhos = gerar(
+        Path(args.saida),
+        pessoas=args.pessoas,
+        identificadores_por_pessoa=args.identificadores_por_pessoa,
+        eventos_por_pessoa=args.eventos_por_pessoa,
+        taxa_conflito=args.taxa_conflito,
+        arquivos=args.arquivos,
+        row_group_size=args.row_group_size,
+        semente=args.semente,
+    )
+    for caminho in caminhos:
+        print(f"OK: {caminho} ({pq.ParquetFile(caminho).metadata.num_rows} linhas)")
+
+
+if __name__ == "__main__":
+    main()
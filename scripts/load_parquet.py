@@ -9,8 +9,18 @@ O parquet deve conter as colunas:
 
 Este script popula as tabelas:
 - monitoramento.individuo (id = id_pessoa)
-- monitoramento.individuo_identificador
+- monitoramento.individuo_identificador (tipo como código e, para cpf/cns com
+  o número de dígitos do tipo, valor como BIGINT; ver app/core/identificadores.py)
 - monitoramento.individuo_evento
+- monitoramento.evento_alerta (evento de alerta prioritário por indivíduo e
+  tipo_evento, pela regra de monitoramento.prioridade_metodo_identificacao)
+
+e incrementa monitoramento.dataset_versao ao final de cada arquivo, o que faz
+os workers da API descartarem os caches de resultado.
+
+Cada arquivo carregado é registrado em monitoramento.carga_manifesto (caminho,
+tamanho, mtime, sha256 do conteúdo, linhas e data da carga). Nas execuções
+seguintes, arquivos sem alteração são ignorados; use --force para recarregá-los.
 
 Para ler parquet, instale o extra:
     pip install .[loader]
@@ -18,19 +28,48 @@ Para ler parquet, instale o extra:
 Uso:
     python scripts/load_parquet.py --parquet /caminho/arquivo.parquet
     python scripts/load_parquet.py --parquet /caminho/pasta_com_parquets
+    python scripts/load_parquet.py --parquet /caminho/pasta_com_parquets --jobs 4
+    python scripts/load_parquet.py --parquet /caminho/pasta_com_parquets --full-refresh
+    python scripts/load_parquet.py --reverter-full-refresh
+    python scripts/load_parquet.py --recalcular-evento-alerta
+    python scripts/load_parquet.py --parquet /caminho/pasta_com_parquets --snapshot /dados/relacao.snapshot
 
 Por padrão, o script usa a variável de ambiente DATABASE_URL.
 """
 
 import argparse
+import functools
+import hashlib
+import io
+import multiprocessing
 import os
-from datetime import date, datetime
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, NamedTuple
 
 import psycopg
+from psycopg import sql
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.identificadores import (  # noqa: E402
+    TIPOS_IDENTIFICADOR,
+    VALOR_TEXTO_SQL,
+    decodificar_identificador,
+)
+from app.db.dsn import dsn_psycopg  # noqa: E402
 
 try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
     import pyarrow.parquet as pq
 except Exception as e:  # pragma: no cover
     pq = None  # type: ignore
@@ -51,19 +90,38 @@ COLUMNS = [
 
 BANCO_ORIGEM_IDENTIFICACAO_ENUM = set(["e-SUS APS", "Sinan - Violências"])
 
-TEMP_TABLE = "staging_parquet_eventos"
-
-
-def _dsn_for_psycopg(database_url: str) -> str:
-    url = database_url.strip().strip('"').strip("'")
+# common “string-null” junk
+VALORES_NULOS = ["", "nan", "none", "null"]
 
-    if url.startswith("postgresql+psycopg://"):
-        return "postgresql://" + url.removeprefix("postgresql+psycopg://")
+TEMP_TABLE = "staging_parquet_eventos"
 
-    if url.startswith("postgresql+psycopg_async://"):
-        return "postgresql://" + url.removeprefix("postgresql+psycopg_async://")
+# Colunas da tabela de staging (e do COPY): as de COLUMNS, com o identificador
+# já no formato de monitoramento.individuo_identificador.
+COLUNAS_STAGING = [
+    "id_pessoa",
+    "tipo_evento",
+    "metodo_identificacao",
+    "data_identificacao",
+    "tipo_codigo",
+    "valor_numerico",
+    "valor_texto",
+    "banco_origem_identificacao",
+    "id_registro_identificacao",
+    "gera_alerta",
+]
 
-    return url
+COLUNAS_STAGING_SQL = """
+    id_pessoa BIGINT NOT NULL,
+    tipo_evento TEXT NOT NULL,
+    metodo_identificacao monitoramento.metodo_identificacao_enum NOT NULL,
+    data_identificacao DATE NOT NULL,
+    tipo_codigo SMALLINT NOT NULL,
+    valor_numerico BIGINT,
+    valor_texto TEXT,
+    banco_origem_identificacao monitoramento.banco_origem_identificacao_enum,
+    id_registro_identificacao TEXT,
+    gera_alerta BOOLEAN DEFAULT FALSE
+"""
 
 
 def _iter_parquet_files(path_str: str) -> list[Path]:
@@ -75,73 +133,376 @@ def _iter_parquet_files(path_str: str) -> list[Path]:
     return [path]
 
 
-def _normalize_dt(value) -> date:
-    if value is None:
-        raise TypeError("data_identificacao não pode ser None")
+def _validate_columns(file_path: Path, available: Iterable[str]) -> None:
+    missing = set(COLUMNS).difference(set(available))
+    if missing:
+        cols = ", ".join(sorted(missing))
+        raise ValueError(
+            f"Parquet '{file_path}' não possui as colunas obrigatórias: {cols}"
+        )
 
-    if isinstance(value, date) and not isinstance(value, datetime):
-        return value
 
-    if isinstance(value, datetime):
-        return value.date()
+def _como_texto(arr, *, nulo_como: str | None = None):
+    arr = pc.cast(arr, pa.string())
+    # str(None) == "None": mesmo texto que o carregador linha a linha gerava
+    return pc.fill_null(arr, nulo_como) if nulo_como is not None else arr
 
-    if isinstance(value, (int, float)):
-        return datetime.utcfromtimestamp(value).date()
 
-    if isinstance(value, str):
-        s = value.strip()
+def _anular_vazios(arr):
+    arr = pc.utf8_trim_whitespace(_como_texto(arr))
+    vazio = pc.is_in(pc.utf8_lower(arr), value_set=pa.array(VALORES_NULOS))
+    return pc.if_else(pc.fill_null(vazio, True), pa.scalar(None, pa.string()), arr)
+
+
+def _normalizar_data(arr):
+    tipo = arr.type
+
+    if pa.types.is_timestamp(tipo):
+        if tipo.tz is not None:
+            arr = pc.local_timestamp(arr)
+        datas = pc.cast(arr, pa.date32())
+    elif pa.types.is_date(tipo):
+        datas = pc.cast(arr, pa.date32())
+    elif pa.types.is_integer(tipo) or pa.types.is_floating(tipo):
+        # epoch em segundos (UTC)
+        segundos = pc.cast(pc.floor(pc.cast(arr, pa.float64())), pa.int64())
+        datas = pc.cast(pc.cast(segundos, pa.timestamp("s")), pa.date32())
+    elif pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
         # aceita ISO completo ou só data
-        return date.fromisoformat(s[:10])
+        texto = pc.utf8_slice_codeunits(pc.utf8_trim_whitespace(arr), 0, 10)
+        datas = pc.cast(texto, pa.date32())
+    else:
+        raise TypeError(f"Tipo inválido para data_identificacao: {tipo}")
 
-    raise TypeError(f"Tipo inválido para data_identificacao: {type(value)!r}")
+    if datas.null_count:
+        raise TypeError("data_identificacao não pode ser None")
+    return datas
 
 
-def _validate_columns(file_path: Path, available: Iterable[str]) -> None:
-    missing = set(COLUMNS).difference(set(available))
-    if missing:
-        cols = ", ".join(sorted(missing))
-        raise ValueError(
-            f"Parquet '{file_path}' não possui as colunas obrigatórias: {cols}"
-        )
+# Normaliza um RecordBatch com operações colunares do Arrow. Retorna a tabela
+# pronta para o COPY (colunas na ordem de COLUNAS_STAGING) e a quantidade de linhas
+# contabilizadas em `rows_copiadas` (id_pessoa não nulo).
+def _normalizar_batch(batch) -> tuple["pa.Table", int]:
+    com_id = pc.is_valid(batch.column("id_pessoa"))
+    rows_copiadas = pc.sum(com_id).as_py() or 0
+
+    tipo_identificador = _como_texto(batch.column("tipo_identificador"))
+    manter = pc.and_(
+        com_id,
+        pc.fill_null(pc.is_in(tipo_identificador, value_set=pa.array(list(TIPOS_IDENTIFICADOR))), False),
+    )
+    batch = batch.filter(manter)
+
+    # Remover caracteres não numéricos
+    valor_identificador = pc.replace_substring_regex(
+        _como_texto(batch.column("valor_identificador"), nulo_como="None"),
+        pattern=r"[^0-9]",
+        replacement="",
+    )
 
+    # Código do tipo; valor como número quando tem os dígitos do tipo, senão texto.
+    indice_tipo = pc.index_in(
+        _como_texto(batch.column("tipo_identificador")),
+        value_set=pa.array(list(TIPOS_IDENTIFICADOR)),
+    )
+    tipo_codigo = pc.take(
+        pa.array([t.codigo for t in TIPOS_IDENTIFICADOR.values()], pa.int16()), indice_tipo
+    )
+    digitos = pc.take(
+        pa.array([t.digitos for t in TIPOS_IDENTIFICADOR.values()], pa.int32()), indice_tipo
+    )
+    numerico = pc.fill_null(pc.equal(pc.utf8_length(valor_identificador), digitos), False)
+    valor_numerico = pc.cast(
+        pc.if_else(numerico, valor_identificador, pa.scalar(None, pa.string())), pa.int64()
+    )
+    valor_texto = pc.if_else(numerico, pa.scalar(None, pa.string()), valor_identificador)
+
+    banco = pc.replace_substring_regex(
+        _anular_vazios(batch.column("banco_origem_identificacao")),
+        pattern=r"\s+",
+        replacement=" ",
+    )
+    banco = pc.if_else(
+        pc.fill_null(pc.is_in(banco, value_set=pa.array(sorted(BANCO_ORIGEM_IDENTIFICACAO_ENUM))), False),
+        banco,
+        pa.scalar(None, pa.string()),
+    )
+    id_registro = _anular_vazios(batch.column("id_registro_identificacao"))
+
+    # Se só um lado estiver presente, anula os dois (check constraint da tabela)
+    par_completo = pc.and_(pc.is_valid(banco), pc.is_valid(id_registro))
+    banco = pc.if_else(par_completo, banco, pa.scalar(None, pa.string()))
+    id_registro = pc.if_else(par_completo, id_registro, pa.scalar(None, pa.string()))
+
+    tabela = pa.table(
+        [
+            pc.cast(batch.column("id_pessoa"), pa.int64()),
+            _como_texto(batch.column("tipo_evento"), nulo_como="None"),
+            _como_texto(batch.column("metodo_identificacao"), nulo_como="None"),
+            _normalizar_data(batch.column("data_identificacao")),
+            tipo_codigo,
+            valor_numerico,
+            valor_texto,
+            banco,
+            id_registro,
+            pc.cast(batch.column("gera_alerta"), pa.bool_()),
+        ],
+        names=COLUNAS_STAGING,
+    )
+    return tabela, rows_copiadas
+
+
+def _tabela_para_csv(tabela) -> bytes:
+    # Strings saem sempre entre aspas e nulos como campo vazio sem aspas, que é
+    # como o COPY ... (FORMAT csv) diferencia '' de NULL.
+    buffer = io.BytesIO()
+    pa_csv.write_csv(tabela, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+    return buffer.getvalue()
 
-def _none_if_blank(v):
-    if v is None:
-        return None
-    s = str(v).strip()
-    if s == "":
-        return None
-    if s.lower() in {"nan", "none", "null"}:  # common “string-null” junk
-        return None
-    return s
 
+class LeituraParquet(NamedTuple):
+    batch_size: int = 5000
+    threads: int = 1
+    memoria_max_mb: int = 512
 
-def _normalize_banco_origem(v):
-    s = _none_if_blank(v)
-    if s is None:
-        return None
-    # normalize common whitespace issues
-    s = " ".join(s.split())
-    return s if s in BANCO_ORIGEM_IDENTIFICACAO_ENUM else None
+
+# Memória de um row group em uso: colunas decodificadas + tabela normalizada.
+def _estimativa_bytes(metadata, grupo: int) -> int:
+    rg = metadata.row_group(grupo)
+    return 2 * sum(
+        rg.column(j).total_uncompressed_size
+        for j in range(rg.num_columns)
+        if rg.column(j).path_in_schema in COLUMNS
+    )
+
+
+# Lê e normaliza os row groups do arquivo em até `leitura.threads` threads
+# (o Arrow libera o GIL na decodificação e nas funções de compute), entregando
+# as tabelas na ordem do arquivo. Um row group só é disparado se a soma das
+# estimativas dos grupos ainda não consumidos pelo COPY couber em
+# `memoria_max_mb`; com o COPY lento, a leitura espera. Um grupo que sozinho
+# passa do limite é lido em streaming, batch a batch, sem paralelismo.
+def _iter_tabelas_normalizadas(
+    file_path: Path, leitura: LeituraParquet
+) -> Iterator[tuple["pa.Table", int]]:
+    pf = pq.ParquetFile(file_path, memory_map=True)
+    total_grupos = pf.metadata.num_row_groups
+    estimativas = [_estimativa_bytes(pf.metadata, i) for i in range(total_grupos)]
+    limite = leitura.memoria_max_mb * 1024 * 1024
+    locais = threading.local()
+
+    def _ler(grupo: int) -> list[tuple["pa.Table", int]]:
+        arquivo = getattr(locais, "pf", None)
+        if arquivo is None:
+            arquivo = locais.pf = pq.ParquetFile(file_path, memory_map=True)
+        tabela = arquivo.read_row_group(grupo, columns=COLUMNS, use_threads=leitura.threads == 1)
+        return [_normalizar_batch(b) for b in tabela.to_batches(max_chunksize=leitura.batch_size)]
+
+    with ThreadPoolExecutor(max_workers=leitura.threads) as executor:
+        pendentes: deque[Future] = deque()
+        em_uso = 0
+        proximo = 0
+        try:
+            for grupo in range(total_grupos):
+                while (
+                    proximo < total_grupos
+                    and estimativas[proximo] <= limite
+                    and em_uso + estimativas[proximo] <= limite
+                ):
+                    pendentes.append(executor.submit(_ler, proximo))
+                    em_uso += estimativas[proximo]
+                    proximo += 1
+
+                if proximo == grupo:
+                    for batch in pf.iter_batches(
+                        batch_size=leitura.batch_size, row_groups=[grupo], columns=COLUMNS
+                    ):
+                        yield _normalizar_batch(batch)
+                    proximo += 1
+                    continue
+
+                yield from pendentes.popleft().result()
+                em_uso -= estimativas[grupo]
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+
+
+def _somar_tempo(tempos: dict[str, float] | None, etapa: str, segundos: float) -> None:
+    if tempos is not None:
+        tempos[etapa] = tempos.get(etapa, 0.0) + segundos
+
+
+@contextmanager
+def _etapa(tempos: dict[str, float] | None, etapa: str) -> Iterator[None]:
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _somar_tempo(tempos, etapa, time.perf_counter() - inicio)
+
+
+# COPY do arquivo inteiro para `destino`. Com `ordem`, acrescenta a coluna
+# `ordem` (posição do arquivo na carga) a todas as linhas. Em `tempos`,
+# "decodificacao" é o tempo em que o COPY esperou a leitura/normalização/CSV
+# e "copy" o restante (envio ao banco).
+def _copiar_parquet(
+    cur,
+    file_path: Path,
+    destino: str,
+    *,
+    leitura: LeituraParquet,
+    ordem: int | None = None,
+    tempos: dict[str, float] | None = None,
+) -> int:
+    colunas = COLUNAS_STAGING if ordem is None else [*COLUNAS_STAGING, "ordem"]
+    rows_copiadas = 0
+    decodificacao = 0.0
+    inicio = time.perf_counter()
+
+    with cur.copy(f"COPY {destino} ({', '.join(colunas)}) FROM STDIN (FORMAT csv)") as copy:
+        lotes = _iter_tabelas_normalizadas(file_path, leitura)
+        while True:
+            t0 = time.perf_counter()
+            lote = next(lotes, None)
+            if lote is None:
+                decodificacao += time.perf_counter() - t0
+                break
+
+            tabela, linhas = lote
+            rows_copiadas += linhas
+            if not tabela.num_rows:
+                decodificacao += time.perf_counter() - t0
+                continue
+            if ordem is not None:
+                tabela = tabela.append_column(
+                    "ordem", pa.repeat(pa.scalar(ordem, pa.int32()), tabela.num_rows)
+                )
+            dados = _tabela_para_csv(tabela)
+            decodificacao += time.perf_counter() - t0
+            copy.write(dados)
+
+    _somar_tempo(tempos, "decodificacao", decodificacao)
+    _somar_tempo(tempos, "copy", time.perf_counter() - inicio - decodificacao)
+    return rows_copiadas
+
+
+# Evento de alerta prioritário de cada (individuo_id, tipo_evento) de `origem`,
+# gravado em `destino`. A regra (prioridade por método, depois a data mais
+# recente) vem de monitoramento.prioridade_metodo_identificacao (e, para
+# métodos sem linha, de prioridade_metodo_identificacao_padrao); não há outra
+# cópia dela, nem na API. `filtro` restringe os pares recalculados e
+# `upsert` substitui o evento já gravado para o par.
+_COLUNAS_EVENTO_ALERTA = (
+    "individuo_id, tipo_evento, metodo_identificacao, data_identificacao, "
+    "banco_origem_identificacao, id_registro_identificacao"
+)
+
+
+def _sql_evento_alerta(
+    destino: str, origem: str, *, filtro: str = "", upsert: bool = False
+) -> sql.Composed:
+    conflito = (
+        """
+        ON CONFLICT (individuo_id, tipo_evento) DO UPDATE SET
+            metodo_identificacao = EXCLUDED.metodo_identificacao,
+            data_identificacao = EXCLUDED.data_identificacao,
+            banco_origem_identificacao = EXCLUDED.banco_origem_identificacao,
+            id_registro_identificacao = EXCLUDED.id_registro_identificacao
+        WHERE (ea.metodo_identificacao, ea.data_identificacao, ea.banco_origem_identificacao, ea.id_registro_identificacao)
+            IS DISTINCT FROM
+            (EXCLUDED.metodo_identificacao, EXCLUDED.data_identificacao, EXCLUDED.banco_origem_identificacao, EXCLUDED.id_registro_identificacao)
+        """
+        if upsert
+        else ""
+    )
+    return sql.SQL(
+        f"""
+        INSERT INTO {{destino}} AS ea ({_COLUNAS_EVENTO_ALERTA})
+        SELECT DISTINCT ON (ie.individuo_id, ie.tipo_evento)
+            ie.individuo_id, ie.tipo_evento, ie.metodo_identificacao, ie.data_identificacao,
+            ie.banco_origem_identificacao, ie.id_registro_identificacao
+        FROM {{origem}} ie
+        CROSS JOIN monitoramento.prioridade_metodo_identificacao_padrao pp
+        LEFT JOIN monitoramento.prioridade_metodo_identificacao p
+          ON p.metodo_identificacao = ie.metodo_identificacao
+        WHERE ie.gera_alerta = true
+          AND ie.metodo_identificacao <> 'n_a'
+          {filtro}
+        ORDER BY ie.individuo_id, ie.tipo_evento,
+                 COALESCE(p.prioridade, pp.prioridade), ie.data_identificacao DESC
+        {conflito};
+        """
+    ).format(destino=_tabela(destino), origem=_tabela(origem))
+
+
+def _desempenho(inicio: float, rows_copiadas: int) -> dict[str, int]:
+    segundos = time.perf_counter() - inicio
+    return {
+        "linhas_por_segundo": int(rows_copiadas / segundos) if segundos > 0 else 0,
+        # ru_maxrss é o pico do processo inteiro, em KiB no Linux.
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    }
 
 
-def _normalize_origem_pair(banco, id_registro):
-    banco_n = _normalize_banco_origem(banco)
-    id_n = _none_if_blank(id_registro)
+def _fingerprint(file_path: Path) -> str:
+    with file_path.open("rb") as f:
+        return "sha256:" + hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# Mesmo tamanho e mtime do manifesto: inalterado, sem ler o arquivo. Só com o
+# mtime diferente (cópia, touch) o conteúdo é comparado pelo sha256; se for o
+# mesmo, o mtime novo é registrado para a próxima execução.
+def _inalterado_no_manifesto(
+    cur: psycopg.Cursor[Any],
+    caminho: str,
+    tamanho: int,
+    mtime_ns: int,
+    fingerprint: Callable[[], str],
+) -> bool:
+    cur.execute(
+        """
+        SELECT tamanho_bytes, mtime_ns, fingerprint
+        FROM monitoramento.carga_manifesto
+        WHERE caminho = %s;
+        """,
+        (caminho,),
+    )
+    registrado = cur.fetchone()
+    if registrado is None or registrado[0] != tamanho:
+        return False
+    if registrado[1] == mtime_ns:
+        return True
+    if fingerprint() != registrado[2]:
+        return False
+    cur.execute(
+        "UPDATE monitoramento.carga_manifesto SET mtime_ns = %s WHERE caminho = %s;",
+        (mtime_ns, caminho),
+    )
+    return True
 
-    # If only one side is present, null out BOTH to satisfy the check constraint
-    if (banco_n is None) != (id_n is None):
-        return (None, None)
 
-    return (banco_n, id_n)
+def _stats_vazio() -> dict[str, int]:
+    return {
+        "rows_copiadas": 0,
+        "individuos_inseridos": 0,
+        "identificadores_inseridos": 0,
+        "eventos_inseridos": 0,
+        "eventos_alerta_atualizados": 0,
+        "arquivos_carregados": 0,
+        "arquivos_ignorados": 0,
+    }
 
 
 def load_parquet_file(
     conn: psycopg.Connection,
     file_path: Path,
     *,
-    batch_size: int,
+    leitura: LeituraParquet,
     strict_identificador: bool,
+    antes_de_mesclar: Callable[[], None] | None = None,
+    force: bool = False,
+    tempos: dict[str, float] | None = None,
 ) -> dict[str, int]:
     if pq is None:  # pragma: no cover
         raise RuntimeError(
@@ -151,114 +512,95 @@ def load_parquet_file(
     if not file_path.exists():
         raise FileNotFoundError(str(file_path))
 
+    inicio = time.perf_counter()
+    caminho = str(file_path.resolve())
+    estado = file_path.stat()
+
+    @functools.cache
+    def calcular_fingerprint() -> str:
+        with _etapa(tempos, "fingerprint"):
+            return _fingerprint(file_path)
+
     pf = pq.ParquetFile(file_path)
     _validate_columns(file_path, pf.schema.names)
 
-    rows_copiadas = 0
-
-    with conn.transaction():
+    with _etapa(tempos, "transacao"), conn.transaction():
         cur = conn.cursor()
 
-        cur.execute(
-            f"""
-            CREATE TEMP TABLE {TEMP_TABLE} (
-                id_pessoa BIGINT NOT NULL,
-                tipo_evento TEXT NOT NULL,
-                metodo_identificacao monitoramento.metodo_identificacao_enum NOT NULL,
-                data_identificacao DATE NOT NULL,
-                tipo_identificador TEXT NOT NULL,
-                valor_identificador TEXT NOT NULL,
-                banco_origem_identificacao monitoramento.banco_origem_identificacao_enum,
-                id_registro_identificacao TEXT,
-                gera_alerta BOOLEAN DEFAULT FALSE
-            ) ON COMMIT DROP;
-            """
-        )
-
-        with cur.copy(
-            f"COPY {TEMP_TABLE} (id_pessoa, tipo_evento, metodo_identificacao, data_identificacao, tipo_identificador, valor_identificador, banco_origem_identificacao, id_registro_identificacao, gera_alerta) FROM STDIN"
-        ) as copy:
-            for batch in pf.iter_batches(batch_size=batch_size, columns=COLUMNS):
-                cols = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
-                for (
-                    id_pessoa,
-                    tipo_evento,
-                    metodo_identificacao,
-                    data_identificacao,
-                    tipo_identificador,
-                    valor_identificador,
-                    banco_origem_identificacao,
-                    id_registro_identificacao,
-                    gera_alerta,
-                ) in zip(*cols):
-                    if id_pessoa is None:
-                        continue
-
-                    if tipo_identificador in {"cpf", "cns"}:
-                        # Remover caracteres não numéricos
-                        valor_identificador = "".join(
-                            ch for ch in str(valor_identificador) if ch.isdigit()
-                        )
-                        banco_n, idreg_n = _normalize_origem_pair(
-                            banco_origem_identificacao, id_registro_identificacao
-                        )
-
-                        copy.write_row(
-                            (
-                                int(id_pessoa),
-                                str(tipo_evento),
-                                str(metodo_identificacao),
-                                _normalize_dt(data_identificacao),
-                                str(tipo_identificador),
-                                str(valor_identificador),
-                                banco_n,
-                                idreg_n,
-                                gera_alerta,
-                            )
-                        )
-                    rows_copiadas += 1
+        if not force and _inalterado_no_manifesto(
+            cur, caminho, estado.st_size, estado.st_mtime_ns, calcular_fingerprint
+        ):
+            return {**_stats_vazio(), "arquivos_ignorados": 1}
+        # antes do COPY: no modo --jobs, roda em paralelo, fora da vez de mesclar
+        fingerprint = calcular_fingerprint()
 
-        cur.execute(
-            f"""
-            INSERT INTO monitoramento.individuo (id)
-            SELECT DISTINCT id_pessoa
-            FROM {TEMP_TABLE}
-            ON CONFLICT (id) DO NOTHING;
-            """
-        )
-        individuos_inseridos = max(cur.rowcount, 0)
-
-        cur.execute(
-            f"""
-            INSERT INTO monitoramento.individuo_identificador
-                (individuo_id, tipo_identificador, valor_identificador)
-            SELECT DISTINCT id_pessoa, tipo_identificador, valor_identificador
-            FROM {TEMP_TABLE}
-            ON CONFLICT (tipo_identificador, valor_identificador) DO NOTHING;
-            """
+        cur.execute(f"CREATE TEMP TABLE {TEMP_TABLE} ({COLUNAS_STAGING_SQL}) ON COMMIT DROP;")
+        rows_copiadas = _copiar_parquet(
+            cur, file_path, TEMP_TABLE, leitura=leitura, tempos=tempos
         )
-        identificadores_inseridos = max(cur.rowcount, 0)
 
-        cur.execute(
-            f"""
-            SELECT
-                s.tipo_identificador,
-                s.valor_identificador,
-                s.id_pessoa AS id_pessoa_novo,
-                ii.individuo_id AS id_pessoa_existente
-            FROM {TEMP_TABLE} s
-            JOIN monitoramento.individuo_identificador ii
-              ON ii.tipo_identificador = s.tipo_identificador
-             AND ii.valor_identificador = s.valor_identificador
-            WHERE ii.individuo_id <> s.id_pessoa
-            LIMIT 5;
-            """
-        )
-        conflitos = cur.fetchall()
+        # No modo --jobs, espera a vez deste arquivo para escrever nas tabelas
+        # definitivas (a leitura e o staging acima rodam em paralelo).
+        if antes_de_mesclar is not None:
+            antes_de_mesclar()
+
+        with _etapa(tempos, "insert_individuo"):
+            cur.execute(
+                f"""
+                INSERT INTO monitoramento.individuo (id)
+                SELECT DISTINCT id_pessoa
+                FROM {TEMP_TABLE}
+                ON CONFLICT (id) DO NOTHING;
+                """
+            )
+            individuos_inseridos = max(cur.rowcount, 0)
+
+        with _etapa(tempos, "insert_identificador"):
+            cur.execute(
+                f"""
+                INSERT INTO monitoramento.individuo_identificador
+                    (individuo_id, tipo_codigo, valor_numerico, valor_texto)
+                SELECT DISTINCT id_pessoa, tipo_codigo, valor_numerico, valor_texto
+                FROM {TEMP_TABLE}
+                ON CONFLICT DO NOTHING;
+                """
+            )
+            identificadores_inseridos = max(cur.rowcount, 0)
+
+        with _etapa(tempos, "checagem_conflitos"):
+            cur.execute(
+                f"""
+                (
+                    SELECT s.tipo_codigo, s.valor_numerico, s.valor_texto,
+                           s.id_pessoa AS id_pessoa_novo, ii.individuo_id AS id_pessoa_existente
+                    FROM {TEMP_TABLE} s
+                    JOIN monitoramento.individuo_identificador ii
+                      ON ii.tipo_codigo = s.tipo_codigo
+                     AND ii.valor_numerico = s.valor_numerico
+                    WHERE ii.individuo_id <> s.id_pessoa
+                    LIMIT 5
+                )
+                UNION ALL
+                (
+                    SELECT s.tipo_codigo, s.valor_numerico, s.valor_texto,
+                           s.id_pessoa AS id_pessoa_novo, ii.individuo_id AS id_pessoa_existente
+                    FROM {TEMP_TABLE} s
+                    JOIN monitoramento.individuo_identificador ii
+                      ON ii.tipo_codigo = s.tipo_codigo
+                     AND ii.valor_texto = s.valor_texto
+                    WHERE ii.individuo_id <> s.id_pessoa
+                    LIMIT 5
+                )
+                LIMIT 5;
+                """
+            )
+            conflitos = cur.fetchall()
         if conflitos:
             linhas = [
-                f"- {t}={v}: novo={novo} existente={existente}"
-                for (t, v, novo, existente) in conflitos
+                "- {}={}: novo={} existente={}".format(
+                    *decodificar_identificador(codigo, numero, texto), novo, existente
+                )
+                for (codigo, numero, texto, novo, existente) in conflitos
             ]
             msg = (
                 "Conflito de identificador: o mesmo (tipo_identificador, valor_identificador) apareceu com id_pessoa diferente.\n"
@@ -270,24 +612,84 @@ def load_parquet_file(
 
             print(msg)
 
+        with _etapa(tempos, "insert_evento"):
+            cur.execute(
+                f"""
+                INSERT INTO monitoramento.individuo_evento
+                    (individuo_id, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta)
+                SELECT DISTINCT id_pessoa, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta
+                FROM {TEMP_TABLE}
+                ON CONFLICT DO NOTHING;
+                """
+            )
+            eventos_inseridos = max(cur.rowcount, 0)
+
+        # A carga incremental só acrescenta eventos: o vencedor só pode mudar
+        # nos pares (individuo_id, tipo_evento) com algum alerta no arquivo.
+        # Um comando por tipo de evento, com o tipo como constante, para que
+        # só a partição dele em individuo_evento seja lida.
+        with _etapa(tempos, "evento_alerta"):
+            cur.execute(
+                f"""
+                SELECT DISTINCT tipo_evento
+                FROM {TEMP_TABLE}
+                WHERE gera_alerta = true AND metodo_identificacao <> 'n_a';
+                """
+            )
+            eventos_alerta_atualizados = 0
+            for (tipo_evento,) in cur.fetchall():
+                cur.execute(
+                    _sql_evento_alerta(
+                        "evento_alerta",
+                        "individuo_evento",
+                        filtro=f"""
+                            AND ie.tipo_evento = %(tipo_evento)s
+                            AND ie.individuo_id IN (
+                                SELECT id_pessoa
+                                FROM {TEMP_TABLE}
+                                WHERE tipo_evento = %(tipo_evento)s
+                                  AND gera_alerta = true
+                                  AND metodo_identificacao <> 'n_a'
+                            )
+                        """,
+                        upsert=True,
+                    ),
+                    {"tipo_evento": tipo_evento},
+                )
+                eventos_alerta_atualizados += max(cur.rowcount, 0)
+
+        with _etapa(tempos, "setval"):
+            cur.execute(
+                """
+                SELECT setval(
+                    pg_get_serial_sequence('monitoramento.individuo','id'),
+                    GREATEST((SELECT COALESCE(MAX(id),0) FROM monitoramento.individuo), 1),
+                    true
+                );
+                """
+            )
+
         cur.execute(
-            f"""
-            INSERT INTO monitoramento.individuo_evento
-                (individuo_id, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta)
-            SELECT DISTINCT id_pessoa, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta
-            FROM {TEMP_TABLE}
-            ON CONFLICT DO NOTHING;
             """
+            INSERT INTO monitoramento.carga_manifesto
+                (caminho, tamanho_bytes, mtime_ns, fingerprint, linhas, carregado_em)
+            VALUES (%s, %s, %s, %s, %s, now())
+            ON CONFLICT (caminho) DO UPDATE SET
+                tamanho_bytes = EXCLUDED.tamanho_bytes,
+                mtime_ns = EXCLUDED.mtime_ns,
+                fingerprint = EXCLUDED.fingerprint,
+                linhas = EXCLUDED.linhas,
+                carregado_em = EXCLUDED.carregado_em;
+            """,
+            (caminho, estado.st_size, estado.st_mtime_ns, fingerprint, pf.metadata.num_rows),
         )
-        eventos_inseridos = max(cur.rowcount, 0)
 
+        # Sinaliza nova carga para os workers da API descartarem seus caches.
         cur.execute(
             """
-            SELECT setval(
-                pg_get_serial_sequence('monitoramento.individuo','id'),
-                GREATEST((SELECT COALESCE(MAX(id),0) FROM monitoramento.individuo), 1),
-                true
-            );
+            UPDATE monitoramento.dataset_versao
+            SET versao = versao + 1, atualizado_em = now()
+            WHERE id = 1;
             """
         )
 
@@ -296,9 +698,810 @@ def load_parquet_file(
         "individuos_inseridos": individuos_inseridos,
         "identificadores_inseridos": identificadores_inseridos,
         "eventos_inseridos": eventos_inseridos,
+        "eventos_alerta_atualizados": eventos_alerta_atualizados,
+        "arquivos_carregados": 1,
+        "arquivos_ignorados": 0,
+        **_desempenho(inicio, rows_copiadas),
     }
 
 
+# Estado compartilhado entre os processos do modo --jobs (definido no initializer).
+_TURNO = None
+_CONDICAO = None
+_ABORTAR = None
+
+
+def _init_worker(turno, condicao, abortar) -> None:
+    global _TURNO, _CONDICAO, _ABORTAR
+    _TURNO, _CONDICAO, _ABORTAR = turno, condicao, abortar
+
+
+def _aguardar_turno(indice: int) -> None:
+    with _CONDICAO:
+        _CONDICAO.wait_for(lambda: _TURNO.value == indice)
+
+
+def _carregar_arquivo_worker(
+    indice: int,
+    dsn: str,
+    file_path: Path,
+    leitura: LeituraParquet,
+    strict_identificador: bool,
+    force: bool,
+) -> dict[str, int]:
+    # Cada processo decodifica o arquivo e faz o COPY para a sua tabela
+    # temporária em paralelo, com a sua própria conexão. A mesclagem nas
+    # tabelas definitivas acontece em série, na ordem dos arquivos: o arquivo
+    # `indice` só mescla depois que o anterior fez commit. Assim não há duas
+    # transações escrevendo nas mesmas tabelas (sem deadlock) e o resultado é
+    # o mesmo da carga sequencial.
+    aguardou = False
+
+    def antes_de_mesclar() -> None:
+        nonlocal aguardou
+        _aguardar_turno(indice)
+        aguardou = True
+        if _ABORTAR.value:
+            raise RuntimeError("Carga interrompida por falha em arquivo anterior.")
+
+    try:
+        with psycopg.connect(dsn) as conn:
+            return load_parquet_file(
+                conn,
+                file_path,
+                leitura=leitura,
+                strict_identificador=strict_identificador,
+                antes_de_mesclar=antes_de_mesclar,
+                force=force,
+            )
+    except BaseException:
+        # A interrupção só vale na vez deste arquivo: os anteriores, que podem
+        # ainda estar esperando para mesclar, fazem commit como na carga
+        # sequencial; só os seguintes desistem.
+        if not aguardou:
+            _aguardar_turno(indice)
+            aguardou = True
+        _ABORTAR.value = 1
+        raise
+    finally:
+        if not aguardou:
+            _aguardar_turno(indice)
+        with _CONDICAO:
+            _TURNO.value += 1
+            _CONDICAO.notify_all()
+
+
+def _carregar_em_paralelo(
+    dsn: str,
+    parquet_files: list[Path],
+    *,
+    jobs: int,
+    leitura: LeituraParquet,
+    strict_identificador: bool,
+    force: bool,
+) -> Iterator[tuple[Path, dict[str, int]]]:
+    ctx = multiprocessing.get_context("spawn")
+    turno = ctx.Value("i", 0)
+    condicao = ctx.Condition()
+    abortar = ctx.Value("b", 0)
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(turno, condicao, abortar),
+    ) as executor:
+        # Submetidos em ordem: um arquivo só começa depois de todos os
+        # anteriores terem sido atribuídos a um worker, então a espera pelo
+        # turno nunca bloqueia um worker que um arquivo anterior precisaria.
+        futuros = [
+            executor.submit(
+                _carregar_arquivo_worker,
+                indice,
+                dsn,
+                fp,
+                leitura,
+                strict_identificador,
+                force,
+            )
+            for indice, fp in enumerate(parquet_files)
+        ]
+        for fp, futuro in zip(parquet_files, futuros):
+            yield fp, futuro.result()
+
+
+def _carregar_em_serie(
+    dsn: str,
+    parquet_files: list[Path],
+    *,
+    leitura: LeituraParquet,
+    strict_identificador: bool,
+    force: bool,
+) -> Iterator[tuple[Path, dict[str, int]]]:
+    with psycopg.connect(dsn) as conn:
+        for fp in parquet_files:
+            yield fp, load_parquet_file(
+                conn,
+                fp,
+                leitura=leitura,
+                strict_identificador=strict_identificador,
+                force=force,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Carga completa (--full-refresh)
+#
+# Carrega todos os arquivos em cópias "sombra" das tabelas (sem índices nem
+# constraints durante a carga), cria índices/constraints copiando as
+# definições das tabelas atuais do catálogo e troca as gerações com renomeações
+# numa transação curta. A geração substituída fica com o sufixo __anterior
+# até a próxima carga completa, e --reverter-full-refresh a coloca de volta.
+# As consultas da API em andamento terminam na geração antiga (a troca espera
+# pelo lock exclusivo); as seguintes já leem a nova, completa.
+# ---------------------------------------------------------------------------
+
+SCHEMA = "monitoramento"
+
+# Ordem importa: tabelas referenciadas antes das que as referenciam.
+TABELAS_CARGA = [
+    "individuo",
+    "individuo_identificador",
+    "individuo_evento",
+    "evento_alerta",
+    "carga_manifesto",
+]
+
+SUFIXO_SOMBRA = "__sombra"
+SUFIXO_ANTERIOR = "__anterior"
+SUFIXO_REVERTIDA = "__revertida"
+
+STAGING_CARGA_COMPLETA = f"{SCHEMA}.carga_completa_staging"
+
+LOCK_TIMEOUT_TROCA = "5s"
+TENTATIVAS_TROCA = 5
+
+
+def _tabela(nome: str) -> sql.Identifier:
+    return sql.Identifier(SCHEMA, nome)
+
+
+def _existe(cur, nome: str) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (f"{SCHEMA}.{nome}",))
+    return cur.fetchone()[0]
+
+
+# Constraints (exceto NOT NULL) e índices que não pertencem a uma constraint.
+def _constraints(cur, nome: str) -> list[tuple[str, str, str]]:
+    cur.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'x', 'c', 'f')
+        ORDER BY array_position(ARRAY['p', 'u', 'x', 'c', 'f']::"char"[], contype), conname;
+        """,
+        (f"{SCHEMA}.{nome}",),
+    )
+    return cur.fetchall()
+
+
+def _indices_avulsos(cur, nome: str) -> list[tuple[str, str]]:
+    cur.execute(
+        """
+        SELECT ic.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+          AND NOT EXISTS (
+              SELECT 1
+              FROM pg_constraint c
+              WHERE c.conrelid = i.indrelid
+                AND c.conindid = i.indexrelid
+                AND c.contype IN ('p', 'u', 'x')
+          )
+        ORDER BY ic.relname;
+        """,
+        (f"{SCHEMA}.{nome}",),
+    )
+    return cur.fetchall()
+
+
+# Partições diretas de `nome`: (nome, limite, chave de subparticionamento ou
+# None). Vazio para tabelas não particionadas.
+def _particoes(cur, nome: str) -> list[tuple[str, str, str | None]]:
+    cur.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), pg_get_partkeydef(c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname;
+        """,
+        (f"{SCHEMA}.{nome}",),
+    )
+    return cur.fetchall()
+
+
+def _chave_particao(cur, nome: str) -> str | None:
+    cur.execute("SELECT pg_get_partkeydef(%s::regclass);", (f"{SCHEMA}.{nome}",))
+    return cur.fetchone()[0]
+
+
+def _com_sufixo(nome: str, sufixo: str) -> str:
+    novo = nome + sufixo
+    if len(novo.encode()) > 63:
+        raise RuntimeError(f"Nome longo demais para receber o sufixo {sufixo}: {nome}")
+    return novo
+
+
+def _criar_tabelas_sombra(cur) -> None:
+    for nome in reversed(TABELAS_CARGA):
+        cur.execute(
+            sql.SQL("DROP TABLE IF EXISTS {} CASCADE;").format(_tabela(nome + SUFIXO_SOMBRA))
+        )
+    # LIKE copia colunas, NOT NULL e defaults (inclusive o nextval das
+    # sequences atuais); o resto vem depois da carga. Tabelas particionadas
+    # (individuo_evento) ganham a mesma árvore de partições.
+    for nome in TABELAS_CARGA:
+        chave = _chave_particao(cur, nome)
+        cur.execute(
+            sql.SQL(
+                "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING GENERATED "
+                "INCLUDING IDENTITY INCLUDING STORAGE INCLUDING COMMENTS){};"
+            ).format(
+                _tabela(nome + SUFIXO_SOMBRA),
+                _tabela(nome),
+                sql.SQL(f" PARTITION BY {chave}" if chave else ""),
+            )
+        )
+        _copiar_permissoes(cur, nome, nome + SUFIXO_SOMBRA)
+        if chave:
+            _criar_particoes_sombra(cur, nome, nome + SUFIXO_SOMBRA)
+
+    cur.execute(f"DROP TABLE IF EXISTS {STAGING_CARGA_COMPLETA};")
+    cur.execute(
+        f"CREATE UNLOGGED TABLE {STAGING_CARGA_COMPLETA} "
+        f"({COLUNAS_STAGING_SQL}, ordem INTEGER NOT NULL);"
+    )
+
+
+def _criar_particoes_sombra(cur, origem: str, destino: str) -> None:
+    for particao, limite, chave in _particoes(cur, origem):
+        sombra = _com_sufixo(particao, SUFIXO_SOMBRA)
+        cur.execute(
+            sql.SQL("CREATE TABLE {} PARTITION OF {} {};").format(
+                _tabela(sombra),
+                _tabela(destino),
+                sql.SQL(limite + (f" PARTITION BY {chave}" if chave else "")),
+            )
+        )
+        _copiar_permissoes(cur, particao, sombra)
+        if chave:
+            _criar_particoes_sombra(cur, particao, sombra)
+
+
+def _copiar_permissoes(cur, origem: str, destino: str) -> None:
+    cur.execute(
+        """
+        SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE a.grantee::regrole::text END,
+               a.privilege_type
+        FROM pg_class c, aclexplode(c.relacl) a
+        WHERE c.oid = %s::regclass;
+        """,
+        (f"{SCHEMA}.{origem}",),
+    )
+    for grantee, privilegio in cur.fetchall():
+        cur.execute(
+            sql.SQL("GRANT {} ON {} TO {};").format(
+                sql.SQL(privilegio),
+                _tabela(destino),
+                sql.SQL("PUBLIC") if grantee == "PUBLIC" else sql.SQL(grantee),
+            )
+        )
+
+
+def _copiar_para_staging(
+    conn: psycopg.Connection,
+    file_path: Path,
+    *,
+    ordem: int,
+    leitura: LeituraParquet,
+) -> dict[str, int]:
+    if pq is None:  # pragma: no cover
+        raise RuntimeError(
+            "pyarrow não está instalado. Instale com: pip install .[loader]"
+        ) from _PYARROW_IMPORT_ERROR
+
+    inicio = time.perf_counter()
+    estado = file_path.stat()
+    pf = pq.ParquetFile(file_path)
+    _validate_columns(file_path, pf.schema.names)
+
+    with conn.transaction():
+        cur = conn.cursor()
+        rows_copiadas = _copiar_parquet(
+            cur, file_path, STAGING_CARGA_COMPLETA, leitura=leitura, ordem=ordem
+        )
+        cur.execute(
+            sql.SQL(
+                "INSERT INTO {} "
+                "(caminho, tamanho_bytes, mtime_ns, fingerprint, linhas, carregado_em) "
+                "VALUES (%s, %s, %s, %s, %s, now());"
+            ).format(_tabela("carga_manifesto" + SUFIXO_SOMBRA)),
+            (
+                str(file_path.resolve()),
+                estado.st_size,
+                estado.st_mtime_ns,
+                _fingerprint(file_path),
+                pf.metadata.num_rows,
+            ),
+        )
+
+    return {
+        **_stats_vazio(),
+        "rows_copiadas": rows_copiadas,
+        "arquivos_carregados": 1,
+        **_desempenho(inicio, rows_copiadas),
+    }
+
+
+def _copiar_para_staging_worker(
+    dsn: str, file_path: Path, ordem: int, leitura: LeituraParquet
+) -> dict[str, int]:
+    with psycopg.connect(dsn) as conn:
+        return _copiar_para_staging(conn, file_path, ordem=ordem, leitura=leitura)
+
+
+# Mesma deduplicação da carga incremental, mas de uma vez sobre todos os
+# arquivos: em caso de repetição vale o primeiro arquivo (menor `ordem`).
+def _popular_tabelas_sombra(cur, *, strict_identificador: bool) -> dict[str, int]:
+    cur.execute(
+        f"""
+        SELECT tipo_codigo, valor_numerico, valor_texto,
+               array_agg(DISTINCT id_pessoa ORDER BY id_pessoa)
+        FROM {STAGING_CARGA_COMPLETA}
+        GROUP BY tipo_codigo, valor_numerico, valor_texto
+        HAVING count(DISTINCT id_pessoa) > 1
+        LIMIT 5;
+        """
+    )
+    conflitos = cur.fetchall()
+    if conflitos:
+        msg = (
+            "Conflito de identificador: o mesmo (tipo_identificador, valor_identificador) apareceu com id_pessoa diferente.\n"
+            + "\n".join(
+                "- {}={}: id_pessoa={}".format(*decodificar_identificador(codigo, numero, texto), ids)
+                for (codigo, numero, texto, ids) in conflitos
+            )
+        )
+        if strict_identificador:
+            raise RuntimeError(msg)
+        print(msg)
+
+    cur.execute(
+        sql.SQL(
+            f"INSERT INTO {{}} (id) SELECT DISTINCT id_pessoa FROM {STAGING_CARGA_COMPLETA};"
+        ).format(_tabela("individuo" + SUFIXO_SOMBRA))
+    )
+    individuos_inseridos = max(cur.rowcount, 0)
+
+    cur.execute(
+        sql.SQL(
+            f"""
+            INSERT INTO {{}} (individuo_id, tipo_codigo, valor_numerico, valor_texto)
+            SELECT DISTINCT ON (tipo_codigo, valor_numerico, valor_texto)
+                id_pessoa, tipo_codigo, valor_numerico, valor_texto
+            FROM {STAGING_CARGA_COMPLETA}
+            ORDER BY tipo_codigo, valor_numerico, valor_texto, ordem, id_pessoa;
+            """
+        ).format(_tabela("individuo_identificador" + SUFIXO_SOMBRA))
+    )
+    identificadores_inseridos = max(cur.rowcount, 0)
+
+    # Eventos com origem seguem a chave de ux_individuo_evento_origem_metodo.
+    cur.execute(
+        sql.SQL(
+            f"""
+            INSERT INTO {{}}
+                (individuo_id, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta)
+            (
+                SELECT DISTINCT ON (id_pessoa, tipo_evento, metodo_identificacao, banco_origem_identificacao, id_registro_identificacao)
+                    id_pessoa, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta
+                FROM {STAGING_CARGA_COMPLETA}
+                WHERE id_registro_identificacao IS NOT NULL
+                ORDER BY id_pessoa, tipo_evento, metodo_identificacao, banco_origem_identificacao, id_registro_identificacao, ordem
+            )
+            UNION ALL
+            (
+                SELECT DISTINCT
+                    id_pessoa, tipo_evento, metodo_identificacao, data_identificacao, banco_origem_identificacao, id_registro_identificacao, gera_alerta
+                FROM {STAGING_CARGA_COMPLETA}
+                WHERE id_registro_identificacao IS NULL
+            );
+            """
+        ).format(_tabela("individuo_evento" + SUFIXO_SOMBRA))
+    )
+    eventos_inseridos = max(cur.rowcount, 0)
+
+    cur.execute(
+        _sql_evento_alerta("evento_alerta" + SUFIXO_SOMBRA, "individuo_evento" + SUFIXO_SOMBRA)
+    )
+    eventos_alerta_atualizados = max(cur.rowcount, 0)
+
+    return {
+        "individuos_inseridos": individuos_inseridos,
+        "identificadores_inseridos": identificadores_inseridos,
+        "eventos_inseridos": eventos_inseridos,
+        "eventos_alerta_atualizados": eventos_alerta_atualizados,
+    }
+
+
+def _renomear_definicao(definicao: str, sufixo: str) -> str:
+    # FKs entre as tabelas da carga passam a apontar para as cópias sombra.
+    for nome in TABELAS_CARGA:
+        definicao = definicao.replace(
+            f"REFERENCES {SCHEMA}.{nome}(", f"REFERENCES {SCHEMA}.{nome}{sufixo}("
+        )
+    return definicao
+
+
+# Recria nas tabelas sombra os índices e constraints das tabelas atuais, lidos
+# do catálogo: novos índices/migrations valem sem mudar este script.
+def _criar_indices_sombra(cur) -> None:
+    # Nomes totalmente qualificados nas definições geradas pelo catálogo.
+    cur.execute("SET LOCAL search_path = pg_catalog;")
+
+    constraints = {nome: _constraints(cur, nome) for nome in TABELAS_CARGA}
+    indices = {nome: _indices_avulsos(cur, nome) for nome in TABELAS_CARGA}
+
+    # PK/UNIQUE primeiro (alvo das FKs), depois índices, CHECK e FKs.
+    fases = [("p", "u", "x"), None, ("c",), ("f",)]
+    for fase in fases:
+        for nome in TABELAS_CARGA:
+            sombra = nome + SUFIXO_SOMBRA
+            if fase is None:
+                for indice, definicao in indices[nome]:
+                    # Em tabelas particionadas a definição vem com ON ONLY;
+                    # sem ele o índice é criado também em todas as partições.
+                    prefixo = f" INDEX {indice} ON {SCHEMA}.{nome} "
+                    prefixo_only = f" INDEX {indice} ON ONLY {SCHEMA}.{nome} "
+                    if prefixo_only in definicao:
+                        prefixo = prefixo_only
+                    elif prefixo not in definicao:
+                        raise RuntimeError(f"Definição de índice inesperada: {definicao}")
+                    cur.execute(
+                        definicao.replace(
+                            prefixo,
+                            f" INDEX {_com_sufixo(indice, SUFIXO_SOMBRA)} ON {SCHEMA}.{sombra} ",
+                            1,
+                        )
+                    )
+                continue
+
+            for constraint, tipo, definicao in constraints[nome]:
+                if tipo not in fase:
+                    continue
+                cur.execute(
+                    sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(
+                        _tabela(sombra),
+                        sql.Identifier(_com_sufixo(constraint, SUFIXO_SOMBRA)),
+                    )
+                    + sql.SQL(_renomear_definicao(definicao, SUFIXO_SOMBRA))
+                )
+
+    cur.execute("RESET search_path;")
+    for nome in TABELAS_CARGA:
+        cur.execute(sql.SQL("ANALYZE {};").format(_tabela(nome + SUFIXO_SOMBRA)))
+
+
+# Renomeia a tabela `nome+de` para `nome+para`, junto com suas constraints e
+# índices (sufixo `de` trocado por `para`), para que a geração ativa tenha
+# sempre os nomes originais usados pelas migrations.
+def _renomear_geracao(cur, nome: str, de: str, para: str) -> None:
+    origem = nome + de
+
+    for constraint, _, _ in _constraints(cur, origem):
+        cur.execute(
+            sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {};").format(
+                _tabela(origem),
+                sql.Identifier(constraint),
+                sql.Identifier(_com_sufixo(constraint.removesuffix(de), para)),
+            )
+        )
+    for indice, _ in _indices_avulsos(cur, origem):
+        cur.execute(
+            sql.SQL("ALTER INDEX {} RENAME TO {};").format(
+                _tabela(indice),
+                sql.Identifier(_com_sufixo(indice.removesuffix(de), para)),
+            )
+        )
+    for particao, _, _ in _particoes(cur, origem):
+        _renomear_particao(cur, particao, de, para)
+    cur.execute(
+        sql.SQL("ALTER TABLE {} RENAME TO {};").format(
+            _tabela(origem), sql.Identifier(nome + para)
+        )
+    )
+
+
+# Partições (e subpartições) acompanham a tabela pai. Os índices delas têm
+# nomes gerados a partir do nome da partição e são renomeados pelo prefixo.
+def _renomear_particao(cur, origem: str, de: str, para: str) -> None:
+    destino = _com_sufixo(origem.removesuffix(de), para)
+    for particao, _, _ in _particoes(cur, origem):
+        _renomear_particao(cur, particao, de, para)
+    cur.execute(
+        """
+        SELECT ic.relname
+        FROM pg_index i
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+        ORDER BY ic.relname;
+        """,
+        (f"{SCHEMA}.{origem}",),
+    )
+    for (indice,) in cur.fetchall():
+        novo = destino + indice.removeprefix(origem)
+        if indice.startswith(origem) and len(novo.encode()) <= 63:
+            cur.execute(
+                sql.SQL("ALTER INDEX {} RENAME TO {};").format(
+                    _tabela(indice), sql.Identifier(novo)
+                )
+            )
+    cur.execute(
+        sql.SQL("ALTER TABLE {} RENAME TO {};").format(_tabela(origem), sql.Identifier(destino))
+    )
+
+
+def _sequencias(cur, nome: str) -> list[tuple[str, str]]:
+    cur.execute(
+        """
+        SELECT a.attname, pg_get_serial_sequence(%s, a.attname)
+        FROM pg_attribute a
+        WHERE a.attrelid = %s::regclass
+          AND a.attnum > 0
+          AND NOT a.attisdropped
+          AND pg_get_serial_sequence(%s, a.attname) IS NOT NULL;
+        """,
+        (f"{SCHEMA}.{nome}",) * 3,
+    )
+    return cur.fetchall()
+
+
+# Troca de gerações numa transação curta. `passos` são pares (de, para) de
+# sufixos aplicados em ordem a todas as tabelas da carga (sufixo "" = ativa).
+def _trocar_geracoes(conn: psycopg.Connection, passos: list[tuple[str, str]]) -> None:
+    for tentativa in range(1, TENTATIVAS_TROCA + 1):
+        try:
+            with conn.transaction():
+                cur = conn.cursor()
+                # Não segura a fila de consultas da API esperando o lock.
+                cur.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT_TROCA}';")
+                cur.execute(
+                    sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE;").format(
+                        sql.SQL(", ").join(_tabela(nome) for nome in TABELAS_CARGA)
+                    )
+                )
+
+                # As sequences (BIGSERIAL) são compartilhadas entre as gerações;
+                # passam a pertencer à geração ativa para não serem apagadas
+                # junto com a anterior.
+                sequencias = {nome: _sequencias(cur, nome) for nome in TABELAS_CARGA}
+
+                for de, para in passos:
+                    for nome in TABELAS_CARGA:
+                        _renomear_geracao(cur, nome, de, para)
+
+                for nome, colunas in sequencias.items():
+                    for coluna, sequencia in colunas:
+                        cur.execute(
+                            sql.SQL("ALTER SEQUENCE {} OWNED BY {}.{};").format(
+                                sql.SQL(sequencia), _tabela(nome), sql.Identifier(coluna)
+                            )
+                        )
+
+                cur.execute(
+                    """
+                    SELECT setval(
+                        pg_get_serial_sequence('monitoramento.individuo','id'),
+                        GREATEST((SELECT COALESCE(MAX(id),0) FROM monitoramento.individuo), 1),
+                        true
+                    );
+                    """
+                )
+                cur.execute(
+                    """
+                    UPDATE monitoramento.dataset_versao
+                    SET versao = versao + 1, atualizado_em = now()
+                    WHERE id = 1;
+                    """
+                )
+            return
+        except psycopg.errors.LockNotAvailable:
+            if tentativa == TENTATIVAS_TROCA:
+                raise
+            print(f"Troca de tabelas aguardando lock (tentativa {tentativa}/{TENTATIVAS_TROCA})...")
+            time.sleep(tentativa)
+
+
+def _descartar_sombra(conn: psycopg.Connection) -> None:
+    with conn.transaction():
+        cur = conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {STAGING_CARGA_COMPLETA};")
+        for nome in reversed(TABELAS_CARGA):
+            cur.execute(
+                sql.SQL("DROP TABLE IF EXISTS {} CASCADE;").format(_tabela(nome + SUFIXO_SOMBRA))
+            )
+
+
+def carga_completa(
+    dsn: str,
+    parquet_files: list[Path],
+    *,
+    jobs: int,
+    leitura: LeituraParquet,
+    strict_identificador: bool,
+    ao_copiar: Callable[[Path, dict[str, int]], None] | None = None,
+) -> dict[str, int]:
+    total = _stats_vazio()
+
+    def _registrar(fp: Path, res: dict[str, int]) -> None:
+        for k in total:
+            total[k] += res.get(k, 0)
+        if ao_copiar is not None:
+            ao_copiar(fp, res)
+
+    with psycopg.connect(dsn) as conn:
+        with conn.transaction():
+            _criar_tabelas_sombra(conn.cursor())
+
+        try:
+            if jobs > 1 and len(parquet_files) > 1:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as executor:
+                    futuros = [
+                        executor.submit(_copiar_para_staging_worker, dsn, fp, ordem, leitura)
+                        for ordem, fp in enumerate(parquet_files)
+                    ]
+                    for fp, futuro in zip(parquet_files, futuros):
+                        _registrar(fp, futuro.result())
+            else:
+                for ordem, fp in enumerate(parquet_files):
+                    _registrar(
+                        fp, _copiar_para_staging(conn, fp, ordem=ordem, leitura=leitura)
+                    )
+
+            with conn.transaction():
+                cur = conn.cursor()
+                total.update(
+                    _popular_tabelas_sombra(cur, strict_identificador=strict_identificador)
+                )
+                cur.execute(f"DROP TABLE {STAGING_CARGA_COMPLETA};")
+            with conn.transaction():
+                _criar_indices_sombra(conn.cursor())
+        except BaseException:
+            _descartar_sombra(conn)
+            raise
+
+        # A geração __anterior de uma carga completa anterior dá lugar à atual.
+        with conn.transaction():
+            cur = conn.cursor()
+            for nome in reversed(TABELAS_CARGA):
+                cur.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {} CASCADE;").format(
+                        _tabela(nome + SUFIXO_ANTERIOR)
+                    )
+                )
+
+        _trocar_geracoes(conn, [("", SUFIXO_ANTERIOR), (SUFIXO_SOMBRA, "")])
+
+    return total
+
+
+def reverter_carga_completa(conn: psycopg.Connection) -> None:
+    with conn.transaction():
+        cur = conn.cursor()
+        faltando = [n for n in TABELAS_CARGA if not _existe(cur, n + SUFIXO_ANTERIOR)]
+    if faltando:
+        raise SystemExit(
+            "Não há geração anterior completa para restaurar (faltando: "
+            + ", ".join(n + SUFIXO_ANTERIOR for n in faltando)
+            + ")."
+        )
+
+    # A geração ativa vira a __anterior: reverter de novo desfaz a reversão.
+    _trocar_geracoes(
+        conn,
+        [("", SUFIXO_REVERTIDA), (SUFIXO_ANTERIOR, ""), (SUFIXO_REVERTIDA, SUFIXO_ANTERIOR)],
+    )
+
+
+# Depois de mudar monitoramento.prioridade_metodo_identificacao: recalcula
+# todos os eventos de alerta numa transação (a API continua lendo os antigos
+# até o commit) e sinaliza a nova versão para os workers.
+def recalcular_evento_alerta(conn: psycopg.Connection) -> int:
+    with conn.transaction():
+        cur = conn.cursor()
+        cur.execute(sql.SQL("DELETE FROM {};").format(_tabela("evento_alerta")))
+        cur.execute(_sql_evento_alerta("evento_alerta", "individuo_evento"))
+        eventos_alerta = max(cur.rowcount, 0)
+        cur.execute(
+            """
+            UPDATE monitoramento.dataset_versao
+            SET versao = versao + 1, atualizado_em = now()
+            WHERE id = 1;
+            """
+        )
+    return eventos_alerta
+
+
+# Mesma chave de app.core.snapshot.chave_snapshot, calculada e ordenada no
+# Postgres (bytea compara byte a byte, como bytes no Python).
+_SNAPSHOT_IDENTIFICADORES = f"""
+    SELECT
+        substring(
+            sha256(convert_to(t.nome || chr(31) || {VALOR_TEXTO_SQL}, 'UTF8'))
+            FROM 1 FOR 16
+        ) AS chave,
+        ii.individuo_id
+    FROM monitoramento.individuo_identificador ii
+    JOIN monitoramento.tipo_identificador t ON t.codigo = ii.tipo_codigo
+    ORDER BY chave
+"""
+
+
+# O mesmo evento que /relacao lê, para cada (individuo_id, tipo_evento).
+_SNAPSHOT_EVENTOS = """
+    SELECT
+        individuo_id,
+        tipo_evento,
+        metodo_identificacao::text,
+        data_identificacao,
+        banco_origem_identificacao::text,
+        id_registro_identificacao
+    FROM monitoramento.evento_alerta
+    ORDER BY individuo_id, tipo_evento
+"""
+
+
+def gerar_snapshot(conn: psycopg.Connection, caminho: Path) -> dict[str, int]:
+    from app.core.snapshot import escrever_snapshot
+
+    # Um único snapshot do banco (REPEATABLE READ) para a versão e as duas
+    # seções; cursores nomeados para não trazer as tabelas inteiras de uma vez.
+    with conn.transaction():
+        conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        row = conn.execute(
+            "SELECT versao FROM monitoramento.dataset_versao WHERE id = 1"
+        ).fetchone()
+        versao = row[0] if row else 0
+
+        with (
+            conn.cursor(name="snapshot_identificadores") as identificadores,
+            conn.cursor(name="snapshot_eventos") as eventos,
+        ):
+            identificadores.itersize = eventos.itersize = 50_000
+            identificadores.execute(_SNAPSHOT_IDENTIFICADORES)
+            eventos.execute(_SNAPSHOT_EVENTOS)
+            res = escrever_snapshot(
+                caminho,
+                dataset_versao=versao,
+                identificadores=identificadores,
+                eventos=eventos,
+            )
+
+    return {"dataset_versao": versao, **res}
+
+
+def _gerar_snapshot_se_pedido(dsn: str, caminho: str | None) -> None:
+    if not caminho:
+        return
+    inicio = time.perf_counter()
+    with psycopg.connect(dsn) as conn:
+        res = gerar_snapshot(conn, Path(caminho))
+    print(f"SNAPSHOT: {caminho} -> {res} ({time.perf_counter() - inicio:.1f}s)")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Carrega arquivos .parquet (resultados offline) para o banco PostgreSQL da API."
@@ -306,7 +1509,7 @@ def main() -> None:
     parser.add_argument(
         "--parquet",
         action="append",
-        required=True,
+        default=[],
         help="Caminho para um arquivo .parquet ou uma pasta contendo .parquet (pode repetir).",
     )
     parser.add_argument(
@@ -320,19 +1523,106 @@ def main() -> None:
         default=5000,
         help="Quantidade de linhas por batch ao ler o parquet.",
     )
+    parser.add_argument(
+        "--threads-leitura",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Threads para ler e normalizar row groups de um arquivo em paralelo (default: min(4, CPUs)).",
+    )
+    parser.add_argument(
+        "--memoria-leitura-mb",
+        type=int,
+        default=512,
+        help=(
+            "Limite (MB, tamanho descomprimido) de row groups lidos e ainda não "
+            "enviados ao COPY, por arquivo em carga (default: 512)."
+        ),
+    )
     parser.add_argument(
         "--strict-identificador",
         action="store_true",
         help="Falha quando houver conflito de identificador já existente com id_pessoa diferente.",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recarrega também os arquivos já registrados no manifesto de carga sem alterações.",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help=(
+            "Recarrega todo o conjunto em tabelas sombra e troca as tabelas ativas "
+            "atomicamente ao final (a geração substituída fica como __anterior)."
+        ),
+    )
+    parser.add_argument(
+        "--reverter-full-refresh",
+        action="store_true",
+        help="Restaura a geração __anterior deixada pela última carga completa.",
+    )
+    parser.add_argument(
+        "--recalcular-evento-alerta",
+        action="store_true",
+        help=(
+            "Recalcula monitoramento.evento_alerta a partir de individuo_evento "
+            "(após mudar monitoramento.prioridade_metodo_identificacao)."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        help=(
+            "Ao final, grava o snapshot de /relacao (lido pela API via "
+            "SNAPSHOT_RELACAO_CAMINHO) neste caminho. Sem --parquet, só gera o snapshot."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processos para ler e preparar arquivos em paralelo, cada um com sua conexão (default: 1).",
+    )
 
     args = parser.parse_args()
 
+    if args.jobs < 1:
+        raise SystemExit("--jobs deve ser maior ou igual a 1.")
+    if args.threads_leitura < 1 or args.memoria_leitura_mb < 1:
+        raise SystemExit("--threads-leitura e --memoria-leitura-mb devem ser maiores ou iguais a 1.")
+
+    leitura = LeituraParquet(
+        batch_size=args.batch_size,
+        threads=args.threads_leitura,
+        memoria_max_mb=args.memoria_leitura_mb,
+    )
+
     if not args.database_url:
         raise SystemExit(
             "DATABASE_URL não informado (use --database-url ou env DATABASE_URL)."
         )
 
+    dsn = dsn_psycopg(args.database_url)
+
+    if args.reverter_full_refresh:
+        with psycopg.connect(dsn) as conn:
+            reverter_carga_completa(conn)
+        print("OK: geração anterior restaurada (a substituída ficou como __anterior).")
+        _gerar_snapshot_se_pedido(dsn, args.snapshot)
+        return
+
+    if args.recalcular_evento_alerta:
+        with psycopg.connect(dsn) as conn:
+            eventos_alerta = recalcular_evento_alerta(conn)
+        print(f"OK: {eventos_alerta} evento(s) de alerta recalculado(s).")
+        _gerar_snapshot_se_pedido(dsn, args.snapshot)
+        return
+
+    if not args.parquet:
+        if args.snapshot:
+            _gerar_snapshot_se_pedido(dsn, args.snapshot)
+            return
+        raise SystemExit("Informe ao menos um --parquet.")
+
     parquet_files: list[Path] = []
     for p in args.parquet:
         parquet_files.extend(_iter_parquet_files(p))
@@ -341,29 +1631,57 @@ def main() -> None:
     if not parquet_files:
         raise SystemExit("Nenhum arquivo .parquet encontrado.")
 
-    dsn = _dsn_for_psycopg(args.database_url)
-
-    with psycopg.connect(dsn) as conn:
-        total = {
-            "rows_copiadas": 0,
-            "individuos_inseridos": 0,
-            "identificadores_inseridos": 0,
-            "eventos_inseridos": 0,
-        }
+    if args.full_refresh:
+        total = carga_completa(
+            dsn,
+            parquet_files,
+            jobs=min(args.jobs, len(parquet_files)),
+            leitura=leitura,
+            strict_identificador=args.strict_identificador,
+            ao_copiar=lambda fp, res: print(f"COPIADO: {fp} -> {res}"),
+        )
+        print("OK: tabelas sombra promovidas (geração substituída em __anterior).")
+        print(f"TOTAL: {total}")
+        _gerar_snapshot_se_pedido(dsn, args.snapshot)
+        return
+
+    if args.jobs > 1 and len(parquet_files) > 1:
+        resultados = _carregar_em_paralelo(
+            dsn,
+            parquet_files,
+            jobs=min(args.jobs, len(parquet_files)),
+            leitura=leitura,
+            strict_identificador=args.strict_identificador,
+            force=args.force,
+        )
+    else:
+        resultados = _carregar_em_serie(
+            dsn,
+            parquet_files,
+            leitura=leitura,
+            strict_identificador=args.strict_identificador,
+            force=args.force,
+        )
 
-        for fp in parquet_files:
-            res = load_parquet_file(
-                conn,
-                fp,
-                batch_size=args.batch_size,
-                strict_identificador=args.strict_identificador,
-            )
+    total = _stats_vazio()
+    ignorados: list[Path] = []
 
+    for fp, res in resultados:
+        if res["arquivos_ignorados"]:
+            ignorados.append(fp)
+            print(f"IGNORADO (sem alterações desde a última carga): {fp}")
+        else:
             print(f"OK: {fp} -> {res}")
-            for k, v in res.items():
-                total[k] += v
+        for k in total:
+            total[k] += res[k]
 
-        print(f"TOTAL: {total}")
+    print(
+        f"ARQUIVOS: {total['arquivos_carregados']} carregado(s), "
+        f"{total['arquivos_ignorados']} ignorado(s) sem alterações"
+        + (" (use --force para recarregá-los)" if ignorados else "")
+    )
+    print(f"TOTAL: {total}")
+    _gerar_snapshot_se_pedido(dsn, args.snapshot)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,12 @@ set -eu
 
 : "${GUNICORN_WORKERS:=2}"
 : "${BIND:=0.0.0.0:8000}"
+# Métricas do /metrics agregadas entre os workers (ver app/gunicorn_conf.py).
+: "${PROMETHEUS_MULTIPROC_DIR:=/tmp/prometheus_multiproc}"
+export PROMETHEUS_MULTIPROC_DIR
 
 exec gunicorn \
+  -c python:app.gunicorn_conf \
   -k uvicorn.workers.UvicornWorker \
   -w "$GUNICORN_WORKERS" \
   -b "$BIND" \
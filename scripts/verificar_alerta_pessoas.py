@@ -0,0 +1,87 @@
+"""Verifica o status de alerta de uma lista de id_pessoa (CSV) em massa.
+
+Mesma verificação de POST /api/v1/verificacao/pessoas, direto no banco: o CSV
+(UTF-8, com cabeçalho e a coluna id_pessoa; as demais colunas são ignoradas) é
+enviado por COPY para uma tabela temporária e o status de cada linha sai em
+CSV ou NDJSON, na ordem da entrada, lido em lotes de um cursor do servidor.
+A memória usada não depende do tamanho da lista. Não altera dados: a
+transação (e a tabela temporária) é desfeita ao final.
+
+Substitui o roteiro manual de scripts/verificar_alerta_pessoas.sql.
+
+Uso:
+    python scripts/verificar_alerta_pessoas.py --entrada resultados.csv --saida status.csv
+    python scripts/verificar_alerta_pessoas.py --entrada resultados.csv --formato ndjson > status.ndjson
+    cat resultados.csv | python scripts/verificar_alerta_pessoas.py --entrada - --saida status.csv
+
+Por padrão, o script usa a variável de ambiente DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import BinaryIO
+
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.dsn import dsn_psycopg  # noqa: E402
+from app.services.exceptions import (  # noqa: E402
+    ListaPessoasGrandeDemaisError,
+    ListaPessoasInvalidaError,
+)
+from app.services.verificacao_pessoas import VerificacaoPessoasService  # noqa: E402
+
+TAMANHO_LEITURA = 1 << 20
+
+
+async def _partes(arquivo: BinaryIO) -> AsyncIterator[bytes]:
+    while parte := arquivo.read(TAMANHO_LEITURA):
+        yield parte
+
+
+async def _verificar(args: argparse.Namespace, entrada: BinaryIO, saida: BinaryIO) -> int:
+    service = VerificacaoPessoasService()
+    async with await psycopg.AsyncConnection.connect(dsn_psycopg(args.database_url)) as conn:
+        linhas = await service.carregar(conn, _partes(entrada), max_linhas=args.max_linhas)
+        async for parte in service.gerar(conn, args.formato):
+            saida.write(parte)
+        await conn.rollback()
+    return linhas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--entrada", required=True, help="CSV com a coluna id_pessoa ('-' = stdin).")
+    parser.add_argument("--saida", default="-", help="Arquivo de saída ('-' = stdout).")
+    parser.add_argument("--formato", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--max-linhas", type=int, default=50_000_000)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("DATABASE_URL não informado (use --database-url ou env DATABASE_URL).")
+
+    inicio = time.perf_counter()
+    entrada = sys.stdin.buffer if args.entrada == "-" else open(args.entrada, "rb")
+    saida = sys.stdout.buffer if args.saida == "-" else open(args.saida, "wb")
+    try:
+        linhas = asyncio.run(_verificar(args, entrada, saida))
+    except (ListaPessoasInvalidaError, ListaPessoasGrandeDemaisError) as e:
+        raise SystemExit(str(e))
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+        if saida is not sys.stdout.buffer:
+            saida.close()
+
+    print(f"{linhas} linhas verificadas em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
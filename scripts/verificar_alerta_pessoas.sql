@@ -1,6 +1,8 @@
 -- ============================================================
 -- Verifica se uma lista de pessoas (id_pessoa) está no banco de alerta
 -- Somente leitura (SELECT) — seguro para rodar em produção.
+-- Prefira scripts/verificar_alerta_pessoas.py ou POST /api/v1/verificacao/pessoas,
+-- que fazem a mesma verificação sem \copy de um arquivo no servidor.
 --
 -- id_pessoa aqui é o mesmo id_pessoa do sistema de linkage
 -- (registro_linkage/pessoa), que corresponde diretamente a
@@ -0,0 +1,70 @@
+import time
+
+from app.core.cache import CacheLRU
+
+
+def test_cache_guarda_valores_negativos() -> None:
+    cache = CacheLRU(max_itens=10, ttl_segundos=60)
+    assert cache.obter("a") == (False, None)
+
+    cache.guardar("a", None)
+    assert cache.obter("a") == (True, None)
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+
+def test_cache_remove_o_menos_usado() -> None:
+    cache = CacheLRU(max_itens=2, ttl_segundos=60)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obter("a")
+    cache.guardar("c", 3)
+
+    assert cache.obter("b") == (False, None)
+    assert cache.obter("a") == (True, 1)
+    assert cache.remocoes_lru == 1
+
+
+def test_cache_expira_por_ttl() -> None:
+    cache = CacheLRU(max_itens=10, ttl_segundos=0.01)
+    cache.guardar("a", 1)
+    time.sleep(0.02)
+
+    assert cache.obter("a") == (False, None)
+    assert cache.expiracoes == 1
+
+
+def test_limpar_descarta_resultado_de_geracao_anterior() -> None:
+    cache = CacheLRU(max_itens=10, ttl_segundos=60)
+    geracao = cache.geracao
+    cache.limpar()
+
+    cache.guardar("a", 1, geracao=geracao)
+    assert cache.obter("a") == (False, None)
+
+
+def test_cache_desabilitado_nao_guarda() -> None:
+    cache = CacheLRU(max_itens=0, ttl_segundos=60)
+    cache.guardar("a", 1)
+    assert not cache.habilitado
+    assert cache.obter("a") == (False, None)
+
+
+def test_cache_com_nome_conta_eventos_no_prometheus() -> None:
+    from prometheus_client import REGISTRY
+
+    def valor(evento: str) -> float:
+        amostra = REGISTRY.get_sample_value(
+            "api_cache_eventos_total", {"cache": "teste", "evento": evento}
+        )
+        return amostra or 0.0
+
+    antes = {evento: valor(evento) for evento in ("acerto", "falha", "invalidacao")}
+    cache = CacheLRU(max_itens=10, ttl_segundos=60, nome="teste")
+    cache.obter("a")
+    cache.guardar("a", 1)
+    cache.obter("a")
+    cache.limpar()
+
+    assert valor("acerto") - antes["acerto"] == 1
+    assert valor("falha") - antes["falha"] == 1
+    assert valor("invalidacao") - antes["invalidacao"] == 1
@@ -0,0 +1,68 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("pyarrow")
+
+
+def _load_module():
+    path = Path(__file__).resolve().parents[1] / "scripts" / "carga_api.py"
+    spec = importlib.util.spec_from_file_location("carga_api", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+carga_api = _load_module()
+
+
+def test_ler_logs_extrai_mistura_de_rotas(tmp_path) -> None:
+    log = tmp_path / "api.log"
+    log.write_text(
+        "\n".join(
+            [
+                'INFO:app.request:{"event":"request","method":"POST","path":"/api/v1/relacao/violencia","status_code":200,"duration_ms":8.5}',
+                '{"event":"request","method":"POST","path":"/api/v1/relacao/violencia","status_code":409,"duration_ms":4}',
+                '{"event":"request","method":"GET","path":"/health","status_code":200,"duration_ms":1}',
+                '{"event":"request","method":"POST","path":"/api/v1/desconhecido","status_code":200,"duration_ms":2}',
+                '{"event":"error","method":"POST","path":"/api/v1/relacao/violencia"}',
+                "linha sem json",
+            ]
+        )
+    )
+
+    rotas, latencias = carga_api.ler_logs([str(log)])
+
+    assert rotas == {
+        carga_api.Rota("POST", "/api/v1/relacao/violencia"): 2,
+        carga_api.Rota("GET", "/health"): 1,
+    }
+    assert sorted(latencias) == [1.0, 4.0, 8.5]
+
+
+def test_requisicao_assinada_com_esquema_da_api() -> None:
+    gerador = carga_api.GeradorRequisicoes(
+        {carga_api.Rota("POST", "/api/v1/relacao/violencia"): 1},
+        pessoas=10,
+        taxa_acerto=1.0,
+        tamanho_lote=1,
+        api_key="k",
+        api_secret="s",
+        origin=None,
+        semente=1,
+    )
+
+    rota, body, headers = gerador.proxima()
+
+    signing_string = carga_api._build_signing_string(
+        "POST", rota.path, "", int(headers["x-timestamp"]), carga_api.hashlib.sha256(body).hexdigest()
+    )
+    assert headers["x-signature"] == carga_api._compute_hmac_hex("s", signing_string)
+    assert b'"identificadores"' in body
+
+
+def test_percentis() -> None:
+    assert carga_api.percentis(list(range(1, 101))) == {"p50": 51, "p95": 96, "p99": 100}
+    assert carga_api.percentis([]) == {"p50": None, "p95": None, "p99": None}
@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import orjson
+
+from app.api.v1.endpoints import estatisticas as rotas
+from app.core.cache import CacheLRU
+from app.db.repositories.estatisticas_repo import EstatisticaGeral, EstatisticaMetodo
+from app.services.estatisticas_diarias import EstatisticasService
+
+
+class _RepoContador:
+    def __init__(self) -> None:
+        self.consultas = 0
+
+    async def geral(self, conn, *, tipo_evento, desde, ate) -> EstatisticaGeral:
+        self.consultas += 1
+        return EstatisticaGeral(10, 3, date(2026, 3, 9), date(2026, 3, 10), 2)
+
+
+@asynccontextmanager
+async def _conexao():
+    yield None
+
+
+def test_servico_usa_cache_por_periodo() -> None:
+    repo = _RepoContador()
+    service = EstatisticasService(cache=CacheLRU(max_itens=10, ttl_segundos=60), conexao=_conexao)
+    service._repo = repo
+
+    async def _executar() -> None:
+        for _ in range(3):
+            await service.geral(tipo_evento="violencia", desde=None, ate=None)
+        await service.geral(tipo_evento="violencia", desde=date(2026, 3, 9), ate=None)
+
+    asyncio.run(_executar())
+    assert repo.consultas == 2
+
+
+class _ServicoFixo:
+    async def por_metodo(self, **kwargs) -> list[EstatisticaMetodo]:
+        return [
+            EstatisticaMetodo("notificacao_sinan", 30, 3),
+            EstatisticaMetodo("n_a", 10, 0),
+        ]
+
+
+def test_por_metodo_calcula_percentuais(monkeypatch) -> None:
+    monkeypatch.setattr(rotas, "service", _ServicoFixo())
+
+    resposta = asyncio.run(rotas.estatisticas_por_metodo(tipo_evento="violencia", desde=None, ate=None))
+
+    corpo = orjson.loads(resposta.body)
+    assert corpo == rotas.EstatisticasMetodoResponse(**corpo).model_dump(mode="json")
+    assert corpo["metodos"][0] == {
+        "metodo_identificacao": "notificacao_sinan",
+        "chamadas": 30,
+        "positivas": 3,
+        "pct_do_total": 75.0,
+        "pct_das_positivas": 100.0,
+    }
+    assert corpo["metodos"][1]["pct_das_positivas"] == 0.0
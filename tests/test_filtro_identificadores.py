@@ -0,0 +1,196 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.core.bloom import FiltroBloom
+from app.core.cache import CacheLRU
+from app.services.filtro_identificadores import FiltroIdentificadores, chave_identificador
+from app.services.relacao_service import RelacaoService
+
+
+def test_filtro_bloom_sem_falso_negativo_e_taxa_proxima_da_pedida() -> None:
+    filtro = FiltroBloom.dimensionar(20000, taxa_falso_positivo=0.01, memoria_max_bytes=1 << 20)
+    filtro.adicionar_varios(chave_identificador("cpf", f"{i:011d}") for i in range(20000))
+
+    assert all(chave_identificador("cpf", f"{i:011d}") in filtro for i in range(20000))
+    falsos = sum(chave_identificador("cpf", f"{i:011d}") in filtro for i in range(20000, 40000))
+    assert falsos / 20000 < 0.02
+
+
+def test_filtro_bloom_respeita_limite_de_memoria() -> None:
+    filtro = FiltroBloom.dimensionar(1_000_000, taxa_falso_positivo=0.001, memoria_max_bytes=4096)
+    assert len(filtro.bits) == 4096
+
+
+class _Agregador:
+    def __init__(self) -> None:
+        self.registros: list[dict] = []
+
+    def registrar(self, **kwargs) -> None:
+        self.registros.append(kwargs)
+
+
+@asynccontextmanager
+async def _sem_banco():
+    raise AssertionError("a consulta não deveria ir ao banco")
+    yield
+
+
+def test_identificadores_fora_do_filtro_nao_vao_ao_banco() -> None:
+    filtro = FiltroIdentificadores(_sem_banco, taxa_falso_positivo=0.01, memoria_max_mb=1)
+    filtro.filtro = FiltroBloom.dimensionar(10, taxa_falso_positivo=0.01, memoria_max_bytes=1024)
+    filtro.filtro.adicionar(chave_identificador("cpf", "1"))
+    agregador = _Agregador()
+    service = RelacaoService(
+        agregador=agregador,
+        cache=CacheLRU(max_itens=0, ttl_segundos=1),
+        conexao=_sem_banco,
+        filtro=filtro,
+    )
+
+    evento = asyncio.run(
+        service.buscar_evento_relacionado(
+            endpoint="/relacao", tipo_evento="violencia", pares_identificadores=[("cpf", "2")]
+        )
+    )
+    resultados = asyncio.run(
+        service.buscar_eventos_relacionados_lote(
+            endpoint="/lote", tipo_evento="violencia", consultas=[[("cpf", "2")], [("cns", "3")]]
+        )
+    )
+
+    assert evento is None
+    assert resultados == [None, None]
+    assert [r["positivos"] for r in agregador.registros] == [0, 0]
+    assert agregador.registros[1]["total"] == 2
+    assert filtro.descartadas == 3
+    assert filtro.pode_existir([("cns", "9"), ("cpf", "1")])
+
+
+class _Resultado:
+    def __init__(self, valor=None, chaves=()) -> None:
+        self._valor = valor
+        self._chaves = list(chaves)
+
+    def scalar_one_or_none(self):
+        return self._valor
+
+    scalar_one = scalar_one_or_none
+
+    def scalars(self) -> "_Resultado":
+        return self
+
+    async def partitions(self):
+        yield self._chaves
+
+
+# Banco falso: cada montagem lê a versão e as chaves da "carga" atual.
+class _Banco:
+    def __init__(self) -> None:
+        self.cargas = {1: [chave_identificador("cpf", "1")]}
+        self.versao = 1
+        self.leituras = 0
+        self.durante_leitura = None
+
+    @asynccontextmanager
+    async def conexao(self):
+        self.leituras += 1
+        yield _Conexao(self, self.versao)
+
+
+class _Conexao:
+    def __init__(self, banco: _Banco, versao: int) -> None:
+        self._banco = banco
+        self._versao = versao
+
+    async def execution_options(self, **kwargs) -> None:
+        return None
+
+    async def execute(self, consulta):
+        if "dataset_versao" in str(consulta):
+            return _Resultado(self._versao)
+        return _Resultado(len(self._banco.cargas[self._versao]))
+
+    async def stream(self, consulta):
+        if self._banco.durante_leitura is not None:
+            self._banco.durante_leitura()
+            self._banco.durante_leitura = None
+        return _Resultado(chaves=self._banco.cargas[self._versao])
+
+
+def test_filtro_de_snapshot_anterior_a_carga_nao_e_publicado() -> None:
+    banco = _Banco()
+    monitor = {"versao": None}
+    filtro = FiltroIdentificadores(
+        banco.conexao,
+        taxa_falso_positivo=0.01,
+        memoria_max_mb=1,
+        versao_atual=lambda: monitor["versao"],
+    )
+
+    # Depois do snapshot do filtro (versão 1), uma carga publica a versão 2 e a
+    # primeira leitura do monitor já vê a 2 (sem avisar ninguém).
+    def _carga() -> None:
+        banco.cargas[2] = banco.cargas[1] + [chave_identificador("cpf", "2")]
+        banco.versao = 2
+        monitor["versao"] = 2
+
+    banco.durante_leitura = _carga
+    asyncio.run(filtro.montar())
+
+    assert banco.leituras == 2
+    assert filtro.versao == 2
+    assert filtro.pode_existir([("cpf", "2")])
+
+
+def test_filtro_de_versao_diferente_da_do_monitor_nao_e_usado() -> None:
+    banco = _Banco()
+    monitor = {"versao": None}
+    filtro = FiltroIdentificadores(
+        banco.conexao,
+        taxa_falso_positivo=0.01,
+        memoria_max_mb=1,
+        versao_atual=lambda: monitor["versao"],
+    )
+
+    async def _executar() -> None:
+        # montado antes de o monitor conhecer a versão
+        await filtro.montar()
+        assert filtro.versao == 1
+        assert filtro.pode_existir([("cpf", "2")])
+
+        banco.cargas[2] = banco.cargas[1] + [chave_identificador("cpf", "2")]
+        banco.versao = monitor["versao"] = 2
+        assert filtro.pode_existir([("cpf", "2")])
+        assert filtro.filtro is None
+        await filtro._tarefa
+        assert filtro.versao == 2
+        assert not filtro.pode_existir([("cpf", "3")])
+
+    asyncio.run(_executar())
+
+
+def test_filtro_a_frente_do_monitor_espera_em_vez_de_remontar() -> None:
+    banco = _Banco()
+    banco.cargas[2] = banco.cargas[1] + [chave_identificador("cpf", "2")]
+    banco.versao = 2
+    monitor = {"versao": 1}
+    filtro = FiltroIdentificadores(
+        banco.conexao,
+        taxa_falso_positivo=0.01,
+        memoria_max_mb=1,
+        versao_atual=lambda: monitor["versao"],
+    )
+
+    async def _executar() -> None:
+        await filtro.montar()
+        assert banco.leituras == 1
+        assert filtro.filtro is None
+
+        # o monitor lê a versão 2 e avisa: o filtro guardado entra em uso
+        monitor["versao"] = 2
+        filtro.invalidar()
+        assert filtro.versao == 2
+        assert filtro.pode_existir([("cpf", "2")])
+        assert banco.leituras == 1
+
+    asyncio.run(_executar())
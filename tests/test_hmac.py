@@ -2,12 +2,13 @@ import hashlib
 import hmac
 import time
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
 from app.core.auth import _normalize_timestamp
 from app.core.auth import ApiAuthMiddleware
 from app.core.config import settings
+from app.core.logging import RequestLoggingMiddleware
 
 
 def _build_signature(*, secret: str, ts: int, method: str, path: str, query: str, body: bytes) -> str:
@@ -196,3 +197,136 @@ def test_hmac_can_be_disabled_via_settings() -> None:
     )
     assert r.status_code == 200
     assert r.json() == {"ok": True}
+
+
+def test_hmac_valid_signature_with_chunked_body_is_accepted() -> None:
+    _configure_settings(require_hmac=True)
+    client = TestClient(_make_app())
+
+    ts = int(time.time())
+    chunks = [b'{"ok":', b" true", b"}"]
+    sig = _build_signature(
+        secret=settings.API_SECRET,
+        ts=ts,
+        method="POST",
+        path="/api/v1/echo",
+        query="",
+        body=b"".join(chunks),
+    )
+
+    r = client.post(
+        "/api/v1/echo",
+        content=iter(chunks),
+        headers={
+            "Content-Type": "application/json",
+            "X-API-Key": "test-api-key",
+            "X-Timestamp": str(ts),
+            "X-Signature": sig,
+        },
+    )
+    assert r.status_code == 200
+    assert r.json() == {"ok": True}
+
+
+def test_request_logging_sets_request_id_header() -> None:
+    _configure_settings(require_hmac=False)
+    app = _make_app()
+    app.add_middleware(RequestLoggingMiddleware)
+    client = TestClient(app)
+
+    r = client.get("/health", headers={"X-Request-Id": "abc-123"})
+    assert r.status_code == 200
+    assert r.headers["X-Request-Id"] == "abc-123"
+
+    r = client.post("/api/v1/echo", json={"ok": True})
+    assert r.status_code == 401
+    assert r.headers["X-Request-Id"]
+
+
+def _make_streaming_app(gravados: list[bytes]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ApiAuthMiddleware)
+
+    # Como o endpoint de verificação: lê o body inteiro e só então "grava".
+    @app.post("/api/v1/verificacao/pessoas")
+    async def upload(request: Request):
+        partes = [parte async for parte in request.stream()]
+        gravados.extend(partes)
+        return {"bytes": sum(len(p) for p in partes)}
+
+    return app
+
+
+def _streaming_headers(*, body: bytes, signature: str | None = None) -> dict[str, str]:
+    ts = int(time.time())
+    return {
+        "Content-Type": "text/csv",
+        "X-API-Key": "test-api-key",
+        "X-Timestamp": str(ts),
+        "X-Signature": signature
+        or _build_signature(
+            secret=settings.API_SECRET,
+            ts=ts,
+            method="POST",
+            path="/api/v1/verificacao/pessoas",
+            query="",
+            body=body,
+        ),
+    }
+
+
+def test_streaming_route_checks_signature_while_reading_body() -> None:
+    _configure_settings(require_hmac=True)
+    gravados: list[bytes] = []
+    client = TestClient(_make_streaming_app(gravados))
+    chunks = [b"id_pessoa\n", b"1\n", b"2\n"]
+
+    r = client.post(
+        "/api/v1/verificacao/pessoas",
+        content=iter(chunks),
+        headers=_streaming_headers(body=b"".join(chunks)),
+    )
+    assert r.status_code == 200
+    assert r.json() == {"bytes": 14}
+    assert b"".join(gravados) == b"id_pessoa\n1\n2\n"
+
+
+def test_streaming_route_rejects_invalid_signature_before_app_commits() -> None:
+    _configure_settings(require_hmac=True)
+    gravados: list[bytes] = []
+    client = TestClient(_make_streaming_app(gravados))
+
+    r = client.post(
+        "/api/v1/verificacao/pessoas",
+        content=iter([b"id_pessoa\n", b"1\n"]),
+        headers=_streaming_headers(body=b"id_pessoa\n1\n", signature="0" * 64),
+    )
+    assert r.status_code == 401
+    assert r.json().get("detail") == "Invalid signature"
+    assert gravados == []
+
+
+def test_streaming_route_holds_early_response_until_signature_is_checked() -> None:
+    _configure_settings(require_hmac=True)
+    app = FastAPI()
+    app.add_middleware(ApiAuthMiddleware)
+
+    @app.post("/api/v1/verificacao/pessoas")
+    async def sem_ler_body():
+        return {"ok": True}
+
+    client = TestClient(app)
+    r = client.post(
+        "/api/v1/verificacao/pessoas",
+        content=b"id_pessoa\n1\n",
+        headers=_streaming_headers(body=b"id_pessoa\n1\n", signature="0" * 64),
+    )
+    assert r.status_code == 401
+
+    r = client.post(
+        "/api/v1/verificacao/pessoas",
+        content=b"id_pessoa\n1\n",
+        headers=_streaming_headers(body=b"id_pessoa\n1\n"),
+    )
+    assert r.status_code == 200
+    assert r.json() == {"ok": True}
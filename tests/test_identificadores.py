@@ -0,0 +1,40 @@
+import re
+from pathlib import Path
+
+from app.core.identificadores import (
+    TIPOS_IDENTIFICADOR,
+    codificar_identificador,
+    decodificar_identificador,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "db" / "migration"
+
+
+def _tipos_das_migrations() -> dict[str, tuple[int, int | None]]:
+    tipos: dict[str, tuple[int, int | None]] = {}
+    for arquivo in sorted(MIGRATIONS.glob("V*.sql"), key=lambda p: int(p.name[1:].split("__")[0])):
+        sql = arquivo.read_text()
+        for bloco in re.findall(
+            r"INSERT INTO monitoramento\.tipo_identificador \(codigo, nome, digitos\)\s*VALUES(.*?);",
+            sql,
+            re.S,
+        ):
+            for codigo, nome, digitos in re.findall(r"\((\d+),\s*'(\w+)',\s*(\d+|NULL)\)", bloco):
+                tipos[nome] = (int(codigo), None if digitos == "NULL" else int(digitos))
+    return tipos
+
+
+def test_codigos_iguais_aos_da_tabela_do_banco() -> None:
+    assert _tipos_das_migrations() == {
+        nome: (tipo.codigo, tipo.digitos) for nome, tipo in TIPOS_IDENTIFICADOR.items()
+    }
+
+
+def test_decodificar_ida_e_volta_e_codigo_desconhecido() -> None:
+    for tipo, valor in [("cpf", "00000000191"), ("cns", "700000000000001"), ("cpf", "123")]:
+        codificado = codificar_identificador(tipo, valor)
+        assert codificado is not None
+        assert decodificar_identificador(*codificado) == (tipo, valor)
+
+    assert decodificar_identificador(999, 42, None) == ("999", "42")
+    assert decodificar_identificador(999, None, "abc") == ("999", "abc")
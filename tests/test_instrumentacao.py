@@ -0,0 +1,68 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core.logging import request_id_atual
+from app.db.instrumentacao import EstatisticasConsultas, redigir_parametros
+
+
+def test_parametros_sao_redigidos() -> None:
+    assert redigir_parametros({"tipos": ["cpf", "cns"], "valores": ["1", "2"], "tipo_evento": "violencia"}) == {
+        "tipos": "list[2]",
+        "valores": "list[2]",
+        "tipo_evento": "str",
+    }
+    assert redigir_parametros([{"a": 1}, {"a": 2}]) == {"lote": 2, "primeiro": {"a": "int"}}
+
+
+def test_comandos_sao_agregados_e_lentos_logados(caplog) -> None:
+    engine = create_engine("sqlite://")
+    consultas = EstatisticasConsultas(limite_lento_ms=0)
+    consultas.instrumentar(engine)
+
+    token = request_id_atual.set("req-1")
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.db"), engine.connect() as conn:
+            for valor in range(3):
+                conn.execute(text("SELECT   :valor"), {"valor": str(valor)})
+    finally:
+        request_id_atual.reset(token)
+
+    (item,) = consultas.estatisticas()
+    assert item["consulta"] == "SELECT ?"
+    assert item["execucoes"] == 3
+    assert item["lentas"] == 3
+    assert '"request_id":"req-1"' in caplog.text
+    assert '"parametros":["str"]' in caplog.text
+    assert '"0"' not in caplog.text
+
+    consultas.zerar()
+    assert consultas.estatisticas() == []
+
+
+def test_pool_cronometrado_registra_esperas_e_timeouts() -> None:
+    import asyncio
+    import sqlite3
+
+    import pytest
+    from sqlalchemy import exc
+    from sqlalchemy.util import greenlet_spawn
+
+    from app.db.session import PoolCronometrado, estatisticas_pool
+
+    pool = PoolCronometrado(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.05)
+    antes = estatisticas_pool.estatisticas()
+
+    async def esgotar() -> None:
+        retiradas = [await greenlet_spawn(pool.connect) for _ in range(2)]
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        for conexao in retiradas:
+            await greenlet_spawn(conexao.close)
+
+    asyncio.run(esgotar())
+
+    depois = estatisticas_pool.estatisticas()
+    assert depois["retiradas"] - antes["retiradas"] == 2
+    assert depois["timeouts"] - antes["timeouts"] == 1
+    assert depois["overflow_max"] >= 1
@@ -0,0 +1,327 @@
+import importlib.util
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from app.core.identificadores import codificar_identificador, decodificar_identificador
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _load_module():
+    path = Path(__file__).resolve().parents[1] / "scripts" / "load_parquet.py"
+    spec = importlib.util.spec_from_file_location("load_parquet", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+load_parquet = _load_module()
+
+
+def _batch(**overrides):
+    base = {
+        "id_pessoa": [1, 2, None, 4],
+        "tipo_evento": ["violencia"] * 4,
+        "metodo_identificacao": ["notificacao_sinan"] * 4,
+        "data_identificacao": [date(2024, 1, 2)] * 4,
+        "tipo_identificador": ["cpf", "cns", "cpf", "rg"],
+        "valor_identificador": ["123.456.789-01", " 7001 2345 ", "999", "MG-1"],
+        "banco_origem_identificacao": ["  e-SUS   APS ", "nan", "e-SUS APS", "e-SUS APS"],
+        "id_registro_identificacao": [" 10 ", "20", "30", "40"],
+        "gera_alerta": [True, False, True, True],
+    }
+    base.update(overrides)
+    return pa.RecordBatch.from_pydict(base)
+
+
+def test_normalizar_batch_filtra_e_normaliza() -> None:
+    tabela, rows_copiadas = load_parquet._normalizar_batch(_batch())
+
+    # id_pessoa nulo não conta; tipo fora de cpf/cns conta, mas não é copiado
+    assert rows_copiadas == 3
+    assert tabela.column_names == load_parquet.COLUNAS_STAGING
+    assert tabela.to_pylist() == [
+        {
+            "id_pessoa": 1,
+            "tipo_evento": "violencia",
+            "metodo_identificacao": "notificacao_sinan",
+            "data_identificacao": date(2024, 1, 2),
+            "tipo_codigo": 1,
+            "valor_numerico": 12345678901,
+            "valor_texto": None,
+            "banco_origem_identificacao": "e-SUS APS",
+            "id_registro_identificacao": "10",
+            "gera_alerta": True,
+        },
+        {
+            "id_pessoa": 2,
+            "tipo_evento": "violencia",
+            "metodo_identificacao": "notificacao_sinan",
+            "data_identificacao": date(2024, 1, 2),
+            # cns sem os 15 dígitos fica em texto
+            "tipo_codigo": 2,
+            "valor_numerico": None,
+            "valor_texto": "70012345",
+            # banco "nan" anula o par inteiro
+            "banco_origem_identificacao": None,
+            "id_registro_identificacao": None,
+            "gera_alerta": False,
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "valores",
+    [
+        [" 2024-01-02T10:00:00", "2024-01-02", "2024-01-02 23:59", "2024-01-02"],
+        [datetime(2024, 1, 2, 3, 4)] * 4,
+        [1704164645] * 4,
+    ],
+)
+def test_normalizar_batch_converte_datas(valores) -> None:
+    tabela, _ = load_parquet._normalizar_batch(_batch(data_identificacao=valores))
+    assert set(tabela.column("data_identificacao").to_pylist()) == {date(2024, 1, 2)}
+
+
+def test_normalizar_batch_rejeita_data_nula() -> None:
+    with pytest.raises(TypeError):
+        load_parquet._normalizar_batch(_batch(data_identificacao=[None, None, None, None]))
+
+
+def test_csv_diferencia_vazio_de_nulo() -> None:
+    tabela, _ = load_parquet._normalizar_batch(
+        _batch(valor_identificador=["abc", "1", "2", "3"])
+    )
+    linhas = load_parquet._tabela_para_csv(tabela).decode().splitlines()
+
+    assert linhas[0] == '1,"violencia","notificacao_sinan",2024-01-02,1,,"","e-SUS APS","10",true'
+    assert linhas[1] == '2,"violencia","notificacao_sinan",2024-01-02,2,,"1",,,false'
+
+
+def test_codificacao_do_loader_igual_a_da_api() -> None:
+    valores = ["012.345.678-90", "700123456789012", "123", "abc"]
+    tabela, _ = load_parquet._normalizar_batch(
+        _batch(
+            id_pessoa=[1, 2, 3, 4],
+            tipo_identificador=["cpf", "cns", "cpf", "cns"],
+            valor_identificador=valores,
+        )
+    )
+
+    for tipo, valor, linha in zip(["cpf", "cns", "cpf", "cns"], valores, tabela.to_pylist()):
+        normalizado = "".join(ch for ch in valor if ch.isdigit())
+        codificado = codificar_identificador(tipo, normalizado)
+        assert (linha["tipo_codigo"], linha["valor_numerico"], linha["valor_texto"]) == codificado
+        assert decodificar_identificador(*codificado) == (tipo, normalizado)
+
+    assert tabela.column("valor_numerico").to_pylist()[0] == 1234567890
+
+
+def test_fingerprint_muda_com_conteudo(tmp_path) -> None:
+    arquivo = tmp_path / "carga.parquet"
+    arquivo.write_bytes(b"PAR1 conteudo")
+    original = load_parquet._fingerprint(arquivo)
+
+    assert original.startswith("sha256:")
+    assert load_parquet._fingerprint(arquivo) == original
+
+    arquivo.write_bytes(b"PAR1 conteudo alterado")
+    assert load_parquet._fingerprint(arquivo) != original
+
+
+class _CursorManifesto:
+    def __init__(self, registrado) -> None:
+        self.registrado = registrado
+        self.comandos: list[str] = []
+
+    def execute(self, comando, params=None) -> None:
+        self.comandos.append(comando.split()[0])
+
+    def fetchone(self):
+        return self.registrado
+
+
+def test_manifesto_so_calcula_sha256_com_mtime_diferente() -> None:
+    hashes: list[str] = []
+
+    def fingerprint() -> str:
+        hashes.append("sha256:a")
+        return "sha256:a"
+
+    # registrado = (tamanho_bytes, mtime_ns, fingerprint); arquivo com 10 bytes, mtime 5
+    def inalterado(cur: _CursorManifesto) -> bool:
+        return load_parquet._inalterado_no_manifesto(cur, "/x.parquet", 10, 5, fingerprint)
+
+    assert not inalterado(_CursorManifesto(None))
+    assert inalterado(_CursorManifesto((10, 5, "sha256:a")))
+    assert not inalterado(_CursorManifesto((11, 5, "sha256:a")))
+    assert hashes == []
+
+    # touch/cópia: mesmo conteúdo, e o mtime novo é registrado
+    cur = _CursorManifesto((10, 4, "sha256:a"))
+    assert inalterado(cur)
+    assert cur.comandos == ["SELECT", "UPDATE"]
+    assert not inalterado(_CursorManifesto((10, 4, "sha256:b")))
+    assert len(hashes) == 2
+
+
+def test_renomear_definicao_aponta_fk_para_sombra() -> None:
+    definicao = "FOREIGN KEY (individuo_id) REFERENCES monitoramento.individuo(id) ON DELETE CASCADE"
+
+    assert load_parquet._renomear_definicao(definicao, "__sombra") == (
+        "FOREIGN KEY (individuo_id) REFERENCES monitoramento.individuo__sombra(id) ON DELETE CASCADE"
+    )
+
+
+def test_evento_alerta_da_carga_completa_usa_tabelas_sombra() -> None:
+    comando = load_parquet._sql_evento_alerta(
+        "evento_alerta__sombra", "individuo_evento__sombra"
+    ).as_string(None)
+
+    assert 'INTO "monitoramento"."evento_alerta__sombra"' in comando
+    assert 'FROM "monitoramento"."individuo_evento__sombra" ie' in comando
+    assert "prioridade_metodo_identificacao" in comando
+    assert "COALESCE(p.prioridade, pp.prioridade)" in comando
+    assert "ON CONFLICT" not in comando
+    assert load_parquet.TABELAS_CARGA.index("evento_alerta") > load_parquet.TABELAS_CARGA.index(
+        "individuo"
+    )
+
+
+class _CursorCatalogo:
+    # Responde às consultas de partições e índices a partir de dicionários.
+    def __init__(self, particoes: dict[str, list[str]], indices: dict[str, list[str]]) -> None:
+        self._particoes = particoes
+        self._indices = indices
+        self._resultado: list[tuple] = []
+        self.comandos: list[str] = []
+
+    def execute(self, comando, params=None) -> None:
+        if params is None:
+            self.comandos.append(comando.as_string(None))
+            return
+        nome = params[0].removeprefix("monitoramento.")
+        if "pg_inherits" in comando:
+            self._resultado = [(p, "DEFAULT", None) for p in self._particoes.get(nome, [])]
+        else:
+            self._resultado = [(i,) for i in self._indices.get(nome, [])]
+
+    def fetchall(self) -> list[tuple]:
+        return self._resultado
+
+
+def test_renomear_particao_acompanha_subparticoes_e_indices() -> None:
+    cur = _CursorCatalogo(
+        particoes={"individuo_evento_violencia__sombra": ["individuo_evento_violencia_h0__sombra"]},
+        indices={
+            "individuo_evento_violencia_h0__sombra": ["individuo_evento_violencia_h0__sombra_pkey"],
+            "individuo_evento_violencia__sombra": ["individuo_evento_violencia__sombra_pkey"],
+        },
+    )
+
+    load_parquet._renomear_particao(cur, "individuo_evento_violencia__sombra", "__sombra", "")
+
+    assert cur.comandos == [
+        'ALTER INDEX "monitoramento"."individuo_evento_violencia_h0__sombra_pkey" '
+        'RENAME TO "individuo_evento_violencia_h0_pkey";',
+        'ALTER TABLE "monitoramento"."individuo_evento_violencia_h0__sombra" '
+        'RENAME TO "individuo_evento_violencia_h0";',
+        'ALTER INDEX "monitoramento"."individuo_evento_violencia__sombra_pkey" '
+        'RENAME TO "individuo_evento_violencia_pkey";',
+        'ALTER TABLE "monitoramento"."individuo_evento_violencia__sombra" '
+        'RENAME TO "individuo_evento_violencia";',
+    ]
+
+
+@pytest.mark.parametrize(
+    "leitura",
+    [
+        load_parquet.LeituraParquet(batch_size=3, threads=1),
+        load_parquet.LeituraParquet(batch_size=3, threads=4),
+        # limite menor que um row group: leitura em streaming
+        load_parquet.LeituraParquet(batch_size=3, threads=4, memoria_max_mb=0),
+    ],
+)
+def test_leitura_por_row_group_preserva_ordem(tmp_path, leitura) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    n = 50
+    tabela = pa.Table.from_batches(
+        [
+            _batch(
+                id_pessoa=list(range(n)),
+                tipo_evento=["violencia"] * n,
+                metodo_identificacao=["notificacao_sinan"] * n,
+                data_identificacao=[date(2024, 1, 2)] * n,
+                tipo_identificador=["cpf"] * n,
+                valor_identificador=[str(i) for i in range(n)],
+                banco_origem_identificacao=["e-SUS APS"] * n,
+                id_registro_identificacao=[str(i) for i in range(n)],
+                gera_alerta=[True] * n,
+            )
+        ]
+    )
+    arquivo = tmp_path / "carga.parquet"
+    pq.write_table(tabela, arquivo, row_group_size=7)
+
+    resultado = list(load_parquet._iter_tabelas_normalizadas(arquivo, leitura))
+
+    assert sum(linhas for _, linhas in resultado) == n
+    assert all(t.num_rows <= 3 for t, _ in resultado)
+    ids = [i for t, _ in resultado for i in t.column("id_pessoa").to_pylist()]
+    assert ids == list(range(n))
+
+
+class _Valor:
+    def __init__(self, valor: int) -> None:
+        self.value = valor
+
+
+def test_falha_de_arquivo_seguinte_nao_desfaz_o_anterior(monkeypatch) -> None:
+    # Modo --jobs com threads no lugar dos processos: o arquivo 1 falha no
+    # COPY antes de o arquivo 0 mesclar; o 0 precisa fazer commit (como na
+    # carga sequencial) e só o 2 desiste.
+    import threading
+    from contextlib import nullcontext
+
+    falhou = threading.Event()
+    mesclados: list[str] = []
+
+    def carregar(conn, file_path, *, antes_de_mesclar, **kwargs):
+        if file_path.name == "1.parquet":
+            falhou.set()
+            raise ValueError("parquet inválido")
+        antes_de_mesclar()
+        mesclados.append(file_path.name)
+        return {"arquivos_carregados": 1}
+
+    monkeypatch.setattr(load_parquet, "load_parquet_file", carregar)
+    monkeypatch.setattr(load_parquet.psycopg, "connect", lambda dsn: nullcontext())
+    monkeypatch.setattr(load_parquet, "_TURNO", _Valor(0))
+    monkeypatch.setattr(load_parquet, "_CONDICAO", threading.Condition())
+    monkeypatch.setattr(load_parquet, "_ABORTAR", _Valor(0))
+
+    resultados: dict[int, object] = {}
+
+    def rodar(indice: int) -> None:
+        try:
+            resultados[indice] = load_parquet._carregar_arquivo_worker(
+                indice, "dsn", Path(f"{indice}.parquet"), None, False, False
+            )
+        except Exception as e:
+            resultados[indice] = e
+
+    seguinte = threading.Thread(target=rodar, args=(1,))
+    seguinte.start()
+    assert falhou.wait(5)
+    seguinte.join(0.2)
+
+    rodar(0)
+    seguinte.join(5)
+    rodar(2)
+
+    assert resultados[0] == {"arquivos_carregados": 1}
+    assert isinstance(resultados[1], ValueError)
+    assert isinstance(resultados[2], RuntimeError)
+    assert mesclados == ["0.parquet"]
@@ -0,0 +1,144 @@
+import asyncio
+import os
+
+from app.services.metricas_agregador import MetricasAgregador
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def __aenter__(self) -> "_FakeSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class _FakeRepo:
+    def __init__(self, *, falhar: bool = False) -> None:
+        self.falhar = falhar
+        self.chamadas: list[list] = []
+        self.faixas: list[int] = []
+        self.compactacoes = 0
+
+    async def incr_diario_lote(self, db, *, incrementos, faixa=0) -> None:
+        if self.falhar:
+            raise RuntimeError("banco indisponível")
+        self.chamadas.append(list(incrementos))
+        self.faixas.append(faixa)
+
+    async def compactar_faixas(self, db) -> int:
+        self.compactacoes += 1
+        return 0
+
+
+def _make_agregador(repo: _FakeRepo, **kwargs) -> MetricasAgregador:
+    opts = {"intervalo_segundos": 60.0, "max_chaves_flush": 100, "max_chaves_pendentes": 100}
+    opts.update(kwargs)
+    return MetricasAgregador(_FakeSession, repo=repo, **opts)
+
+
+def test_registros_sao_agregados_em_um_unico_flush() -> None:
+    repo = _FakeRepo()
+    agregador = _make_agregador(repo)
+
+    for _ in range(3):
+        agregador.registrar(endpoint="/e", tipo_evento="violencia", metodo_identificacao=None)
+    agregador.registrar(
+        endpoint="/e", tipo_evento="violencia", metodo_identificacao="notificacao_sinan", positivos=1
+    )
+
+    asyncio.run(agregador.flush())
+
+    assert len(repo.chamadas) == 1
+    totais = {inc.metodo_identificacao: (inc.total, inc.positivos) for inc in repo.chamadas[0]}
+    assert totais == {None: (3, 0), "notificacao_sinan": (1, 1)}
+    assert agregador.estatisticas()["chaves_pendentes"] == 0
+    assert agregador.deltas_gravados == 4
+
+
+def test_flush_com_falha_preserva_deltas() -> None:
+    repo = _FakeRepo(falhar=True)
+    agregador = _make_agregador(repo)
+    agregador.registrar(endpoint="/e", tipo_evento="violencia", metodo_identificacao=None)
+
+    asyncio.run(agregador.flush())
+    assert agregador.flushes_falhos == 1
+    assert agregador.estatisticas()["chaves_pendentes"] == 1
+
+    repo.falhar = False
+    asyncio.run(agregador.flush())
+    assert repo.chamadas[0][0].total == 1
+
+
+def test_limite_de_chaves_descarta_e_contabiliza() -> None:
+    agregador = _make_agregador(_FakeRepo(), max_chaves_pendentes=1)
+
+    agregador.registrar(endpoint="/a", tipo_evento="violencia", metodo_identificacao=None)
+    agregador.registrar(endpoint="/a", tipo_evento="violencia", metodo_identificacao=None)
+    agregador.registrar(endpoint="/b", tipo_evento="violencia", metodo_identificacao=None, total=5)
+
+    stats = agregador.estatisticas()
+    assert stats["chaves_pendentes"] == 1
+    assert stats["deltas_descartados"] == 5
+
+
+def test_parar_faz_flush_final() -> None:
+    repo = _FakeRepo()
+    agregador = _make_agregador(repo)
+
+    async def _executar() -> None:
+        await agregador.iniciar()
+        agregador.registrar(endpoint="/e", tipo_evento="violencia", metodo_identificacao=None)
+        await agregador.parar()
+
+    asyncio.run(_executar())
+    assert sum(inc.total for chamada in repo.chamadas for inc in chamada) == 1
+
+
+def test_limite_de_flush_acorda_a_tarefa() -> None:
+    repo = _FakeRepo()
+    agregador = _make_agregador(repo, max_chaves_flush=2)
+
+    async def _executar() -> None:
+        await agregador.iniciar()
+        agregador.registrar(endpoint="/a", tipo_evento="violencia", metodo_identificacao=None)
+        agregador.registrar(endpoint="/b", tipo_evento="violencia", metodo_identificacao=None)
+        for _ in range(50):
+            if repo.chamadas:
+                break
+            await asyncio.sleep(0.01)
+        assert repo.chamadas
+        await agregador.parar()
+
+    asyncio.run(_executar())
+
+
+def test_flush_grava_na_faixa_do_worker() -> None:
+    repo = _FakeRepo()
+    agregador = _make_agregador(repo, faixas=4)
+    agregador.registrar(endpoint="/e", tipo_evento="violencia", metodo_identificacao=None)
+
+    asyncio.run(agregador.flush())
+
+    assert repo.faixas == [os.getpid() % 4]
+
+
+def test_compactacao_respeita_intervalo() -> None:
+    repo = _FakeRepo()
+    agregador = _make_agregador(repo, compactacao_intervalo_segundos=3600.0)
+
+    async def _executar() -> None:
+        # a primeira chamada só agenda; a próxima compactação fica para daqui a 1 h
+        await agregador._compactar_se_devido()
+        await agregador._compactar_se_devido()
+        agregador._proxima_compactacao = 0.0
+        await agregador._compactar_se_devido()
+
+    asyncio.run(_executar())
+    assert repo.compactacoes == 1
+    assert agregador.estatisticas()["compactacoes"] == 1
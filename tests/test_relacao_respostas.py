@@ -0,0 +1,64 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+from app.api.v1.endpoints import relacao as rotas
+from app.db.repositories.relacao_repo import EventoRelacionado
+from app.services.exceptions import IdentificadoresConflitantesError
+
+EVENTO = EventoRelacionado(
+    individuo_id=1,
+    metodo_identificacao="notificacao_sinan",
+    data_identificacao=date(2023, 8, 15),
+    banco_origem_identificacao="Sinan - Violências",
+    id_registro_identificacao="123",
+)
+
+
+class _ServicoFixo:
+    def __init__(self, resultado) -> None:
+        self.resultado = resultado
+
+    async def buscar_evento_relacionado(self, **kwargs):
+        return self.resultado
+
+    async def buscar_eventos_relacionados_lote(self, **kwargs):
+        return self.resultado
+
+
+def _chamar(rota, payload, monkeypatch, resultado) -> bytes:
+    monkeypatch.setattr(rotas, "service", _ServicoFixo(resultado))
+    request = SimpleNamespace(url=SimpleNamespace(path="/api/v1/relacao/violencia"))
+    resposta = asyncio.run(rota(tipo_evento="violencia", payload=payload, request=request))
+    assert resposta.media_type == "application/json"
+    return resposta.body
+
+
+def test_corpo_de_relacao_igual_ao_do_modelo(monkeypatch) -> None:
+    payload = rotas.RelacaoRequest(identificadores=[{"tipo": "cpf", "valor": "1"}])
+
+    for evento in (None, EVENTO):
+        corpo = _chamar(rotas.relacao, payload, monkeypatch, evento)
+        esperado = rotas.RelacaoResponse(**rotas._campos_evento(evento)).model_dump_json()
+        assert corpo == esperado.encode()
+
+
+def test_corpo_do_lote_igual_ao_do_modelo(monkeypatch) -> None:
+    payload = rotas.RelacaoLoteRequest(
+        consultas=[{"identificadores": [{"tipo": "cpf", "valor": str(i)}]} for i in range(3)]
+    )
+    conflito = IdentificadoresConflitantesError([1, 2])
+    corpo = _chamar(rotas.relacao_lote, payload, monkeypatch, [None, EVENTO, conflito])
+
+    esperado = rotas.RelacaoLoteResponse(
+        resultados=[
+            rotas.RelacaoLoteItem(status=200, relacionado=False),
+            rotas.RelacaoLoteItem(status=200, **rotas._campos_evento(EVENTO)),
+            rotas.RelacaoLoteItem(
+                relacionado=False,
+                status=409,
+                erro=rotas.RelacaoErroConflito(detail=str(conflito), code="IDENTIFICADORES_CONFLITANTES"),
+            ),
+        ]
+    ).model_dump_json()
+    assert corpo == esperado.encode()
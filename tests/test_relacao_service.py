@@ -0,0 +1,193 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+from app.core.cache import CacheLRU
+from app.core.identificadores import decodificar_identificador
+from app.db.repositories import relacao_repo
+from app.db.repositories.relacao_repo import EventoRelacionado
+from app.services.exceptions import IdentificadoresConflitantesError
+from app.services.relacao_service import RelacaoService
+
+# (tipo, valor) -> individuo_id e evento de alerta por indivíduo
+IDENTIFICADORES = {
+    ("cpf", "00000000001"): 1,
+    ("cns", "700000000000001"): 1,
+    ("cpf", "00000000002"): 2,
+    ("cpf", "00000000003"): 3,
+}
+EVENTOS = {
+    1: EventoRelacionado(1, "notificacao_sinan", date(2024, 1, 2), "Sinan - Violências", "10"),
+    3: EventoRelacionado(3, "modelo_semantica_explicita", date(2024, 2, 3), "e-SUS APS", "30"),
+}
+
+
+class _Resultado:
+    def __init__(self, linhas: list[tuple]) -> None:
+        self._linhas = linhas
+
+    def all(self) -> list[tuple]:
+        return self._linhas
+
+    def __iter__(self):
+        return iter(self._linhas)
+
+
+# Responde às duas consultas do lote a partir dos dicionários acima, usando os
+# parâmetros (arrays) montados pelo repositório.
+class _ConexaoFalsa:
+    def __init__(self) -> None:
+        self.consultas: list[object] = []
+
+    async def execute(self, consulta, parametros):
+        self.consultas.append(consulta)
+        if consulta is relacao_repo._BUSCAR_INDIVIDUOS_LOTE:
+            linhas = set()
+            for sufixo in ("numericos", "texto"):
+                for posicao, codigo, valor in zip(
+                    parametros[f"posicoes_{sufixo}"],
+                    parametros[f"tipos_{sufixo}"],
+                    parametros[f"valores_{sufixo}"],
+                ):
+                    par = decodificar_identificador(
+                        codigo, valor if sufixo == "numericos" else None, valor if sufixo == "texto" else None
+                    )
+                    if par in IDENTIFICADORES:
+                        linhas.add((posicao, IDENTIFICADORES[par]))
+            return _Resultado(sorted(linhas))
+
+        assert consulta is relacao_repo._BUSCAR_EVENTOS_IDENTIFICACAO_LOTE
+        assert parametros["tipo_evento"] == "violencia"
+        return _Resultado(
+            [tuple(EVENTOS[i]) for i in parametros["individuo_ids"] if i in EVENTOS]
+        )
+
+
+class _Agregador:
+    def __init__(self) -> None:
+        self.registros: list[dict] = []
+
+    def registrar(self, **kwargs) -> None:
+        self.registros.append(kwargs)
+
+
+class _FiltroAberto:
+    def pode_existir(self, pares) -> bool:
+        return True
+
+
+class _SemSnapshot:
+    def ativo(self):
+        return None
+
+
+def _servico(conexao: _ConexaoFalsa, agregador: _Agregador) -> RelacaoService:
+    @asynccontextmanager
+    async def _conexao():
+        yield conexao
+
+    return RelacaoService(
+        agregador=agregador,
+        cache=CacheLRU(max_itens=0, ttl_segundos=1),
+        conexao=_conexao,
+        filtro=_FiltroAberto(),
+        snapshot=_SemSnapshot(),
+    )
+
+
+def test_lote_resolve_conflito_negativo_e_positivo() -> None:
+    conexao = _ConexaoFalsa()
+    agregador = _Agregador()
+    consultas = [
+        [("cpf", "00000000001"), ("cns", "700000000000001")],  # indivíduo 1, com evento
+        [("cpf", "00000000001"), ("cpf", "00000000002")],  # indivíduos 1 e 2: conflito
+        [("cpf", "00000000002")],  # indivíduo 2, sem evento
+        [("cpf", "99999999999"), ("rg", "MG-1")],  # não encontrado / tipo desconhecido
+        [("cpf", "00000000003")],  # indivíduo 3, com evento
+        [("cns", "700000000000001")],  # indivíduo 1 de novo
+    ]
+
+    resultados = asyncio.run(
+        _servico(conexao, agregador).buscar_eventos_relacionados_lote(
+            endpoint="/lote", tipo_evento="violencia", consultas=consultas
+        )
+    )
+
+    assert resultados[0] == EVENTOS[1]
+    assert isinstance(resultados[1], IdentificadoresConflitantesError)
+    assert resultados[1].individuo_ids == [1, 2]
+    assert resultados[2:4] == [None, None]
+    assert resultados[4] == EVENTOS[3]
+    assert resultados[5] == EVENTOS[1]
+    assert conexao.consultas == [
+        relacao_repo._BUSCAR_INDIVIDUOS_LOTE,
+        relacao_repo._BUSCAR_EVENTOS_IDENTIFICACAO_LOTE,
+    ]
+
+    # uma contagem por método; conflitos e negativos ficam sem método
+    contagens = {
+        r["metodo_identificacao"]: (r["total"], r["positivos"]) for r in agregador.registros
+    }
+    assert contagens == {
+        "notificacao_sinan": (2, 2),
+        None: (3, 0),
+        "modelo_semantica_explicita": (1, 1),
+    }
+    assert all(r["endpoint"] == "/lote" and r["tipo_evento"] == "violencia" for r in agregador.registros)
+
+
+def test_lote_sem_identificadores_conhecidos_nao_busca_eventos() -> None:
+    conexao = _ConexaoFalsa()
+    agregador = _Agregador()
+
+    resultados = asyncio.run(
+        _servico(conexao, agregador).buscar_eventos_relacionados_lote(
+            endpoint="/lote", tipo_evento="violencia", consultas=[[("rg", "1")], [("cpf", "1")]]
+        )
+    )
+
+    assert resultados == [None, None]
+    assert conexao.consultas == [relacao_repo._BUSCAR_INDIVIDUOS_LOTE]
+    assert agregador.registros == [
+        {
+            "endpoint": "/lote",
+            "tipo_evento": "violencia",
+            "metodo_identificacao": None,
+            "total": 2,
+            "positivos": 0,
+        }
+    ]
+
+
+def test_resultado_so_vai_ao_cache_com_versao_do_dataset_conhecida() -> None:
+    monitor = {"versao": None}
+    service = RelacaoService(
+        agregador=_Agregador(),
+        cache=CacheLRU(max_itens=10, ttl_segundos=60),
+        filtro=_FiltroAberto(),
+        snapshot=_SemSnapshot(),
+        versao_dataset=lambda: monitor["versao"],
+    )
+    leituras = []
+
+    async def _consultar(**kwargs):
+        leituras.append(monitor["versao"])
+        if monitor["versao"] is None:
+            # primeira leitura do monitor acontece durante a consulta
+            monitor["versao"] = 2
+        return [1], EVENTOS[1]
+
+    service._consultar = _consultar
+
+    async def _buscar():
+        return await service._buscar_com_cache(
+            tipo_evento="violencia", pares_identificadores=[("cpf", "00000000001")]
+        )
+
+    async def _executar() -> None:
+        await _buscar()  # lida antes de o monitor conhecer a versão: não guarda
+        await _buscar()
+        await _buscar()  # guardada na anterior
+
+    asyncio.run(_executar())
+    assert leituras == [None, 2]
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.core.snapshot import SnapshotInvalido, SnapshotRelacao, chave_snapshot, escrever_snapshot
+from app.services.snapshot_relacao import MonitorSnapshotRelacao
+
+
+def _escrever(caminho: Path, *, dataset_versao: int = 3) -> None:
+    identificadores = {
+        ("cpf", "1"): 10,
+        ("cns", "1"): 10,
+        ("cpf", "2"): 20,
+        ("cns", "2"): 30,
+    }
+    escrever_snapshot(
+        caminho,
+        dataset_versao=dataset_versao,
+        identificadores=sorted((chave_snapshot(t, v), i) for (t, v), i in identificadores.items()),
+        eventos=[
+            (10, "violencia", "deterministico", date(2024, 5, 1), "sinan", "abc"),
+            (10, "obito", "probabilistico", date(2023, 1, 2), None, None),
+            (20, "violencia", "deterministico", date(1969, 12, 31), "sim", "x"),
+        ],
+    )
+
+
+def test_snapshot_responde_como_a_consulta(tmp_path: Path) -> None:
+    caminho = tmp_path / "relacao.snapshot"
+    _escrever(caminho)
+    snapshot = SnapshotRelacao(caminho)
+
+    individuos, evento = snapshot.buscar([("cpf", "1"), ("cns", "1")], "violencia")
+    assert individuos == [10]
+    assert tuple(evento) == (10, "deterministico", date(2024, 5, 1), "sinan", "abc")
+    assert tuple(snapshot.evento(10, "obito")) == (10, "probabilistico", date(2023, 1, 2), None, None)
+    assert snapshot.evento(20, "violencia").data_identificacao == date(1969, 12, 31)
+
+    assert snapshot.buscar([("cpf", "2"), ("cns", "2")], "violencia") == ([20, 30], None)
+    assert snapshot.buscar([("cns", "2")], "violencia") == ([30], None)
+    assert snapshot.buscar([("cpf", "9")], "violencia") == ([], None)
+    snapshot.fechar()
+
+
+def test_snapshot_corrompido_e_recusado(tmp_path: Path) -> None:
+    caminho = tmp_path / "relacao.snapshot"
+    _escrever(caminho)
+    dados = bytearray(caminho.read_bytes())
+    dados[-1] ^= 0xFF
+    caminho.write_bytes(bytes(dados))
+
+    with pytest.raises(SnapshotInvalido):
+        SnapshotRelacao(caminho)
+
+
+def test_monitor_so_usa_snapshot_da_versao_atual(tmp_path: Path) -> None:
+    caminho = tmp_path / "relacao.snapshot"
+    versao = {"atual": 3}
+    monitor = MonitorSnapshotRelacao(
+        str(caminho), intervalo_segundos=1, versao_dataset=lambda: versao["atual"]
+    )
+
+    asyncio.run(monitor.verificar())
+    assert monitor.ativo() is None
+
+    _escrever(caminho, dataset_versao=3)
+    asyncio.run(monitor.verificar())
+    assert monitor.ativo() is not None
+
+    versao["atual"] = 4
+    assert monitor.ativo() is None
+
+    _escrever(caminho, dataset_versao=4)
+    asyncio.run(monitor.verificar())
+    assert monitor.ativo().dataset_versao == 4
+    asyncio.run(monitor.parar())
+
+
+def test_string_acima_do_limite_e_recusada_ao_gravar(tmp_path: Path) -> None:
+    caminho = tmp_path / "relacao.snapshot"
+    with pytest.raises(SnapshotInvalido, match="excede o limite"):
+        escrever_snapshot(
+            caminho,
+            dataset_versao=1,
+            identificadores=[(chave_snapshot("cpf", "1"), 10)],
+            eventos=[(10, "violencia", "deterministico", date(2024, 5, 1), "sinan", "x" * 70_000)],
+        )
+    assert list(tmp_path.iterdir()) == []
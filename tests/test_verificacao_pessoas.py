@@ -0,0 +1,59 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.services.exceptions import ListaPessoasInvalidaError
+from app.services.verificacao_pessoas import VerificacaoPessoasService, ler_id_pessoa
+
+
+async def _partes(conteudo: bytes, tamanho: int):
+    for i in range(0, len(conteudo), tamanho):
+        yield conteudo[i : i + tamanho]
+
+
+async def _ler(conteudo: bytes, tamanho: int = 3) -> list[str]:
+    return [valor async for valor in ler_id_pessoa(_partes(conteudo, tamanho))]
+
+
+def test_le_id_pessoa_em_pedacos() -> None:
+    conteudo = '\ufeffrow_id,nome,ID_PESSOA\r\n1,"Silva, Ana",123\r\n\r\n2,Bia,\n3,"Çá",  45 '.encode()
+
+    # pedaços de 3 bytes cortam linhas e caracteres UTF-8 ao meio
+    assert asyncio.run(_ler(conteudo)) == ["123", "", "45"]
+    assert asyncio.run(_ler(conteudo, tamanho=len(conteudo))) == ["123", "", "45"]
+
+
+@pytest.mark.parametrize("conteudo", [b"", b"row_id,nome\n1,Ana\n", b"id_pessoa\n\xff\n"])
+def test_entrada_invalida(conteudo) -> None:
+    with pytest.raises(ListaPessoasInvalidaError):
+        asyncio.run(_ler(conteudo))
+
+
+class _RepoFixo:
+    async def iter_status(self, conn, *, tamanho_lote):
+        yield [(1, "123", "NO BANCO DE ALERTA", True, ["notificacao_sinan"], [])]
+        yield [(2, "", "id_pessoa vazio na planilha (linkage não identificou)", False, [], [])]
+
+
+async def _gerar(formato: str) -> bytes:
+    service = VerificacaoPessoasService(repo=_RepoFixo())
+    return b"".join([parte async for parte in service.gerar(None, formato)])
+
+
+def test_saida_csv_e_ndjson() -> None:
+    assert asyncio.run(_gerar("csv")).decode().splitlines() == [
+        "linha,id_pessoa,status,esta_no_alerta,metodos_com_alerta,metodos_avaliados_sem_alerta",
+        "1,123,NO BANCO DE ALERTA,true,notificacao_sinan,",
+        "2,,id_pessoa vazio na planilha (linkage não identificou),false,,",
+    ]
+
+    linhas = [orjson.loads(linha) for linha in asyncio.run(_gerar("ndjson")).splitlines()]
+    assert linhas[0] == {
+        "linha": 1,
+        "id_pessoa": "123",
+        "status": "NO BANCO DE ALERTA",
+        "esta_no_alerta": True,
+        "metodos_com_alerta": ["notificacao_sinan"],
+        "metodos_avaliados_sem_alerta": [],
+    }